@@ -246,7 +246,10 @@ class BaseBot(EventEmitter, ConfigurableApp):
             if message.get('targetId') == self.config["bot_id"]:
                 self.emit("control_command", message)
                 if message.get('command') == 'cancel':
-                    self.cancel_all_active_tasks()
+                    if message.get('taskId'):
+                        self.task_ended(message.get('taskId'), "cancelled")
+                    else:
+                        self.cancel_all_active_tasks()
        
         @self.socket.on("private-message")
         def on_private_message_from_server(message):
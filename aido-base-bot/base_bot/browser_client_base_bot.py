@@ -1,141 +1,210 @@
 import json
 import os
 import asyncio
-import time
+import concurrent.futures
 import logging
+import threading
 import uuid
-from langchain_openai import ChatOpenAI
-from browser_use import Agent, Controller, AgentHistoryList
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
 from base_bot.extensions.chromium_extension import ChromiumExtension
 from base_bot.extensions.pdf_save_extension import PDFExtension
 from base_bot.extensions.map_extension import WebpageScreenshotExtension
 from base_bot.extensions.print_dialog_extension import PrintDialogHandler
-from browser_use.browser.context import BrowserContext
-from browser_use.browser.views import URLNotAllowedError  # Add this import
-from browser_use.agent.views import AgentOutput
+from base_bot.extensions.workers import shutdown_process_pool
+from browser_use.browser.cdp_farm import CDPFarm, CDPFarmConfig
+from browser_use.browser.pool import BrowserPool, BrowserPoolConfig
+from browser_use.browser.screenshots import ScreenshotPolicy
+from browser_use.browser.settle import AdaptiveSettleConfig
+from browser_use.browser.watchdog import WatchdogConfig
+from browser_use.browser.profiles import ProfilePool, ProfilePoolConfig
+from browser_use.agent.checkpoint.views import CheckpointSettings
+from browser_use.agent.screenshot_dedup.views import ScreenshotDedupSettings
 from browser_use.browser.context import BrowserState
 from base_bot.llm_bot_base import LLMBotBase
 from base_bot.types import BrowserSessionConfig
 
-logger = logging.getLogger(__name__)
-
-# Monkey patching function
-def apply_browser_use_patches():
-    """Apply monkey patches to browser_use package to customize its behavior."""
-    print("Applying browser_use monkey patches...")
-    
-    # Store original method
-    original_click_element_node = BrowserContext._click_element_node
-    
-    # Create a wrapper for the method we want to patch
-    async def patched_click_element_node(self, element_node):
-        """
-        Patched version of _click_element_node to enable custom filenames for downloads.
-        """
-        print("Using patched _click_element_node method")
-        page = await self.get_current_page()
-
-        try:
-            element_handle = await self.get_locate_element(element_node)
+if TYPE_CHECKING:
+    # the agent and controller load the LLM stack, they are imported where they are first needed
+    from browser_use import AgentHistoryList
+    from browser_use.agent.views import AgentOutput
 
-            if element_handle is None:
-                raise Exception(f'Element: {repr(element_node)} not found')
+logger = logging.getLogger(__name__)
 
-            async def perform_click(click_func):
-                """Performs the actual click, handling both download
-                and navigation scenarios."""
-                if self.config.save_downloads_path:
-                    try:
-                        # Try short-timeout expect_download to detect file download
-                        async with page.expect_download(timeout=5000) as download_info:
-                            await click_func()
-                        download = await download_info.value
-                        
-                        # AIDO Nelvin customization here: Determine filename - check for custom filename attribute
-                        if hasattr(self.config, 'annual_pdf_filename') and self.config.annual_pdf_filename:
-                            # Use custom filename
-                            filename = self.config.annual_pdf_filename
-                            download_path = os.path.join(self.config.save_downloads_path, filename)
-                            print(f"Using custom filename: {filename}")
-                        else:
-                            # Use suggested filename from download
-                            suggested_filename = download.suggested_filename
-                            unique_filename = await self._get_unique_filename(self.config.save_downloads_path, suggested_filename)
-                            download_path = os.path.join(self.config.save_downloads_path, unique_filename)
-                            
-                        # Save the download
-                        await download.save_as(download_path)
-                        print(f"Download saved to: {download_path}")
-                        return download_path
-                    except TimeoutError:
-                        # If no download is triggered, treat as normal click
-                        await page.wait_for_load_state()
-                        await self._check_and_handle_navigation(page)
-                else:
-                    # Standard click logic if no download is expected
-                    await click_func()
-                    await page.wait_for_load_state()
-                    await self._check_and_handle_navigation(page)
+# Id of the agent task the current coroutine belongs to, used to route progress messages to the right task
+current_task_id: ContextVar = ContextVar('current_task_id', default=None)
+# Task id of an agent assigned to `active_agent` outside of call_agent
+STANDALONE_AGENT_TASK_ID = 'active_agent'
 
-            try:
-                return await perform_click(lambda: element_handle.click(timeout=1500))
-            except URLNotAllowedError as e:
-                raise e
-            except Exception:
-                try:
-                    return await perform_click(lambda: page.evaluate('(el) => el.click()', element_handle))
-                except URLNotAllowedError as e:
-                    raise e
-                except Exception as e:
-                    raise Exception(f'Failed to click element: {str(e)}')
 
-        except Exception as e:
-            raise Exception(f'Failed to click element: {repr(element_node)}. Error: {str(e)}')
-    
-    # Apply the patch
-    BrowserContext._click_element_node = patched_click_element_node
-    print("Monkey patch applied successfully")
-
-# Add a try-except to handle the URLNotAllowedError which might not be imported yet
-try:
-    from browser_use.browser.views import URLNotAllowedError
-except ImportError:
-    # Define a placeholder class if the import fails
-    class URLNotAllowedError(Exception):
-        pass
-        
-        
 class BrowserClientBaseBot(LLMBotBase):
     
     def __init__(self, options=None, *args, **kwargs):
         super().__init__(options, *args, **kwargs)
-        # Apply monkey patch after initializing the base class
-        apply_browser_use_patches()
+        
+        from browser_use import Controller
         
         self.controller = Controller()
         
-        pdf_extension = PDFExtension(configuration=self.config)
-        pdf_extension.extend(self.controller)
+        # PDF capture options, e.g. options={"pdf_capture": {"compress": True}} (compression needs pypdf)
+        self.config['pdf_capture'] = (options or {}).get('pdf_capture', {})
+        self.pdf_extension = PDFExtension(configuration=self.config)
+        self.pdf_extension.extend(self.controller)
         
-        webpage_screenshot_extension = WebpageScreenshotExtension(configuration=self.config)
-        webpage_screenshot_extension.extend(self.controller)
+        # Tiled map capture options, e.g. options={"map_capture": {"max_tiles": 25}} (stitching needs Pillow)
+        self.config['map_capture'] = (options or {}).get('map_capture', {})
+        self.map_extension = WebpageScreenshotExtension(configuration=self.config)
+        self.map_extension.extend(self.controller)
         
         print_dialog_extension = PrintDialogHandler(configuration=self.config)
         print_dialog_extension.extend(self.controller)
         
-        # Track active browser instances and their contexts
-        self._browser_instances = {}  # Dict to store browser instances and their contexts
-        # Track active agent instance
-        self.active_agent = None
+        # Registry of running agent tasks keyed by task id, see register_agent_task
+        self._agent_tasks = {}
+        self._agent_tasks_lock = threading.Lock()
+        # Parameters of the latest call_agent, see last_task_params
+        self._last_task_params = None
+        # Seconds a cancelled task gets to stop before its browser is closed under it
+        self.cancel_timeout = (options or {}).get('cancel_timeout', 5)
+        
+        # Opt-in hedging of slow LLM calls, e.g. options={"llm_hedging": {"percentile": 0.95, "fallback_model": "gpt-4o-mini"}}
+        self.hedging_settings = self.create_hedging_settings((options or {}).get('llm_hedging'))
+        # one hedger for all tasks, so its budget caps the extra spend of the whole bot
+        self.hedger = None
+        if self.hedging_settings and self.hedging_settings.enabled:
+            from browser_use.agent.hedging.service import LLMHedger
+            self.hedger = LLMHedger(self.hedging_settings)
+        
+        # Opt-in: with options={"checkpoints_path": "checkpoints"} agent runs with an explicit task id are checkpointed
+        # after every step and resumed when the same task id runs again, e.g. a retry of a cancelled order.
+        # "checkpoint_storage_state": True also saves cookies and localStorage, the directory then holds credentials
+        checkpoints_path = (options or {}).get('checkpoints_path')
+        if checkpoints_path and not os.path.isabs(checkpoints_path):
+            checkpoints_path = os.path.join(os.getcwd(), checkpoints_path)
+        self.checkpoints_path = checkpoints_path
+        self.checkpoint_storage_state = bool((options or {}).get('checkpoint_storage_state', False))
+        
+        # Screenshots for the LLM, without them a resource_policy also blocks images
+        self.use_vision = (options or {}).get('use_vision', True)
+        # Opt-in: near-identical screenshots of consecutive steps are sent and stored once,
+        # e.g. options={"screenshot_dedup": {"threshold": 5}}. Add "skip_in_prompt": False to still send every screenshot.
+        dedup_options = (options or {}).get('screenshot_dedup')
+        self.screenshot_dedup = None if dedup_options is None or dedup_options is False else ScreenshotDedupSettings(**dedup_options)
+        # Reusable on-disk profiles per site group so repeat visits load from the HTTP cache,
+        # e.g. options={"browser_profiles": {"directory": "browser_profiles", "slots": 2}}. Tasks pick their group
+        # with the "site_group" session attribute. Each task launches its own browser on a leased profile.
+        profile_options = (options or {}).get('browser_profiles')
+        self.profile_pool = ProfilePool(ProfilePoolConfig(**profile_options)) if profile_options else None
+        
+        # Opt-in blocking of requests the agent never needs, "resource_policy": {} blocks ads, analytics, fonts and media,
+        # e.g. options={"resource_policy": {"site_overrides": {"county.gov": {"block_resource_types": []}}}}
+        # Off by default: PDF and map captures need every resource, and routing disables the HTTP cache of browser_profiles
+        self.resource_policy = ChromiumExtension.create_resource_policy(
+            (options or {}).get('resource_policy'), use_vision=self.use_vision
+        )
+        
+        # Opt-in network waits learned per site, persisted between runs, e.g. options={"adaptive_settle": {"percentile": 95}}
+        # Without it every page gets the fixed page load times
+        settle_options = (options or {}).get('adaptive_settle')
+        self.config['adaptive_settle'] = (
+            None if settle_options is None or settle_options is False
+            else AdaptiveSettleConfig(**{'path': 'settle_profiles.json', **settle_options})
+        )
+        
+        # Format and size of the agent's screenshots, e.g. options={"screenshot": {"format": "jpeg", "quality": 70, "max_dimension": 1024}}
+        # They are only taken when the agent has vision, pass "screenshot": False to never take them
+        screenshot_options = (options or {}).get('screenshot', {})
+        self.config['screenshot'] = (
+            ScreenshotPolicy(mode='off') if screenshot_options is False else ScreenshotPolicy(**(screenshot_options or {}))
+        )
+        
+        # Opt-in warm browsers shared by all tasks, e.g. options={"browser_pool": {"size": 2, "max_contexts_per_browser": 4}}
+        # Pooled agents run on a shared browser loop thread; without the pool every task launches its own browser
+        self._browser_loop = None
+        self._browser_loop_lock = threading.Lock()
+        # The browser loop and the pool's browsers are started by the first task, a failed launch fails that task
+        self.browser_pool = self.create_browser_pool((options or {}).get('browser_pool'))
         
         print('BrowserClientBaseBot initialized')
         
         # Set up event listeners
         self.setup_event_listeners()
     
+    def create_hedging_settings(self, hedging_options):
+        """Build the LLM hedging settings from the bot options, None keeps hedging disabled"""
+        if not hedging_options:
+            return None
+        
+        from browser_use.agent.hedging.views import HedgingSettings
+        
+        hedging_options = dict(hedging_options)
+        fallback_model = hedging_options.pop('fallback_model', None)
+        if fallback_model:
+            from langchain_openai import ChatOpenAI
+            hedging_options['fallback_llm'] = ChatOpenAI(model=fallback_model)
+        return HedgingSettings(**hedging_options)
+    
+    def create_browser_pool(self, pool_options):
+        """Build the browser pool from the bot options, None launches a browser per task"""
+        if pool_options is None or pool_options is False:
+            return None
+        
+        # every task gets its own isolated context, several of them share one Chromium process
+        pool_options = {'size': 1, 'max_contexts_per_browser': 4, **(pool_options or {})}
+        
+        # long running pools recycle browsers whose memory grows or whose pages hang, "watchdog": False turns it off
+        watchdog_options = pool_options.pop('watchdog', {})
+        watchdog = None if watchdog_options is False else WatchdogConfig(**(watchdog_options or {}))
+        
+        browser_config = ChromiumExtension.create_browser_config(headless=self.config['browser_headless'])
+        # "cdp_farm": True runs the browsers as Chromium processes reached over CDP, see CDPFarmConfig for its options
+        if pool_options.pop('cdp_farm', False):
+            return CDPFarm(CDPFarmConfig(browser_config=browser_config, watchdog=watchdog, **pool_options))
+        return BrowserPool(BrowserPoolConfig(browser_config=browser_config, watchdog=watchdog, **pool_options))
+    
+    def get_browser_loop(self):
+        """
+        Event loop owning the pooled browsers.
+        
+        Every task runs in a thread with its own short lived loop, but Playwright objects can only
+        be used from the loop that created them, so all pooled browser work is sent to this loop.
+        """
+        with self._browser_loop_lock:
+            if self._browser_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='browser-loop', daemon=True)
+                thread.start()
+                self._browser_loop = loop
+            return self._browser_loop
+    
+    async def run_on_browser_loop(self, coro):
+        """Run a coroutine on the browser loop and await its result from the calling loop"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.get_browser_loop())
+        return await asyncio.wrap_future(future)
+    
+    def close_browser_pool(self):
+        """Close the pooled browsers and stop the browser loop"""
+        if self._browser_loop is None:
+            return
+        
+        if self.browser_pool:
+            try:
+                asyncio.run_coroutine_threadsafe(self.browser_pool.close(), self._browser_loop).result(timeout=10)
+            except Exception as e:
+                print(f"Error closing browser pool: {e}")
+        self._browser_loop.call_soon_threadsafe(self._browser_loop.stop)
+        self._browser_loop = None
+    
+    def cleanup_and_exit(self):
+        self.close_browser_pool()
+        shutdown_process_pool()
+        super().cleanup_and_exit()
+    
     def check_success_or_failure(self, history):
         """Check if the result is a success or failure"""
         
+        from browser_use import AgentHistoryList
+        
         if not isinstance(history, AgentHistoryList):
             print("history is not an AgentHistoryList")
             return [False, None]
@@ -177,78 +246,159 @@ class BrowserClientBaseBot(LLMBotBase):
         """Handle control command event"""
         print("Control command received:", message)
         if message.get('command') == 'cancel':
-            self.on_cancel_received()
+            # without a task id every running task is cancelled
+            self.on_cancel_received(task_id=message.get('taskId'))
     
-    async def gracefully_shutdown_agent(self):
-        """Common method to gracefully shutdown the agent and browser"""
-        # Create a new event loop for this thread if needed
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+    @property
+    def active_agent(self):
+        """Agent of the most recently started task, kept for bots written for a single agent"""
+        with self._agent_tasks_lock:
+            agents = [entry['agent'] for entry in self._agent_tasks.values() if entry['agent']]
+        return agents[-1] if agents else None
+    
+    @active_agent.setter
+    def active_agent(self, agent):
+        """
+        Register an agent a bot runs itself, so cancel commands stop it like the agents of call_agent.
         
-        # Step 1: If agent is active, pause it first
-        if self.active_agent:
+        Inside a call_agent task the agent replaces the task's agent, elsewhere it is registered under
+        `STANDALONE_AGENT_TASK_ID`. Assigning None unregisters the standalone agent again.
+        """
+        task_id = current_task_id.get() or STANDALONE_AGENT_TASK_ID
+        if agent is None:
+            if task_id == STANDALONE_AGENT_TASK_ID:
+                entry = self.unregister_agent_task(task_id)
+                if entry and not entry['finished'].done():
+                    entry['finished'].set_result(None)
+            return
+        
+        if not self.get_agent_tasks(task_id):
+            browser = getattr(agent, 'browser_context', None) or getattr(agent, 'browser', None)
             try:
-                print("Pausing agent execution...")
-                if hasattr(self.active_agent, 'pause') and callable(self.active_agent.pause):
-                    self.active_agent.pause()
-                    
-                    # Small delay to allow current operations to complete
-                    time.sleep(0.5)
-                    
-                    # Step 2: Stop the agent after pause
-                    print("Stopping agent execution...")
-                    if hasattr(self.active_agent, 'stop') and callable(self.active_agent.stop):
-                        self.active_agent.stop()
-                        
-                        # Another small delay to ensure stop signal is processed
-                        time.sleep(0.5)
-            except Exception as e:
-                print(f"Error while pausing/stopping agent: {e}")
+                self.register_agent_task(task_id, browser, None)
+            except ValueError:
+                pass  # registered by a concurrent assignment
+        with self._agent_tasks_lock:
+            entry = self._agent_tasks.get(task_id)
+            if entry is not None:
+                entry['agent'] = agent
+    
+    @property
+    def last_task_params(self):
+        """
+        Parameters of call_agent for a potential restart: those of the current task inside a task,
+        elsewhere those of the most recent call. Kept for bots written for a single agent.
+        """
+        task_id = current_task_id.get()
+        entry = self.get_agent_tasks(task_id).get(task_id) if task_id else None
+        if entry and entry['params'] is not None:
+            return entry['params']
+        return self._last_task_params
+    
+    @last_task_params.setter
+    def last_task_params(self, params):
+        self._last_task_params = params
+    
+    def get_agent_tasks(self, task_id=None):
+        """Snapshot of the running agent tasks, only the given task if `task_id` is set"""
+        with self._agent_tasks_lock:
+            if task_id is None:
+                return dict(self._agent_tasks)
+            return {task_id: self._agent_tasks[task_id]} if task_id in self._agent_tasks else {}
+    
+    def register_agent_task(self, task_id, browser, context_config, channel_id=None, params=None):
+        """Register a task, returns a future that is resolved once the task has finished"""
+        finished = concurrent.futures.Future()
+        with self._agent_tasks_lock:
+            if task_id in self._agent_tasks:
+                raise ValueError(f"Agent task {task_id} is already running")
+            self._agent_tasks[task_id] = {
+                "agent": None,
+                "browser": browser,
+                "context_config": context_config,
+                "channel_id": channel_id or "general",
+                "params": params,  # call_agent parameters, see last_task_params
+                "run_task": None,  # asyncio task running agent.run()
+                "loop": None,  # event loop of run_task
+                "cancelled": False,
+                "finished": finished,
+            }
+        return finished
+    
+    def unregister_agent_task(self, task_id, entry=None):
+        """Remove a task, only if it is still `entry` when given so a retry under the same id is kept"""
+        with self._agent_tasks_lock:
+            if entry is not None and self._agent_tasks.get(task_id) is not entry:
+                return None
+            return self._agent_tasks.pop(task_id, None)
+    
+    def cancel_agent_task(self, task_id):
+        """Cancel the agent run of a task, safe to call from any thread"""
+        with self._agent_tasks_lock:
+            entry = self._agent_tasks.get(task_id)
+            if entry is None:
+                return
+            entry['cancelled'] = True
+            if entry['agent']:
+                entry['agent'].stop()
+            if entry['run_task']:
+                # cancellation reaches the pending LLM request or Playwright call right away
+                entry['loop'].call_soon_threadsafe(entry['run_task'].cancel)
+    
+    async def gracefully_shutdown_agent(self, task_id=None):
+        """Cancel the agent and release the browser of a task, or of all tasks if no task id is given"""
+        agent_tasks = self.get_agent_tasks(task_id)
+        if task_id is not None and not agent_tasks:
+            print(f"No running agent task {task_id} to cancel")
+        
+        # all tasks are shut down in parallel so cancelling everything takes one deadline, not one per task
+        await asyncio.gather(*(self.shutdown_agent_task(task_id, entry) for task_id, entry in agent_tasks.items()))
+    
+    async def shutdown_agent_task(self, task_id, entry):
+        """Cancel one task and wait at most `cancel_timeout` seconds for it before closing its browser"""
+        print(f"Cancelling agent task {task_id}...")
+        self.cancel_agent_task(task_id)
         
-        # Step 3: Close all browser instances
-        for browser_id, (browser, context_config) in self._browser_instances.items():
-            original_json = None
+        try:
+            # shielded so a timeout does not cancel the shared future itself
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(entry['finished'])), timeout=self.cancel_timeout)
+            print(f"Agent task {task_id} stopped")
+        except asyncio.TimeoutError:
+            print(f"Agent task {task_id} did not stop within {self.cancel_timeout}s - closing its browser")
             try:
-                # Log browser context info if available
-                if context_config:
-                    original_json = getattr(context_config, 'original_json', None)
-                    # custom_filename = getattr(context_config, 'annual_pdf_filename', None)
-                    # print(f"Retrieved before closing browser filename: {custom_filename} {original_json}")
-                
-                print(f"Closing browser instance {browser_id}...")
-                
-                
-                json_string = ""
-                if original_json:
-                    print("_____PREPARING JSON STRING")
-                    json_string = f"[json]{json.dumps(original_json)}[/json] [Retry]"
-                    print("JSON STRING", json_string)
-                else:
-                    print("----------NO ORIGINAL JSON")
-                    
-                self.socket.emit('message', {
-                    "channelId": "general",
-                    "content": f"Task cancelled for order \"{original_json['order_number']}\". {json_string}"
-                })
-                
-                try:
-                    await browser.close()
-                except Exception as e:
-                    print(f"Error closing browser instance {browser_id}: {e}")
-                print(f"Browser instance {browser_id} successfully closed")
+                await asyncio.wait_for(self.close_browser_instance(entry['browser']), timeout=self.cancel_timeout)
             except Exception as e:
-                print(f"Error during cleanup of browser instance {browser_id}: {e}")
+                print(f"Error closing browser instance of task {task_id}: {e}")
+        
+        context_config = entry['context_config']
+        original_json = None
+        try:
+            # Log browser context info if available
+            if context_config:
+                original_json = getattr(context_config, 'original_json', None)
+            
+            json_string = ""
+            if original_json:
+                print("_____PREPARING JSON STRING")
+                json_string = f"[json]{json.dumps(original_json)}[/json] [Retry]"
+                print("JSON STRING", json_string)
+            else:
+                print("----------NO ORIGINAL JSON")
+            
+            order_number = original_json.get('order_number') if original_json else None
+            self.socket.emit('message', {
+                "channelId": entry['channel_id'],
+                "taskId": task_id,
+                "content": f"Task cancelled for order \"{order_number}\". {json_string}"
+            })
+        except Exception as e:
+            print(f"Error reporting cancellation of task {task_id}: {e}")
         
-        # Clear all references
-        self._browser_instances.clear()
-        self.active_agent = None
+        self.unregister_agent_task(task_id, entry)
     
-    def on_cancel_received(self, *args, **kwargs):
-        """Handle cancel event - gracefully shut down the agent and browser"""
-        print("Cancel received - gracefully shutting down browser automation...")
+    def on_cancel_received(self, *args, task_id=None, **kwargs):
+        """Handle cancel event - gracefully shut down the agent and browser of one or all tasks"""
+        print(f"Cancel received for {f'task {task_id}' if task_id else 'all tasks'} - gracefully shutting down browser automation...")
         
         # Create a new event loop for this thread if needed
         try:
@@ -258,71 +408,173 @@ class BrowserClientBaseBot(LLMBotBase):
             asyncio.set_event_loop(loop)
             
         # Use the common shutdown method
-        loop.run_until_complete(self.gracefully_shutdown_agent())
+        loop.run_until_complete(self.gracefully_shutdown_agent(task_id))
         print("Browser automation successfully cancelled")
     
     
-    async def log_completion_to_external_service(self, history: AgentHistoryList):
-        # Here you can extract just the "next step" information from agent_output
-        next_step = history.final_result()
+    async def close_browser_instance(self, instance):
+        """Close a task's browser, or its context when the browser belongs to the pool"""
+        if self.browser_pool:
+            await self.run_on_browser_loop(instance.close())
+        else:
+            await instance.close()
+    
+    def emit_task_progress(self, content, task_id=None):
+        """Send a progress message to the channel of a task, defaults to the task the caller runs in"""
+        task_id = task_id or current_task_id.get()
+        entry = self.get_agent_tasks(task_id).get(task_id) if task_id else None
         
         self.socket.emit('message', {
-            "channelId": "general",
-            "content": next_step
+            "channelId": entry['channel_id'] if entry else "general",
+            "taskId": task_id,
+            "content": content
         })
     
-    async def log_step_to_external_service(self, browser_state: BrowserState, agent_output: AgentOutput, step_number: int):
+    async def log_completion_to_external_service(self, history: 'AgentHistoryList'):
+        # Here you can extract just the "next step" information from agent_output
+        next_step = history.final_result()
+        
+        self.emit_task_progress(next_step)
+    
+    async def log_step_to_external_service(self, browser_state: BrowserState, agent_output: 'AgentOutput', step_number: int):
         # Get the next goal from the agent's brain
         next_step = agent_output.current_state.next_goal
         
-        self.socket.emit('message', {
-            "channelId": "general",
-            "content": next_step
-        })
+        self.emit_task_progress(next_step)
        
     
-    async def call_agent(self, task, extend_system_message=None, sensitive_data=None, session_config: BrowserSessionConfig = None):
+    async def call_agent(self, task, extend_system_message=None, sensitive_data=None, session_config: BrowserSessionConfig = None, task_id=None, channel_id=None):
+        """
+        Run a browser agent for a task.
+        
+        Several calls may run at the same time, each is registered under `task_id` (generated if not given)
+        so it can be cancelled on its own with a cancel control command carrying that `taskId`.
+        Progress messages of the task are sent to `channel_id`.
+        With an explicit `task_id` the run is checkpointed and a later call with the same id resumes it.
+        """
         if not task:
             return "No instructions provided"
 
-        # Store parameters for potential restart
-        self.last_task_params = {
+        # Store parameters for potential restart, the registered task keeps its own copy
+        # since several tasks may run at the same time
+        task_params = {
             'task': task,
             'extend_system_message': extend_system_message,
             'sensitive_data': sensitive_data
         }
+        self.last_task_params = task_params
+        
+        agent_kwargs = dict(task_params)
+        if task_id and self.checkpoints_path:
+            agent_kwargs['checkpoint'] = CheckpointSettings(
+                directory=self.checkpoints_path, checkpoint_id=str(task_id), save_storage_state=self.checkpoint_storage_state
+            )
+        task_id = task_id or str(uuid.uuid4())
+        
+        if self.profile_pool:
+            site_group = (session_config or {}).get('site_group') or 'default'
+            async with self.profile_pool.profile(site_group) as profile:
+                return await self.run_browser_agent(task_id, channel_id, agent_kwargs, session_config, user_data_dir=profile.path)
+        
+        if self.browser_pool:
+            context_config = ChromiumExtension.create_context_config(
+                session_config, self.config, headless=self.config['browser_headless'], resource_policy=self.resource_policy
+            )
+            return await self.run_on_browser_loop(self.run_pooled_agent(task_id, channel_id, agent_kwargs, context_config))
         
+        return await self.run_browser_agent(task_id, channel_id, agent_kwargs, session_config)
+    
+    async def run_browser_agent(self, task_id, channel_id, agent_kwargs, session_config, user_data_dir=None):
+        """Run the agent on a browser launched for this task only, on the profile in `user_data_dir` if given"""
         headless = self.config['browser_headless']
         
-        browser_id = str(uuid.uuid4())
-        [browser, context_config] = ChromiumExtension.extend_browser(session_config, self.config, headless=headless)
-        self._browser_instances[browser_id] = (browser, context_config)
+        [browser, context_config] = ChromiumExtension.extend_browser(
+            session_config, self.config, headless=headless, resource_policy=self.resource_policy, user_data_dir=user_data_dir
+        )
         
         try:
-            agent = Agent(
-                task=task,
-                llm=self.llm,
-                browser=browser,
-                controller=self.controller,
-                extend_system_message=extend_system_message,
-                sensitive_data=sensitive_data,
-                register_new_step_callback=self.log_step_to_external_service,
-                register_done_callback=self.log_completion_to_external_service
-            )
-            
-            # Store reference to the agent so it can be gracefully stopped
-            self.active_agent = agent
-            
-            result = await agent.run()
-            return result
+            return await self.run_agent_task(task_id, channel_id, agent_kwargs, context_config, browser=browser)
         finally:
             # Clean up this specific browser instance
-            if browser_id in self._browser_instances:
-                browser, context_config = self._browser_instances.pop(browser_id)
-                try:
-                    await browser.close()
-                except Exception as e:
-                    print(f"Error during cleanup of browser instance {browser_id}: {e}")
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"Error during cleanup of browser instance of task {task_id}: {e}")
+    
+    async def run_pooled_agent(self, task_id, channel_id, agent_kwargs, context_config):
+        """Run the agent in a fresh context on a warm browser, must run on the browser loop"""
+        try:
+            # launches the pool on the first task, later calls return at once
+            await self.browser_pool.start()
+        except Exception as e:
+            print(f"Error starting browser pool: {e}")
+            raise
+        async with self.browser_pool.browser_context(context_config) as browser_context:
+            return await self.run_agent_task(task_id, channel_id, agent_kwargs, context_config, browser_context=browser_context)
+    
+    async def run_agent_task(self, task_id, channel_id, agent_kwargs, context_config, **browser_kwargs):
+        """
+        Run an agent registered under `task_id` so it can be found for progress messages and cancellation.
+        
+        The run is its own asyncio task so cancel_agent_task can cancel it without cancelling the caller,
+        a cancelled run returns the history recorded so far.
+        """
+        [browser] = browser_kwargs.values()
+        params = {key: agent_kwargs.get(key) for key in ('task', 'extend_system_message', 'sensitive_data')}
+        finished = self.register_agent_task(task_id, browser, context_config, channel_id, params=params)
+        entry = self.get_agent_tasks(task_id)[task_id]
+        token = current_task_id.set(task_id)
+        agent = None
+        try:
+            agent = self.create_agent(**agent_kwargs, **browser_kwargs)
+            
+            # Store references so the run can be cancelled from other threads
+            with self._agent_tasks_lock:
+                # a cancel may already have removed the entry, and a retry registered its own under the same id
+                if self._agent_tasks.get(task_id) is not entry or entry['cancelled']:
+                    print(f"Agent task {task_id} was cancelled before it started")
+                    return None
+                run_task = asyncio.ensure_future(agent.run())
+                entry.update(agent=agent, run_task=run_task, loop=asyncio.get_running_loop())
             
-            # Reset the agent reference since run has completed
-            self.active_agent = None
\ No newline at end of file
+            try:
+                history = await run_task
+                # PDF renders and map stitching finish in the background, the task is done once they are written
+                await self.pdf_extension.wait_for_captures(agent.browser_context)
+                await self.map_extension.wait_for_captures(agent.browser_context)
+                return history
+            except asyncio.CancelledError:
+                # only swallow our own cancellation, a cancelled caller must still see it
+                if run_task.cancelled() and entry['cancelled']:
+                    print(f"Agent task {task_id} cancelled after {len(agent.state.history.history)} steps")
+                    return agent.state.history
+                raise
+        finally:
+            if agent:
+                # captures were only waited for if the run succeeded, drop those of a cancelled or failed run
+                self.pdf_extension.forget_captures(agent.browser_context)
+                self.map_extension.forget_captures(agent.browser_context)
+            current_task_id.reset(token)
+            self.unregister_agent_task(task_id, entry)
+            if not finished.done():
+                finished.set_result(None)
+    
+    def create_agent(self, task, extend_system_message=None, sensitive_data=None, checkpoint=None, **browser_kwargs):
+        """Create the agent for a task, `browser_kwargs` is either `browser` or `browser_context`"""
+        from browser_use import Agent
+        
+        return Agent(
+            task=task,
+            llm=self.llm,
+            controller=self.controller,
+            extend_system_message=extend_system_message,
+            sensitive_data=sensitive_data,
+            use_vision=self.use_vision,
+            hedging=self.hedging_settings,
+            hedger=self.hedger,
+            checkpoint=checkpoint,
+            screenshot_dedup=self.screenshot_dedup,
+            register_new_step_callback=self.log_step_to_external_service,
+            register_done_callback=self.log_completion_to_external_service,
+            **browser_kwargs
+        )
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Dict, List
+
+from browser_use.browser.context import BrowserContext
+
+
+class CaptureJobs:
+    """
+    Background capture jobs of each browser context, e.g. PDF renders and map stitching.
+
+    Jobs are dropped once they are waited for, or forgotten when their task ends without waiting for them
+    (cancelled or failed), so a long running bot does not keep the jobs of every context it ever had.
+    Every job has a `task` attribute, None for jobs that finished before they were added.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, list] = {}  # context id -> list of jobs
+
+    def add(self, browser_context: BrowserContext, job):
+        self._jobs.setdefault(browser_context.context_id, []).append(job)
+
+    async def wait(self, browser_context: BrowserContext, timeout: float = 60) -> List:
+        """Wait for the pending jobs of a context, returns all its jobs and forgets them"""
+        jobs = self._jobs.pop(browser_context.context_id, [])
+        pending = [job.task for job in jobs if job.task and not job.task.done()]
+        if pending:
+            try:
+                _, still_pending = await asyncio.wait(pending, timeout=timeout)
+            except asyncio.CancelledError:
+                # the jobs are no longer tracked, a cancelled wait must not leave them running
+                still_pending = pending
+                raise
+            finally:
+                for task in still_pending:
+                    task.cancel()
+        return jobs
+
+    def forget(self, browser_context: BrowserContext) -> List:
+        """Cancel the pending jobs of a context and forget them, returns all its jobs"""
+        jobs = self._jobs.pop(browser_context.context_id, [])
+        for job in jobs:
+            if job.task and not job.task.done():
+                job.task.cancel()
+        return jobs
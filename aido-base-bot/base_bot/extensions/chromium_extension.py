@@ -1,6 +1,9 @@
 import os
+from dataclasses import replace
 from browser_use.browser.browser import Browser, BrowserConfig
 from browser_use.browser.context import BrowserContextConfig
+from browser_use.browser.resource_policy import ResourcePolicy
+from browser_use.browser.screenshots import ScreenshotPolicy
 from base_bot.types import BrowserSessionConfig
 
 class ChromiumExtension:
@@ -12,42 +15,107 @@ class ChromiumExtension:
         session_config: BrowserSessionConfig = None,
         configuration=None,
         browser_args=None,
+        resource_policy: ResourcePolicy = None,
+        user_data_dir=None,
         **kwargs
     ) -> Browser:
         
         headless = kwargs.pop('headless', False)
         
+        context_config = ChromiumExtension.create_context_config(
+            session_config, configuration, headless=headless, resource_policy=resource_policy
+        )
+        config = ChromiumExtension.create_browser_config(
+            browser_args, headless=headless, context_config=context_config, user_data_dir=user_data_dir
+        )
+        
+        browser = Browser(
+            config=config,
+        )
+        
+        return [browser, context_config]
+    
+    @staticmethod
+    def create_browser_config(
+        browser_args=None,
+        headless=False,
+        context_config: BrowserContextConfig = None,
+        user_data_dir=None
+    ) -> BrowserConfig:
+        """
+        Create the Chromium launch configuration shared by every task running on the browser.
+        With `user_data_dir` a persistent profile is launched, its disk cache survives the task.
+        """
         args = [
             "--disable-features=ChromeWhatsNewUI",
         ]
         
-        downloads_path = configuration.get('custom_downloads_path')
-        
         if browser_args:
             args.extend(browser_args)
         
+        return BrowserConfig(
+            extra_chromium_args=args,
+            headless=headless,
+            user_data_dir=user_data_dir,
+            new_context_config=context_config or BrowserContextConfig()
+        )
+    
+    @staticmethod
+    def create_resource_policy(policy_options=None, use_vision=True) -> ResourcePolicy:
+        """
+        Build the resource policy from bot options, e.g. {"block_resource_types": ["font"], "site_overrides": {...}}.
+        
+        An empty dict gives the default policy (ads, analytics, fonts and media), None or False blocks nothing.
+        Agents without vision never look at images, so they are dropped too.
+        """
+        if policy_options is None or policy_options is False:
+            return None
+        
+        if isinstance(policy_options, ResourcePolicy):
+            policy = policy_options
+        else:
+            policy = ResourcePolicy(**policy_options)
+        
+        if not use_vision:
+            policy = replace(policy, text_only=True)
+        return policy
+    
+    @staticmethod
+    def create_context_config(
+        session_config: BrowserSessionConfig = None,
+        configuration=None,
+        headless=True,
+        resource_policy: ResourcePolicy = None
+    ) -> BrowserContextConfig:
+        """
+        Create the context configuration of a single task, holding its downloads path and session attributes.
+        Page waits adapt per site when the configuration holds an `adaptive_settle` AdaptiveSettleConfig,
+        its `screenshot` ScreenshotPolicy sets when and how state screenshots are taken.
+        """
+        session_config = dict(session_config or {})
+        
+        # a task specific downloads folder keeps concurrent tasks from writing into each other's folder
+        downloads_path = session_config.pop('downloads_path', None)
+        if not downloads_path and configuration:
+            downloads_path = configuration.get('custom_downloads_path')
+        
         # Create a browser context config with our custom attributes
+        # window.print() saves a PDF into the downloads folder, browsers that cannot print to PDF open the dialog instead
         context_config = BrowserContextConfig(
-            save_downloads_path=downloads_path
+            save_downloads_path=downloads_path,
+            download_filename=session_config.get('annual_pdf_filename'),
+            print_to_pdf=bool(downloads_path),
+            resource_policy=resource_policy,
+            adaptive_settle=configuration.get('adaptive_settle') if configuration else None,
+            screenshot=(configuration.get('screenshot') if configuration else None) or ScreenshotPolicy()
         )
         
         # Add our custom attribute to the context config
         # BrowserContextConfig is a dataclass, so we can set attributes directly
-        if session_config:
-            for key, value in session_config.items():
-                setattr(context_config, key, value)
-            
-        config = BrowserConfig(
-            extra_chromium_args=args,
-            headless=headless,
-            new_context_config=context_config
-        )
+        for key, value in session_config.items():
+            setattr(context_config, key, value)
         
-        browser = Browser(
-            config=config,
-        )
-        
-        return [browser, context_config]
+        return context_config
         
     
     @staticmethod
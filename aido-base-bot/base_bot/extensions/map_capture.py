@@ -0,0 +1,205 @@
+import asyncio
+import importlib.util
+import io
+import itertools
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from playwright.async_api import Page
+from browser_use.browser.context import BrowserContext
+from browser_use.browser.network import NetworkIdleTracker
+from base_bot.extensions.capture_jobs import CaptureJobs
+from base_bot.extensions.workers import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Region of the map in document coordinates, the whole document when no selector is given
+REGION_SCRIPT = """(selector) => {
+    if (selector) {
+        const element = document.querySelector(selector);
+        if (!element) return null;
+        const rect = element.getBoundingClientRect();
+        return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+    }
+    const root = document.scrollingElement || document.documentElement;
+    return {x: 0, y: 0, width: root.scrollWidth, height: root.scrollHeight};
+}"""
+
+SCROLL_SCRIPT = '([x, y]) => { window.scrollTo(x, y); return {x: window.scrollX, y: window.scrollY}; }'
+SCROLL_POSITION_SCRIPT = '() => ({x: window.scrollX, y: window.scrollY})'
+
+# Map tiles come as images or as fetch/xhr data (vector tiles, tile JSON), often from CDNs the page load tracking ignores
+MAP_RESOURCE_TYPES = frozenset({'image', 'fetch', 'xhr', 'script', 'stylesheet', 'font'})
+
+IMAGE_FORMATS = {
+    '.png': 'PNG',
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.webp': 'WEBP',
+}
+
+_capture_ids = itertools.count(1)
+
+
+def is_map_request(request) -> bool:
+    return request.resource_type in MAP_RESOURCE_TYPES and not request.url.startswith(('data:', 'blob:'))
+
+
+def has_pillow():
+    return importlib.util.find_spec('PIL') is not None
+
+
+def stitch_tiles(tiles, width, height, path, quality=85):
+    """
+    Paste the tiles into one image and encode it, runs in the process pool.
+
+    `tiles` are (x, y, css_width, png_bytes) with x, y relative to the region in CSS pixels,
+    tiles shot at a higher device scale factor make the whole image larger by the same factor.
+    """
+    from PIL import Image
+
+    images = [(x, y, Image.open(io.BytesIO(data))) for x, y, css_width, data in tiles]
+    scale = images[0][2].width / tiles[0][2]
+    canvas = Image.new('RGB', (round(width * scale), round(height * scale)), 'white')
+    for x, y, image in images:
+        canvas.paste(image.convert('RGB'), (round(x * scale), round(y * scale)))
+
+    image_format = IMAGE_FORMATS.get(os.path.splitext(path)[1].lower(), 'PNG')
+    options = {'optimize': True} if image_format == 'PNG' else {'quality': quality}
+    canvas.save(path, image_format, **options)
+    return path
+
+
+@dataclass
+class MapCaptureJob:
+    id: str
+    path: str
+    tiles: int
+    status: str = 'pending'  # pending, completed, failed
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+@dataclass
+class TileGrid:
+    viewport: dict  # size and scroll position of the page before the capture
+    tile_width: float
+    tile_height: float
+    positions: List[tuple]  # (x, y) of each tile relative to the region, row by row
+
+
+class MapCaptureService:
+    """
+    Large map captures in tiles.
+
+    The action only queues the capture. In the background the page is scrolled tile by tile, each tile
+    is shot once its map tiles finished loading, and stitching and encoding run in the process pool.
+    """
+
+    def __init__(self, max_tiles: int = 16, quiet: float = 0.5, settle_timeout: float = 10, quality: int = 85):
+        self.max_tiles = max_tiles
+        self.quiet = quiet
+        self.settle_timeout = settle_timeout
+        self.quality = quality
+        self.jobs = CaptureJobs()
+
+    async def capture(self, browser_context: BrowserContext, path: str, selector: Optional[str] = None) -> MapCaptureJob:
+        """Queue a capture of the map at `selector` (or the whole page) into `path`, returns once it is queued"""
+        page = await browser_context.get_current_page()
+        region = await page.evaluate(REGION_SCRIPT, selector)
+        if not region or region['width'] < 1 or region['height'] < 1:
+            raise ValueError(f"Map element {selector} not found or not visible")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        job = MapCaptureJob(id=f"map-{next(_capture_ids)}", path=path, tiles=1)
+        if not has_pillow():
+            logger.warning("Pillow is not installed, taking a single full page screenshot instead of tiles")
+            job.task = asyncio.create_task(self._finish(job, self._capture_full_page(page, path)))
+        else:
+            # a map too large for max_tiles fails the action right away, not the background job
+            grid = await self.tile_grid(page, region)
+            job.tiles = len(grid.positions)
+            job.task = asyncio.create_task(self._finish(job, self._capture_and_stitch(page, region, grid, path)))
+        self.jobs.add(browser_context, job)
+        return job
+
+    async def tile_grid(self, page: Page, region: dict) -> TileGrid:
+        """Tiles of one viewport each covering the region, raises when it needs more than max_tiles"""
+        viewport = await page.evaluate('() => ({width: window.innerWidth, height: window.innerHeight, x: window.scrollX, y: window.scrollY})')
+        tile_width = min(viewport['width'], region['width'])
+        tile_height = min(viewport['height'], region['height'])
+
+        xs = list(range(0, int(region['width']), int(tile_width))) or [0]
+        ys = list(range(0, int(region['height']), int(tile_height))) or [0]
+        if len(xs) * len(ys) > self.max_tiles:
+            raise ValueError(f"Map needs {len(xs) * len(ys)} tiles, more than max_tiles={self.max_tiles}")
+        return TileGrid(viewport, tile_width, tile_height, [(x, y) for y, x in itertools.product(ys, xs)])
+
+    async def capture_tiles(self, page: Page, region: dict, grid: Optional[TileGrid] = None):
+        """Returns (x, y, css_width, png_bytes) per tile, x and y relative to the region"""
+        grid = grid or await self.tile_grid(page, region)
+        url = page.url
+        tiles = []
+        scroll = None
+        network = NetworkIdleTracker(page, idle_time=self.quiet, relevant=is_map_request).attach()
+        try:
+            for x, y in grid.positions:
+                if page.is_closed() or page.url != url:
+                    raise RuntimeError("The page navigated away during the capture")
+                width = min(grid.tile_width, region['width'] - x)
+                height = min(grid.tile_height, region['height'] - y)
+                left, top = region['x'] + x, region['y'] + y
+                scroll = await page.evaluate(SCROLL_SCRIPT, [left, top])
+                # the scroll starts loading the map tiles, wait until they stopped coming in
+                network.mark_activity()
+                await network.wait_for_idle(self.settle_timeout)
+                # the page may not scroll all the way, or the agent scrolled it meanwhile, clip relative to where it is
+                scroll = await page.evaluate(SCROLL_POSITION_SCRIPT)
+                clip = {'x': left - scroll['x'], 'y': top - scroll['y'], 'width': width, 'height': height}
+                data = await page.screenshot(clip=clip, type='png', scale='device')
+                tiles.append((x, y, width, data))
+        finally:
+            network.detach()
+            # give the agent its scroll position back, unless it scrolled somewhere else meanwhile
+            if scroll and not page.is_closed():
+                try:
+                    if await page.evaluate(SCROLL_POSITION_SCRIPT) == scroll:
+                        await page.evaluate(SCROLL_SCRIPT, [grid.viewport['x'], grid.viewport['y']])
+                except Exception as e:
+                    logger.debug(f"Could not restore the scroll position: {e}")
+        return tiles
+
+    async def wait_for_jobs(self, browser_context: BrowserContext, timeout: float = 60) -> List[MapCaptureJob]:
+        """Wait for the queued captures of a context, returns all its jobs and forgets them"""
+        return await self.jobs.wait(browser_context, timeout=timeout)
+
+    def forget_jobs(self, browser_context: BrowserContext) -> List[MapCaptureJob]:
+        """Cancel the queued captures of a context whose task ended without waiting for them"""
+        return self.jobs.forget(browser_context)
+
+    def _write(self, path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    async def _capture_full_page(self, page: Page, path: str):
+        data = await page.screenshot(full_page=True)
+        await asyncio.to_thread(self._write, path, data)
+
+    async def _capture_and_stitch(self, page: Page, region: dict, grid: TileGrid, path: str):
+        tiles = await self.capture_tiles(page, region, grid)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            get_process_pool(), stitch_tiles, tiles, region['width'], region['height'], path, self.quality
+        )
+
+    async def _finish(self, job: MapCaptureJob, work):
+        try:
+            await work
+            job.status = 'completed'
+            print(f"✅ Map capture {job.id} saved to: {job.path}")
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            print(f"❌ Failed to save map capture {job.id}: {e}")
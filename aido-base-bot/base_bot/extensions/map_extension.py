@@ -1,12 +1,15 @@
 import asyncio
 import os
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from pydantic import BaseModel
-from browser_use.agent.views import ActionResult
 from browser_use.browser.context import BrowserContext
-from browser_use.controller.service import Controller
+from base_bot.extensions.map_capture import MapCaptureService
+
+if TYPE_CHECKING:
+    # the controller loads the agent and its LLM stack, only needed once the bot is created
+    from browser_use.controller.service import Controller
 
 
 class WebpageScreenshotParams(BaseModel):
@@ -16,6 +19,9 @@ class WebpageScreenshotParams(BaseModel):
     sensitive_data: Optional[dict] = None
     custom_control1: Optional[str] = None
     custom_control2: Optional[str] = None
+    # capture a large map in tiles, stitched in the background
+    tiled: bool = False
+    map_selector: Optional[str] = None
 
 
 # class PDFExportOptionsParams(BaseModel):
@@ -42,9 +48,21 @@ class WebpageScreenshotExtension:
         """
         
         self.bot_config = configuration
+        self.capture = MapCaptureService(**((configuration or {}).get('map_capture') or {}))
+    
+    async def wait_for_captures(self, browser_context: BrowserContext, timeout: float = 60):
+        """Wait until the tiled captures queued by an agent's context are written"""
+        jobs = await self.capture.wait_for_jobs(browser_context, timeout=timeout)
+        for job in jobs:
+            if job.status != 'completed':
+                print(f"❌ Map capture {job.path} was not saved: {job.error or 'timed out'}")
+        return jobs
     
+    def forget_captures(self, browser_context: BrowserContext):
+        """Cancel the tiled captures of an agent's context when its task was cancelled or failed"""
+        return self.capture.forget_jobs(browser_context)
         
-    def extend(self, controller: Controller) -> Controller:
+    def extend(self, controller: 'Controller') -> 'Controller':
         """
         Extend a controller with Map capabilities.
         
@@ -54,6 +72,8 @@ class WebpageScreenshotExtension:
         Returns:
             The extended controller
         """
+        from browser_use.agent.views import ActionResult
+        
         # Register the PDF export action with explicit param_model
         @controller.registry.action(
             'Export the current page as Map',
@@ -71,7 +91,7 @@ class WebpageScreenshotExtension:
             # else:
             #     print("NO CUStom cOntrOls>>>> No ZOOMINg")
             
-            downloads_path = self.bot_config.get('custom_downloads_path')
+            downloads_path = browser.config.save_downloads_path or self.bot_config.get('custom_downloads_path')
             # downloads_path = self.default_output_dir    
             
             filename = params.filename
@@ -80,6 +100,12 @@ class WebpageScreenshotExtension:
             
             path = os.path.join(downloads_path, filename)
             try:
+                if params.tiled:
+                    job = await self.capture.capture(browser, path, selector=params.map_selector)
+                    msg = f"✅ Map capture {job.id} queued ({job.tiles} tiles) to: {path}"
+                    print(msg)  # Optional console output
+                    return ActionResult(extracted_content=msg, include_in_memory=True)
+                
                 await page.screenshot(path=path)
                 msg = f"✅ Page screenshot as Map to: {downloads_path}"
                 print(msg)  # Optional console output
@@ -0,0 +1,231 @@
+import asyncio
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from playwright.async_api import Page
+from browser_use.browser.context import BrowserContext
+from browser_use.browser.watchdog import busy_page
+from base_bot.extensions.capture_jobs import CaptureJobs
+from base_bot.extensions.workers import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Returns the URL of the PDF shown by the page, null for ordinary pages
+PDF_DETECTION_SCRIPT = """() => {
+    if (document.contentType === 'application/pdf') return window.location.href;
+    const viewer = document.querySelector('embed[type="application/pdf"], object[type="application/pdf"]');
+    if (viewer) return viewer.src || viewer.data || null;
+    return null;
+}"""
+
+# Copy of the document with the live form values written into attributes: page.content() only has the markup,
+# typed text and ticked boxes are DOM properties. Password values are left out of the copy.
+SNAPSHOT_SCRIPT = """() => {
+    const copy = document.documentElement.cloneNode(true);
+    const live = document.documentElement.querySelectorAll('input, textarea, option');
+    const cloned = copy.querySelectorAll('input, textarea, option');
+    live.forEach((element, i) => {
+        const target = cloned[i];
+        if (element instanceof HTMLInputElement) {
+            if (element.type === 'checkbox' || element.type === 'radio') {
+                element.checked ? target.setAttribute('checked', '') : target.removeAttribute('checked');
+            } else if (element.type !== 'file' && element.type !== 'password') {
+                target.setAttribute('value', element.value);
+            }
+        } else if (element instanceof HTMLTextAreaElement) {
+            target.textContent = element.value;
+        } else if (element instanceof HTMLOptionElement) {
+            element.selected ? target.setAttribute('selected', '') : target.removeAttribute('selected');
+        }
+    });
+    const doctype = document.doctype ? `<!DOCTYPE ${document.doctype.name}>` : '';
+    return doctype + copy.outerHTML;
+}"""
+
+DEFAULT_PDF_OPTIONS = {
+    'format': 'A4',
+    'margin': {
+        'top': '0.4in',
+        'right': '0.4in',
+        'bottom': '0.4in',
+        'left': '0.4in',
+    }
+}
+
+
+def has_pypdf():
+    return importlib.util.find_spec('pypdf') is not None
+
+
+def compress_pdf(path):
+    """Compress content streams and drop duplicate objects, runs in the process pool"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter(clone_from=path)
+    for page in writer.pages:
+        page.compress_content_streams()
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def merge_pdfs(paths, output_path):
+    """Merge PDFs into one file in the given order, runs in the process pool"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+
+
+@dataclass
+class PDFCaptureJob:
+    path: str
+    source_url: str
+    mode: str  # 'original' when the PDF bytes were saved as served, 'render' when the page was printed
+    status: str = 'pending'  # pending, completed, failed
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class PDFCaptureService:
+    """
+    Saves pages as PDF without holding up the agent.
+
+    Pages that already are PDFs (served PDFs, Chrome's PDF viewer) are saved as the original bytes.
+    Other pages are snapshotted and printed with `page.pdf` in a cloned context in the background.
+    """
+
+    def __init__(self, pdf_options: Optional[dict] = None, compress: bool = False):
+        self.pdf_options = pdf_options or DEFAULT_PDF_OPTIONS
+        self.compress = compress
+        self.jobs = CaptureJobs()
+
+        if compress and not has_pypdf():
+            logger.warning("pypdf is not installed, captured PDFs will not be compressed")
+            self.compress = False
+
+    async def capture(self, browser_context: BrowserContext, path: str) -> PDFCaptureJob:
+        """Save the current page of the context to `path`, renders are queued and finish in the background"""
+        page = await browser_context.get_current_page()
+
+        pdf_url = await self.detect_pdf(page)
+        if pdf_url:
+            job = PDFCaptureJob(path=path, source_url=pdf_url, mode='original')
+            data = await self.fetch_pdf(page, pdf_url)
+            if data:
+                await asyncio.to_thread(self._write, path, data)
+                job.status = 'completed'
+                self.jobs.add(browser_context, job)
+                return job
+            logger.debug(f"Could not fetch original PDF from {pdf_url}, rendering the page instead")
+
+        job = PDFCaptureJob(path=path, source_url=page.url, mode='render')
+        self.jobs.add(browser_context, job)
+        if page.context.browser is None or not page.url.startswith('http'):
+            # persistent contexts cannot be cloned and blank pages cannot be reloaded - print in place
+            await self._render(job, self._print_in_place(page, path))
+            return job
+
+        # snapshot now, the agent may navigate away or close the page before the render starts
+        snapshot = await self._snapshot(page)
+        job.task = asyncio.create_task(self._render(job, self._render_in_clone(snapshot, path)))
+        return job
+
+    async def detect_pdf(self, page: Page) -> Optional[str]:
+        try:
+            return await page.evaluate(PDF_DETECTION_SCRIPT)
+        except Exception as e:
+            logger.debug(f"PDF detection failed: {e}")
+            return None
+
+    async def fetch_pdf(self, page: Page, url: str) -> Optional[bytes]:
+        """Download the PDF with the page's cookies, None if the server does not return a PDF"""
+        try:
+            response = await page.context.request.get(url)
+            data = await response.body()
+        except Exception as e:
+            logger.debug(f"Failed to fetch {url}: {e}")
+            return None
+        if not response.ok or not data.startswith(b'%PDF'):
+            return None
+        return data
+
+    async def wait_for_jobs(self, browser_context: BrowserContext, timeout: float = 60) -> List[PDFCaptureJob]:
+        """Wait for the pending renders of a context, returns all its jobs and forgets them"""
+        return await self.jobs.wait(browser_context, timeout=timeout)
+
+    def forget_jobs(self, browser_context: BrowserContext) -> List[PDFCaptureJob]:
+        """Cancel the pending renders of a context whose task ended without waiting for them"""
+        return self.jobs.forget(browser_context)
+
+    async def merge(self, paths: List[str], output_path: str) -> Optional[str]:
+        """Merge PDFs, e.g. all captures of an order, into `output_path` in a worker process"""
+        if not has_pypdf():
+            logger.warning("pypdf is not installed, cannot merge PDFs")
+            return None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_process_pool(), merge_pdfs, paths, output_path)
+        return output_path
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    async def _snapshot(self, page: Page) -> dict:
+        context = page.context
+        return {
+            'url': page.url,
+            'html': await page.evaluate(SNAPSHOT_SCRIPT),
+            'storage_state': await context.storage_state(),
+            'viewport': page.viewport_size,
+            'browser': context.browser,
+        }
+
+    async def _render(self, job: PDFCaptureJob, render):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(job.path)), exist_ok=True)
+            await render
+
+            if self.compress:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(get_process_pool(), compress_pdf, job.path)
+
+            job.status = 'completed'
+            print(f"✅ PDF rendered to: {job.path}")
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            print(f"❌ Failed to render PDF {job.path}: {e}")
+
+    async def _print_in_place(self, page: Page, path: str):
+        # large pages take long to print, the pool's watchdog must not take the page for hung
+        with busy_page(page):
+            await page.pdf(path=path, **self.pdf_options)
+
+    async def _render_in_clone(self, snapshot: dict, path: str):
+        """Print the snapshot in a separate context with the same cookies so the agent's page stays usable"""
+        # the snapshot already is the DOM the scripts built, running them again could rebuild or reset it
+        clone = await snapshot['browser'].new_context(
+            storage_state=snapshot['storage_state'], viewport=snapshot['viewport'], java_script_enabled=False
+        )
+        try:
+            clone_page = await clone.new_page()
+
+            async def serve_snapshot(route):
+                await route.fulfill(status=200, content_type='text/html; charset=utf-8', body=snapshot['html'])
+
+            # serve the DOM as the agent saw it under the original URL, so relative assets and cookies still work
+            # (matched with a predicate, a string would be read as a glob and break on '?' in query strings)
+            await clone_page.route(lambda url: url == snapshot['url'], serve_snapshot, times=1)
+            await clone_page.goto(snapshot['url'], wait_until='load')
+            with busy_page(clone_page):
+                await clone_page.pdf(path=path, **self.pdf_options)
+        finally:
+            await clone.close()
@@ -1,11 +1,14 @@
 import os
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from pydantic import BaseModel
-from browser_use.agent.views import ActionResult
 from browser_use.browser.context import BrowserContext
-from browser_use.controller.service import Controller
+from base_bot.extensions.pdf_capture import PDFCaptureService
+
+if TYPE_CHECKING:
+    # the controller loads the agent and its LLM stack, only needed once the bot is created
+    from browser_use.controller.service import Controller
 
 
 class PDFExportParams(BaseModel):
@@ -38,10 +41,24 @@ class PDFExtension:
         """
         
         self.bot_config = configuration
+        capture_config = (configuration or {}).get('pdf_capture') or {}
+        self.capture = PDFCaptureService(compress=capture_config.get('compress', False))
         # self.default_output_dir = configuration.get('downloads_path', "downloads")
         # os.makedirs(self.default_output_dir, exist_ok=True)
+    
+    async def wait_for_captures(self, browser_context: BrowserContext, timeout: float = 60):
+        """Wait until the PDFs queued by an agent's context are written, call before the task is reported done"""
+        jobs = await self.capture.wait_for_jobs(browser_context, timeout=timeout)
+        for job in jobs:
+            if job.status != 'completed':
+                print(f"❌ PDF {job.path} was not saved: {job.error or 'timed out'}")
+        return jobs
+    
+    def forget_captures(self, browser_context: BrowserContext):
+        """Cancel the PDF renders of an agent's context when its task was cancelled or failed"""
+        return self.capture.forget_jobs(browser_context)
         
-    def extend(self, controller: Controller) -> Controller:
+    def extend(self, controller: 'Controller') -> 'Controller':
         """
         Extend a controller with PDF capabilities.
         
@@ -51,6 +68,8 @@ class PDFExtension:
         Returns:
             The extended controller
         """
+        from browser_use.agent.views import ActionResult
+        
         # Register the PDF export action with explicit param_model
         @controller.registry.action(
             'Export the current page as PDF',
@@ -58,14 +77,14 @@ class PDFExtension:
         )
         async def export_to_pdf(params: PDFExportParams, browser: BrowserContext):
             """Export the current page as a PDF file."""
-            page = await browser.get_current_page()
             
             print("saving params:", params)
             # Generate path if not provided
             print("params.path: ", params.path)
             print("self.bot_config: ", self.bot_config)
-            print("self.bot_config.custom_downloads_path: ", self.bot_config.get('custom_downloads_path'))
-            path = os.path.join(self.bot_config.get('custom_downloads_path'), params.path)
+            downloads_path = browser.config.save_downloads_path or self.bot_config.get('custom_downloads_path')
+            print("downloads_path: ", downloads_path)
+            path = os.path.join(downloads_path, params.path)
             
             # if not path:
             #     page_title = await page.title()
@@ -95,22 +114,17 @@ class PDFExtension:
             # Ensure the directory exists
             # os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
             
-            # Configure PDF options
-            pdf_options = {
-                # 'printBackground': True,
-                'format': 'A4',
-                'margin': {
-                    'top': '0.4in',
-                    'right': '0.4in',
-                    'bottom': '0.4in',
-                    'left': '0.4in',
-                }
-            }
-            
             try:
-                # Export the page to PDF
-                await page.pdf(path=path, **pdf_options)
-                msg = f"✅ Page exported as PDF Standard to: {path}"
+                # PDFs are saved as served, other pages are rendered in the background so the agent can go on
+                job = await self.capture.capture(browser, path)
+                if job.status == 'failed':
+                    raise RuntimeError(job.error)
+                if job.mode == 'original':
+                    msg = f"✅ Original PDF saved to: {path}"
+                elif job.status == 'completed':
+                    msg = f"✅ Page exported as PDF Standard to: {path}"
+                else:
+                    msg = f"✅ Page queued for PDF export to: {path}"
                 print(msg)  # Optional console output
                 return ActionResult(extracted_content=msg, include_in_memory=True)
             except Exception as e:
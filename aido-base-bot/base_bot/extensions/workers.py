@@ -0,0 +1,29 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Process pool for CPU heavy post-processing of captures (PDF compression, image stitching), created on first use.
+    
+    Workers are spawned, not forked: the bot runs several threads (browser loop, tasks) and a forked
+    worker would inherit their locks in whatever state they were in.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """Stop the worker processes when the bot closes, queued jobs are dropped and a later capture starts a new pool"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
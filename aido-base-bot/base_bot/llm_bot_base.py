@@ -1,7 +1,6 @@
 import json
 import os
 from typing import Optional
-from langchain_openai import ChatOpenAI
 
 from base_bot import BaseBot
 
@@ -10,13 +9,25 @@ class LLMBotBase(BaseBot):
         
         super().__init__(options)
         
-        model = options.get('model', 'gpt-4o') if options else 'gpt-4o'
-        self.llm = ChatOpenAI(model=model)
+        self.model = options.get('model', 'gpt-4o') if options else 'gpt-4o'
+        self._llm = None
         self.prompt_json = {}
         self.is_prompt_loaded = False
      
         print('LLMBotBase initialized')
     
+    @property
+    def llm(self):
+        """Chat model of the bot, created on first use because importing langchain_openai slows down start up"""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            self._llm = ChatOpenAI(model=self.model)
+        return self._llm
+    
+    @llm.setter
+    def llm(self, llm):
+        self._llm = llm
+    
     async def analyze_image(self, instructions, encoded_image_base64=None, image_url=None):
         if image_url or encoded_image_base64:
             image_source = image_url if image_url else f"data:image/jpeg;base64,{encoded_image_base64}"
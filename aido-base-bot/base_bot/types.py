@@ -3,3 +3,6 @@ from typing import TypedDict, Optional
 class BrowserSessionConfig(TypedDict, total=False):
     annual_pdf_filename: Optional[str]
     original_json: Optional[dict]
+    downloads_path: Optional[str]
+    # tasks of the same site group share cached browser profiles, see the browser_profiles option
+    site_group: Optional[str]
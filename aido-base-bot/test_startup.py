@@ -0,0 +1,77 @@
+"""
+Startup benchmark: how long importing the bot takes, our autoscaled workers pay this on every cold start.
+
+Run it directly for a report, or with pytest to fail when the import time goes over the budget:
+
+    python test_startup.py
+    STARTUP_BUDGET_MS=400 python -m pytest test_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULE = 'base_bot.browser_client_base_bot'
+BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', 400))
+RUNS = int(os.getenv('STARTUP_RUNS', 5))
+
+# Only needed once a task runs or a feature is enabled, importing the bot must not load them
+LAZY_MODULES = ['langchain_openai', 'openai', 'posthog', 'PIL', 'markdownify', 'google.api_core', 'pypdf'] + [
+    # the agent, its controller and the LLM stack under them are imported when the bot is created or runs a task
+    'browser_use.agent.service', 'browser_use.controller.service', 'langchain_core.language_models',
+]
+
+MEASURE = f"""
+import json, sys, time
+start = time.perf_counter()
+import {MODULE}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import():
+    """Import the bot in a fresh interpreter, returns the import time in ms and the lazy modules it loaded"""
+    env = dict(os.environ, ANONYMIZED_TELEMETRY='false', OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'x'))
+    output = subprocess.run(
+        [sys.executable, '-c', MEASURE], capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['ms'], result['loaded']
+
+
+def slowest_imports(count=10):
+    """Top imports by cumulative time from `python -X importtime`"""
+    env = dict(os.environ, ANONYMIZED_TELEMETRY='false', OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'x'))
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {MODULE}'], capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def test_lazy_modules_are_not_imported():
+    _, loaded = measure_import()
+    assert loaded == [], f'{MODULE} imports {loaded} at start up'
+
+
+def test_import_time_within_budget():
+    # median of several runs, the first one also pays for a cold disk cache
+    median = statistics.median(measure_import()[0] for _ in range(RUNS))
+    assert median <= BUDGET_MS, f'Importing {MODULE} took {median:.0f} ms, budget is {BUDGET_MS:.0f} ms'
+
+
+if __name__ == '__main__':
+    timings = [measure_import()[0] for _ in range(RUNS)]
+    print(f'{MODULE}: median {statistics.median(timings):.0f} ms over {RUNS} runs (budget {BUDGET_MS:.0f} ms)')
+    print('Slowest imports (cumulative ms):')
+    for ms, name in slowest_imports():
+        print(f'  {ms:8.1f}  {name}')
@@ -1,17 +1,45 @@
+from typing import TYPE_CHECKING
+
 from browser_use.logging_config import setup_logging
 
 setup_logging()
 
-from browser_use.agent.prompts import SystemPrompt as SystemPrompt
-from browser_use.agent.service import Agent as Agent
-from browser_use.agent.views import ActionModel as ActionModel
-from browser_use.agent.views import ActionResult as ActionResult
-from browser_use.agent.views import AgentHistoryList as AgentHistoryList
-from browser_use.browser.browser import Browser as Browser
-from browser_use.browser.browser import BrowserConfig as BrowserConfig
-from browser_use.browser.context import BrowserContextConfig
-from browser_use.controller.service import Controller as Controller
-from browser_use.dom.service import DomService as DomService
+if TYPE_CHECKING:
+	from browser_use.agent.prompts import SystemPrompt as SystemPrompt
+	from browser_use.agent.service import Agent as Agent
+	from browser_use.agent.views import ActionModel as ActionModel
+	from browser_use.agent.views import ActionResult as ActionResult
+	from browser_use.agent.views import AgentHistoryList as AgentHistoryList
+	from browser_use.browser.browser import Browser as Browser
+	from browser_use.browser.browser import BrowserConfig as BrowserConfig
+	from browser_use.browser.context import BrowserContextConfig
+	from browser_use.controller.service import Controller as Controller
+	from browser_use.dom.service import DomService as DomService
+
+# Exports are imported on first access, `import browser_use` alone does not load the agent and its LLM stack
+_LAZY_IMPORTS = {
+	'Agent': 'browser_use.agent.service',
+	'Browser': 'browser_use.browser.browser',
+	'BrowserConfig': 'browser_use.browser.browser',
+	'Controller': 'browser_use.controller.service',
+	'DomService': 'browser_use.dom.service',
+	'SystemPrompt': 'browser_use.agent.prompts',
+	'ActionResult': 'browser_use.agent.views',
+	'ActionModel': 'browser_use.agent.views',
+	'AgentHistoryList': 'browser_use.agent.views',
+	'BrowserContextConfig': 'browser_use.browser.context',
+}
+
+
+def __getattr__(name: str):
+	if name not in _LAZY_IMPORTS:
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+	import importlib
+
+	value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+	globals()[name] = value
+	return value
+
 
 __all__ = [
 	'Agent',
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from typing import Optional
+
+from browser_use.agent.checkpoint.views import AgentCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+	"""Stores one checkpoint file per checkpoint id in a local directory"""
+
+	def __init__(self, directory: str):
+		self.directory = directory
+
+	def path(self, checkpoint_id: str) -> str:
+		# ids are usually order numbers, keep them readable but safe as file names
+		filename = re.sub(r'[^A-Za-z0-9._-]', '_', checkpoint_id)
+		return os.path.join(self.directory, f'{filename}.json')
+
+	def save(self, checkpoint: AgentCheckpoint) -> None:
+		"""Write the checkpoint atomically so a crash mid-write keeps the previous one"""
+		os.makedirs(self.directory, exist_ok=True)
+		path = self.path(checkpoint.checkpoint_id)
+		tmp_path = f'{path}.tmp'
+		# checkpoints may hold cookies and auth tokens, only the owner may read them
+		with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+			f.write(checkpoint.model_dump_json())
+		os.replace(tmp_path, path)
+
+	def load(self, checkpoint_id: str) -> Optional[AgentCheckpoint]:
+		path = self.path(checkpoint_id)
+		if not os.path.exists(path):
+			return None
+		try:
+			with open(path, 'r', encoding='utf-8') as f:
+				return AgentCheckpoint.model_validate(json.load(f))
+		except Exception as e:
+			logger.warning(f'Ignoring unreadable checkpoint {path}: {e}')
+			return None
+
+	def delete(self, checkpoint_id: str) -> None:
+		try:
+			os.remove(self.path(checkpoint_id))
+		except FileNotFoundError:
+			pass
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from browser_use.agent.checkpoint.service import CheckpointStore
+from browser_use.agent.checkpoint.views import AgentCheckpoint, CheckpointSettings
+from browser_use.agent.service import Agent
+from browser_use.agent.views import ActionResult, AgentHistory
+from browser_use.browser.browser import Browser
+from browser_use.browser.views import BrowserStateHistory
+from browser_use.controller.service import Controller
+
+
+class FakeLLM(BaseChatModel):
+	@property
+	def _llm_type(self) -> str:
+		return 'fake'
+
+	def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+		return ChatResult(generations=[ChatGeneration(message=AIMessage(content=''))])
+
+
+def make_agent(tmp_path, task='Download the annual report', **kwargs) -> Agent:
+	return Agent(
+		task=task,
+		llm=FakeLLM(),
+		browser=Browser(),
+		controller=Controller(),
+		tool_calling_method='raw',
+		checkpoint=CheckpointSettings(directory=str(tmp_path), checkpoint_id='order/42', **kwargs),
+	)
+
+
+def test_store_round_trip(tmp_path):
+	store = CheckpointStore(str(tmp_path))
+	assert store.load('order/42') is None
+
+	store.save(AgentCheckpoint(checkpoint_id='order/42', task='task', n_steps=3, state={}, history={'history': []}))
+	assert store.path('order/42').endswith('order_42.json')
+	assert store.load('order/42').n_steps == 3
+
+	store.delete('order/42')
+	assert store.load('order/42') is None
+
+
+@pytest.mark.asyncio
+async def test_agent_resumes_from_checkpoint(tmp_path):
+	agent = make_agent(tmp_path)
+	agent.state.n_steps = 23
+	agent.state.last_result = [ActionResult(extracted_content='clicked')]
+	agent._message_manager._add_message_with_tokens(HumanMessage(content='remember me'))
+	message_count = len(agent._message_manager.get_messages())
+	await agent.save_checkpoint()
+
+	resumed = make_agent(tmp_path)
+	assert await resumed.resume_from_checkpoint()
+	assert resumed.state.n_steps == 23
+	assert resumed.state.agent_id == agent.state.agent_id
+	assert len(resumed._message_manager.get_messages()) == message_count
+	assert resumed._message_manager.get_messages()[-1].content == 'remember me'
+	assert 'resumed after step 22' in resumed.state.last_result[0].extracted_content
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_of_other_task_is_ignored(tmp_path):
+	agent = make_agent(tmp_path)
+	await agent.save_checkpoint()
+
+	assert not await make_agent(tmp_path, task='Something else').resume_from_checkpoint()
+
+
+def add_step(agent: Agent, result: ActionResult) -> None:
+	state = BrowserStateHistory(url='https://example.com', title='Example', tabs=[], interacted_element=[None], screenshot='aW1hZ2U=')
+	agent.state.history.history.append(AgentHistory(model_output=None, result=[result], state=state))
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_leaves_out_screenshots(tmp_path):
+	agent = make_agent(tmp_path)
+	add_step(agent, ActionResult(extracted_content='clicked'))
+	await agent.save_checkpoint()
+
+	resumed = make_agent(tmp_path)
+	assert await resumed.resume_from_checkpoint()
+	assert [item.state.screenshot for item in resumed.state.history.history] == [None]
+	assert agent.state.history.history[0].state.screenshot == 'aW1hZ2U='
+
+
+@pytest.mark.asyncio
+async def test_finished_run_is_not_resumed(tmp_path):
+	agent = make_agent(tmp_path, delete_on_success=False)
+	add_step(agent, ActionResult(is_done=True, success=False, extracted_content='not found'))
+	await agent.save_checkpoint()
+
+	assert CheckpointStore(str(tmp_path)).load('order/42').is_done
+	assert not await make_agent(tmp_path).resume_from_checkpoint()
+
+
+@pytest.mark.asyncio
+async def test_storage_state_is_opt_in_and_checkpoint_private(tmp_path):
+	agent = make_agent(tmp_path)
+	await agent.save_checkpoint()
+
+	store = CheckpointStore(str(tmp_path))
+	assert store.load('order/42').storage_state is None
+	assert os.stat(store.path('order/42')).st_mode & 0o777 == 0o600
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CheckpointSettings(BaseModel):
+	"""Options for checkpointing an agent run
+
+	After every successful step the agent state and the current URL are written to `directory` under
+	`checkpoint_id`. A later run with the same id resumes from there instead of repeating every step.
+	With `save_storage_state` the browser storage (cookies, localStorage) is written as well, so the
+	directory then holds session credentials in plain JSON.
+	"""
+
+	directory: str
+	checkpoint_id: str
+	resume: bool = True
+	# cookies and localStorage, i.e. logins and auth tokens, are only saved when asked for
+	save_storage_state: bool = False
+	# a finished task starts fresh when it is run again
+	delete_on_success: bool = True
+
+
+class AgentCheckpoint(BaseModel):
+	"""Snapshot of an agent run after a successful step"""
+
+	checkpoint_id: str
+	task: str
+	n_steps: int
+	# a finished run is never resumed, running its task again starts fresh
+	is_done: bool = False
+	url: Optional[str] = None
+	# AgentState without history, see Agent.save_checkpoint
+	state: dict[str, Any]
+	# AgentHistoryList without screenshots
+	history: dict[str, Any]
+	# Playwright storage state: {'cookies': [...], 'origins': [{'origin': ..., 'localStorage': [...]}]}
+	storage_state: Optional[dict[str, Any]] = None
+	created_at: float = Field(default_factory=time.time)
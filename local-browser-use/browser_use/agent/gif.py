@@ -100,12 +100,13 @@ def create_history_gif(
 		images.append(task_frame)
 
 	# Process each history item
-	for i, item in enumerate(history.history, 1):
-		if not item.state.screenshot:
+	screenshots = history.screenshots()
+	for i, (item, screenshot) in enumerate(zip(history.history, screenshots), 1):
+		if not screenshot:
 			continue
 
 		# Convert base64 screenshot to PIL Image
-		img_data = base64.b64decode(item.state.screenshot)
+		img_data = base64.b64decode(screenshot)
 		image = Image.open(io.BytesIO(img_data))
 
 		if show_goals and item.model_output:
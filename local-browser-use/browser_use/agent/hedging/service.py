@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from browser_use.agent.hedging.views import HedgingSettings, HedgingStats
+from browser_use.utils import singleton
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def get_model_name(llm: Any) -> str:
+	"""Best effort name of the model behind a chat model instance"""
+	for attribute in ('model_name', 'model'):
+		model = getattr(llm, attribute, None)
+		if model:
+			return str(model)
+	return llm.__class__.__name__
+
+
+@singleton
+class LatencyTracker:
+	"""
+	Process-wide rolling window of successful LLM call latencies per model.
+
+	Shared by all agents so the hedge threshold keeps adapting across tasks.
+	"""
+
+	def __init__(self, window_size: int = 200) -> None:
+		self.window_size = window_size
+		self._samples: dict[str, deque[float]] = {}
+		self._lock = threading.Lock()
+
+	def record(self, model: str, seconds: float) -> None:
+		with self._lock:
+			samples = self._samples.get(model)
+			if samples is None:
+				samples = self._samples[model] = deque(maxlen=self.window_size)
+			samples.append(seconds)
+
+	def count(self, model: str) -> int:
+		with self._lock:
+			return len(self._samples.get(model, ()))
+
+	def percentile(self, model: str, percentile: float) -> Optional[float]:
+		"""Nearest-rank percentile (0-1) of the recorded latencies, None if nothing was recorded yet"""
+		with self._lock:
+			samples = sorted(self._samples.get(model, ()))
+		if not samples:
+			return None
+		rank = min(max(math.ceil(percentile * len(samples)) - 1, 0), len(samples) - 1)
+		return samples[rank]
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+	# a losing request that failed is not worth a "Task exception was never retrieved" warning
+	if not task.cancelled():
+		task.exception()
+
+
+class LLMHedger:
+	"""
+	Runs LLM calls with an adaptive hedge request to cut tail latency.
+
+	One hedger can be shared by all agents of a process, e.g. a bot's, so the budget caps the extra spend of all of them.
+	"""
+
+	def __init__(self, settings: HedgingSettings, tracker: Optional[LatencyTracker] = None):
+		self.settings = settings
+		self.tracker = tracker or LatencyTracker()
+		self.stats = HedgingStats()
+		# agents of a bot run on several event loops
+		self._lock = threading.Lock()
+
+	def hedge_delay(self, model: str) -> float:
+		"""Seconds to wait for `model` before firing the hedge request"""
+		delay = None
+		if self.tracker.count(model) >= self.settings.min_samples:
+			delay = self.tracker.percentile(model, self.settings.percentile)
+		if delay is None:
+			delay = self.settings.default_hedge_delay
+		return min(max(delay, self.settings.min_hedge_delay), self.settings.max_hedge_delay)
+
+	def _consume_budget(self) -> bool:
+		with self._lock:
+			allowed = self.settings.budget_burst + self.settings.budget_ratio * self.stats.calls
+			if self.stats.hedges_fired + 1 > allowed:
+				self.stats.hedges_denied_by_budget += 1
+				return False
+			self.stats.hedges_fired += 1
+			return True
+
+	async def ainvoke(self, call: Callable[[BaseChatModel], Awaitable[T]], llm: BaseChatModel) -> T:
+		"""
+		Await `call(llm)`, hedged by `call(fallback_llm or llm)` once the call is slower than usual.
+
+		The first successful response is returned and the other request is cancelled.
+		If both fail, the first error is raised.
+		"""
+		if not self.settings.enabled:
+			return await call(llm)
+
+		with self._lock:
+			self.stats.calls += 1
+		primary_model = get_model_name(llm)
+		delay = self.hedge_delay(primary_model)
+
+		# task -> (model, start time, is hedge)
+		contenders: dict[asyncio.Future, tuple[str, float, bool]] = {}
+		primary = asyncio.ensure_future(call(llm))
+		contenders[primary] = (primary_model, time.monotonic(), False)
+
+		try:
+			done, _ = await asyncio.wait({primary}, timeout=delay)
+			if not done:
+				if self._consume_budget():
+					hedge_llm = self.settings.fallback_llm or llm
+					hedge_model = get_model_name(hedge_llm)
+					logger.info(f'⏱️  No response from {primary_model} after {delay:.1f}s - sending hedge request to {hedge_model}')
+					hedge = asyncio.ensure_future(call(hedge_llm))
+					contenders[hedge] = (hedge_model, time.monotonic(), True)
+				else:
+					logger.debug(f'Hedge budget exhausted - waiting for {primary_model}')
+			return await self._first_success(contenders)
+		finally:
+			for task, (model, start, is_hedge) in contenders.items():
+				if not task.done():
+					task.cancel()
+					task.add_done_callback(_retrieve_exception)
+					if not is_hedge:
+						# the primary lost the race - its latency is at least this long
+						self.tracker.record(model, time.monotonic() - start)
+				else:
+					# a loser may have failed in the same round as the winner answered
+					_retrieve_exception(task)
+
+	async def _first_success(self, contenders: dict[asyncio.Future, tuple[str, float, bool]]) -> Any:
+		first_error: Optional[BaseException] = None
+		pending = set(contenders)
+		while pending:
+			done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+			for task in done:
+				model, start, is_hedge = contenders[task]
+				error = task.exception()
+				if error is not None:
+					logger.debug(f'LLM request to {model} failed: {error}')
+					first_error = first_error or error
+					continue
+
+				self.tracker.record(model, time.monotonic() - start)
+				if is_hedge:
+					with self._lock:
+						self.stats.hedges_won += 1
+					logger.info(f'⏱️  Hedge request to {model} answered first')
+				return task.result()
+
+		assert first_error is not None
+		raise first_error
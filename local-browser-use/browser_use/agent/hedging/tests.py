@@ -0,0 +1,150 @@
+import asyncio
+import uuid
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+from browser_use.agent.hedging.service import LatencyTracker, LLMHedger
+from browser_use.agent.hedging.views import HedgingSettings
+
+
+class FakeLLM(BaseChatModel):
+	model_name: str = Field(default_factory=lambda: f'fake-{uuid.uuid4()}')
+	delay: float = 0
+	answer: str = ''
+	fail: bool = False
+	cancelled: bool = False
+
+	@property
+	def _llm_type(self) -> str:
+		return 'fake'
+
+	def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+		return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+	async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+		try:
+			await asyncio.sleep(self.delay)
+		except asyncio.CancelledError:
+			self.cancelled = True
+			raise
+		if self.fail:
+			raise RuntimeError(f'{self.answer} failed')
+		return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+
+async def ask(llm: BaseChatModel) -> str:
+	response = await llm.ainvoke('question')
+	return str(response.content)
+
+
+def make_settings(fallback=None, **kwargs) -> HedgingSettings:
+	kwargs.setdefault('default_hedge_delay', 0.05)
+	kwargs.setdefault('min_hedge_delay', 0.01)
+	return HedgingSettings(fallback_llm=fallback, **kwargs)
+
+
+def test_latency_tracker_percentile():
+	tracker = LatencyTracker()
+	model = f'model-{uuid.uuid4()}'
+	assert tracker.percentile(model, 0.95) is None
+
+	for seconds in range(1, 101):
+		tracker.record(model, float(seconds))
+
+	assert tracker.count(model) == 100
+	assert tracker.percentile(model, 0.95) == 95.0
+	assert tracker.percentile(model, 0.5) == 50.0
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+	llm = FakeLLM(delay=0, answer='primary')
+	hedger = LLMHedger(make_settings())
+
+	assert await hedger.ainvoke(ask, llm) == 'primary'
+	assert hedger.stats.calls == 1
+	assert hedger.stats.hedges_fired == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled():
+	slow = FakeLLM(delay=5, answer='primary')
+	fallback = FakeLLM(delay=0, answer='fallback')
+	hedger = LLMHedger(make_settings(fallback=fallback))
+
+	assert await hedger.ainvoke(ask, slow) == 'fallback'
+	await asyncio.sleep(0)
+	assert slow.cancelled
+	assert hedger.stats.hedges_fired == 1
+	assert hedger.stats.hedges_won == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_primary():
+	slow = FakeLLM(delay=0.2, answer='primary')
+	fallback = FakeLLM(delay=0, answer='fallback', fail=True)
+	hedger = LLMHedger(make_settings(fallback=fallback))
+
+	assert await hedger.ainvoke(ask, slow) == 'primary'
+	assert hedger.stats.hedges_won == 0
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_hedges():
+	fallback = FakeLLM(delay=0, answer='fallback')
+	hedger = LLMHedger(make_settings(fallback=fallback, budget_ratio=0.0, budget_burst=1))
+
+	results = [await hedger.ainvoke(ask, FakeLLM(delay=0.1, answer='primary')) for _ in range(3)]
+
+	assert results == ['fallback', 'primary', 'primary']
+	assert hedger.stats.hedges_fired == 1
+	assert hedger.stats.hedges_denied_by_budget == 2
+
+
+@pytest.mark.asyncio
+async def test_hedge_failing_with_the_winner_is_retrieved():
+	release = asyncio.Event()
+	fallback = FakeLLM(answer='fallback')
+	primary = FakeLLM(answer='primary')
+
+	async def call(llm):
+		await release.wait()
+		if llm is fallback:
+			raise RuntimeError('hedge failed')
+		return 'primary'
+
+	async def release_later():
+		# both requests finish in the same round, after the hedge was fired
+		await asyncio.sleep(0.1)
+		release.set()
+
+	hedger = LLMHedger(make_settings(fallback=fallback))
+	unretrieved = []
+	asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+	releaser = asyncio.create_task(release_later())
+
+	assert await hedger.ainvoke(call, primary) == 'primary'
+	await releaser
+	assert hedger.stats.hedges_fired == 1
+
+	import gc
+
+	gc.collect()
+	await asyncio.sleep(0)
+	assert unretrieved == []
+
+
+@pytest.mark.asyncio
+async def test_shared_hedger_keeps_one_budget():
+	fallback = FakeLLM(delay=0, answer='fallback')
+	hedger = LLMHedger(make_settings(fallback=fallback, budget_ratio=0.0, budget_burst=1))
+
+	# two agents sharing the hedger, only the first slow call may be hedged
+	results = await asyncio.gather(hedger.ainvoke(ask, FakeLLM(delay=0.3, answer='a')), hedger.ainvoke(ask, FakeLLM(delay=0.3, answer='b')))
+
+	assert results.count('fallback') == 1
+	assert hedger.stats.hedges_denied_by_budget == 1
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from pydantic import BaseModel, ConfigDict
+
+
+class HedgingSettings(BaseModel):
+	"""Options for hedged LLM requests
+
+	If a model call has not returned after the `percentile` latency of recent calls to the same model,
+	a duplicate request is fired (to `fallback_llm` if given, otherwise to the same model).
+	The first response wins and the other request is cancelled.
+	"""
+
+	enabled: bool = True
+	percentile: float = 0.95
+	min_samples: int = 10  # below this many samples `default_hedge_delay` is used
+	default_hedge_delay: float = 20.0
+	min_hedge_delay: float = 2.0
+	max_hedge_delay: float = 60.0
+	# at most this fraction of calls may fire a hedge request (caps the extra spend)
+	budget_ratio: float = 0.1
+	# number of hedges allowed before the ratio applies, so early slow calls can be hedged
+	budget_burst: int = 2
+	fallback_llm: Optional[BaseChatModel] = None
+
+	model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class HedgingStats(BaseModel):
+	"""Counters of one hedger"""
+
+	calls: int = 0
+	hedges_fired: int = 0
+	hedges_won: int = 0
+	hedges_denied_by_budget: int = 0
+
+	@property
+	def extra_spend_ratio(self) -> float:
+		"""Fraction of calls that caused a second request"""
+		return self.hedges_fired / self.calls if self.calls else 0.0
@@ -113,8 +113,9 @@ class MessageManager:
 		result: Optional[List[ActionResult]] = None,
 		step_info: Optional[AgentStepInfo] = None,
 		use_vision=True,
+		repeated_screenshot_step: Optional[int] = None,
 	) -> None:
-		"""Add browser state as human message"""
+		"""Add browser state as human message, without the screenshot if it repeats the one of `repeated_screenshot_step`"""
 
 		# if keep in memory, add to directly to history and add state without result
 		if result:
@@ -139,6 +140,7 @@ class MessageManager:
 			result,
 			include_attributes=self.settings.include_attributes,
 			step_info=step_info,
+			repeated_screenshot_step=repeated_screenshot_step,
 		).get_user_message(use_vision)
 		self._add_message_with_tokens(state_message)
 
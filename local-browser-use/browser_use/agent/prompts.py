@@ -67,11 +67,13 @@ class AgentMessagePrompt:
 		result: Optional[List['ActionResult']] = None,
 		include_attributes: list[str] = [],
 		step_info: Optional['AgentStepInfo'] = None,
+		repeated_screenshot_step: Optional[int] = None,
 	):
 		self.state = state
 		self.result = result
 		self.include_attributes = include_attributes
 		self.step_info = step_info
+		self.repeated_screenshot_step = repeated_screenshot_step
 
 	def get_user_message(self, use_vision: bool = True) -> HumanMessage:
 		elements_text = self.state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)
@@ -123,14 +125,19 @@ Interactive elements from top layer of the current page inside the viewport:
 					error = result.error.split('\n')[-1]
 					state_description += f'\nAction error {i + 1}/{len(self.result)}: ...{error}'
 
-		if self.state.screenshot and use_vision == True:
+		if self.state.screenshot and use_vision == True and self.repeated_screenshot_step is not None:
+			state_description += (
+				f'\nScreenshot: the page looks the same as in the screenshot of step {self.repeated_screenshot_step}, '
+				'it is not attached again'
+			)
+		elif self.state.screenshot and use_vision == True:
 			# Format message for vision model
 			return HumanMessage(
 				content=[
 					{'type': 'text', 'text': state_description},
 					{
 						'type': 'image_url',
-						'image_url': {'url': f'data:image/png;base64,{self.state.screenshot}'},  # , 'detail': 'low'
+						'image_url': {'url': f'data:{self.state.screenshot_mime_type};base64,{self.state.screenshot}'},  # , 'detail': 'low'
 					},
 				]
 			)
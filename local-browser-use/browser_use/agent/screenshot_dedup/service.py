@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import logging
+from typing import Optional
+
+from browser_use.agent.screenshot_dedup.views import DuplicateScreenshot, ScreenshotDedupSettings, ScreenshotDedupStats
+
+logger = logging.getLogger(__name__)
+
+
+def perceptual_hash(screenshot: str, hash_size: int = 16) -> int:
+	"""
+	Difference hash of a base64 screenshot: one bit per pair of neighbouring pixels in a tiny grayscale copy,
+	set when the left one is brighter. Re-encoding, anti-aliasing and blinking carets barely move it.
+	"""
+	from PIL import Image
+
+	image = Image.open(io.BytesIO(base64.b64decode(screenshot)))
+	# jpeg decodes at a fraction of the size directly
+	image.draft('L', (hash_size * 8, hash_size * 8))
+	pixels = list(image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).getdata())
+
+	bits = 0
+	for row in range(hash_size):
+		offset = row * (hash_size + 1)
+		for column in range(hash_size):
+			bits = (bits << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+	return bits
+
+
+class ScreenshotDeduplicator:
+	"""Decides per step whether a screenshot repeats the last one the model and the history got"""
+
+	def __init__(self, settings: ScreenshotDedupSettings, image_tokens: int = 0):
+		self.settings = settings
+		self.image_tokens = image_tokens
+		self.stats = ScreenshotDedupStats()
+		self._reference: Optional[tuple[int, DuplicateScreenshot]] = None
+		self._skips = 0
+		self._pillow_missing = False
+
+	async def check(self, screenshot: Optional[str], step: int, history_index: int, sent: bool = True) -> Optional[DuplicateScreenshot]:
+		"""
+		The step and history index an equal screenshot was kept at, None if this one has to be kept.
+		`sent` tells whether the screenshot would go to the model, only then tokens are saved.
+		"""
+		if not screenshot or self._pillow_missing:
+			return None
+		self.stats.screenshots += 1
+		try:
+			# decoding a full screenshot takes a few ms, other agents on the loop keep running meanwhile
+			screenshot_hash = await asyncio.to_thread(perceptual_hash, screenshot, self.settings.hash_size)
+		except ImportError:
+			logger.warning('Pillow is not installed, screenshots are not deduplicated')
+			self._pillow_missing = True
+			return None
+		except Exception as e:
+			logger.debug(f'Failed to hash screenshot, keeping it: {e}')
+			self._reference = None
+			return None
+
+		# only repeats left out of the prompt count as skips, the model gets the others anyway
+		skipped = sent and self.settings.skip_in_prompt
+		if self._reference and not (skipped and self._skips >= self.settings.max_skips):
+			reference_hash, reference = self._reference
+			if bin(screenshot_hash ^ reference_hash).count('1') <= self.settings.threshold:
+				self.stats.duplicates += 1
+				self.stats.bytes_saved += len(screenshot)
+				if skipped:
+					self._skips += 1
+					self.stats.tokens_saved += self.image_tokens
+				logger.debug(f'Screenshot of step {step} repeats step {reference.step}, not stored again')
+				return reference
+
+		self._reference = (screenshot_hash, DuplicateScreenshot(step=step, history_index=history_index))
+		self._skips = 0
+		return None
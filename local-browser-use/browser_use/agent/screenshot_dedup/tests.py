@@ -0,0 +1,121 @@
+import base64
+import io
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from browser_use.agent.screenshot_dedup.service import ScreenshotDeduplicator, perceptual_hash
+from browser_use.agent.screenshot_dedup.views import ScreenshotDedupSettings
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentHistory, AgentHistoryList
+from browser_use.browser.browser import Browser
+from browser_use.browser.views import BrowserState, BrowserStateHistory
+from browser_use.controller.service import Controller
+from browser_use.dom.views import DOMElementNode
+
+def screenshot(boxes: list[tuple[int, int, int, int]], image_format: str = 'PNG') -> str:
+	Image = pytest.importorskip('PIL.Image')
+	ImageDraw = pytest.importorskip('PIL.ImageDraw')
+
+	image = Image.new('RGB', (640, 480), 'white')
+	draw = ImageDraw.Draw(image)
+	for box in boxes:
+		draw.rectangle(box, fill='black')
+	buffer = io.BytesIO()
+	image.save(buffer, format=image_format)
+	return base64.b64encode(buffer.getvalue()).decode()
+
+
+PAGE = [(40, 40, 600, 100), (40, 200, 300, 440)]
+OTHER_PAGE = [(300, 40, 600, 440)]
+
+
+def test_hash_ignores_reencoding_but_not_layout():
+	png = perceptual_hash(screenshot(PAGE))
+	jpeg = perceptual_hash(screenshot(PAGE, 'JPEG'))
+	other = perceptual_hash(screenshot(OTHER_PAGE))
+
+	assert bin(png ^ jpeg).count('1') <= 3
+	assert bin(png ^ other).count('1') > 30
+
+
+@pytest.mark.asyncio
+async def test_repeated_screenshots_point_to_the_kept_one():
+	dedup = ScreenshotDeduplicator(ScreenshotDedupSettings(max_skips=2), image_tokens=800)
+	page = screenshot(PAGE)
+
+	assert await dedup.check(page, step=1, history_index=0) is None
+	repeat = await dedup.check(page, step=2, history_index=1)
+	assert (repeat.step, repeat.history_index) == (1, 0)
+	repeat = await dedup.check(page, step=3, history_index=2)
+	assert (repeat.step, repeat.history_index) == (1, 0)
+	# after max_skips the repeat is sent and kept again
+	assert await dedup.check(page, step=4, history_index=3) is None
+	# without vision nothing is skipped in the prompt, repeats are only stored once
+	repeat = await dedup.check(page, step=5, history_index=4, sent=False)
+	assert (repeat.step, repeat.history_index) == (4, 3)
+	assert await dedup.check(screenshot(OTHER_PAGE), step=6, history_index=5) is None
+
+	assert dedup.stats.duplicates == 3
+	assert dedup.stats.tokens_saved == 2 * 800
+	assert dedup.stats.bytes_saved == 3 * len(page)
+
+
+def test_history_resolves_screenshot_pointers():
+	def item(screenshot=None, screenshot_ref=None):
+		state = BrowserStateHistory(
+			url='https://county.gov/', title='', tabs=[], interacted_element=[None], screenshot=screenshot, screenshot_ref=screenshot_ref
+		)
+		return AgentHistory(model_output=None, result=[], state=state)
+
+	history = AgentHistoryList(history=[item('first'), item(screenshot_ref=0), item('second')])
+
+	assert history.screenshots() == ['first', 'first', 'second']
+	assert history.history[1].state.to_dict()['screenshot_ref'] == 0
+
+
+class IdleLLM(BaseChatModel):
+	@property
+	def _llm_type(self) -> str:
+		return 'idle'
+
+	def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+		return ChatResult(generations=[ChatGeneration(message=AIMessage(content=''))])
+
+
+@pytest.mark.asyncio
+async def test_agent_leaves_repeats_out_of_the_prompt_and_stores_them_once():
+	page = screenshot(PAGE)
+	agent = Agent(
+		task='task',
+		llm=IdleLLM(),
+		browser=Browser(),
+		controller=Controller(),
+		tool_calling_method='raw',
+		screenshot_dedup=ScreenshotDedupSettings(),
+	)
+
+	async def get_state(*args, **kwargs):
+		element_tree = DOMElementNode(tag_name='body', xpath='', attributes={}, children=[], is_visible=True, parent=None)
+		return BrowserState(element_tree=element_tree, selector_map={}, url='https://county.gov/', title='', tabs=[], screenshot=page)
+
+	sent_images = []
+	sent_texts = []
+
+	async def get_next_action(input_messages):
+		content = input_messages[-1].content
+		parts = content if isinstance(content, list) else [{'type': 'text', 'text': content}]
+		sent_images.append([part['image_url']['url'] for part in parts if part['type'] == 'image_url'])
+		sent_texts.append(''.join(part['text'] for part in parts if part['type'] == 'text'))
+		raise RuntimeError('no model in this test')
+
+	agent.browser_context.get_state = get_state
+	agent.get_next_action = get_next_action
+	await agent.step()
+	await agent.step()
+
+	assert sent_images == [[f'data:image/png;base64,{page}'], []]
+	assert 'the same as in the screenshot of step 1' in sent_texts[1]
+	assert [(item.state.screenshot, item.state.screenshot_ref) for item in agent.state.history.history] == [(page, None), (None, 0)]
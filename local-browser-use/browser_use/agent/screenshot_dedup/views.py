@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class ScreenshotDedupSettings(BaseModel):
+	"""Options for skipping near-identical screenshots across steps
+
+	A screenshot whose perceptual hash differs from the last kept screenshot by at most `threshold` bits
+	is stored as a pointer to the history item holding that screenshot instead of another copy.
+	With `skip_in_prompt` it is not sent to the model again either, the state message names the step it repeats.
+	"""
+
+	enabled: bool = True
+	# the hash has hash_size² bits, larger sizes notice smaller changes
+	hash_size: int = 16
+	threshold: int = 3
+	skip_in_prompt: bool = True
+	# after this many skipped screenshots in a row the next one is sent anyway, so the model never works blind for long
+	max_skips: int = 3
+
+
+class DuplicateScreenshot(BaseModel):
+	"""A screenshot that repeats an earlier one"""
+
+	step: int
+	history_index: int
+
+
+class ScreenshotDedupStats(BaseModel):
+	"""Counters of one deduplicator"""
+
+	screenshots: int = 0
+	duplicates: int = 0
+	tokens_saved: int = 0
+	bytes_saved: int = 0
+
+	@property
+	def duplicate_ratio(self) -> float:
+		return self.duplicates / self.screenshots if self.screenshots else 0.0
+
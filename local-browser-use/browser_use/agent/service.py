@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import json
 import logging
 import re
@@ -20,6 +21,12 @@ from langchain_core.messages import (
 from pydantic import BaseModel, ValidationError
 
 from browser_use.agent.gif import create_history_gif
+from browser_use.agent.checkpoint.service import CheckpointStore
+from browser_use.agent.checkpoint.views import AgentCheckpoint, CheckpointSettings
+from browser_use.agent.hedging.service import LLMHedger
+from browser_use.agent.hedging.views import HedgingSettings
+from browser_use.agent.screenshot_dedup.service import ScreenshotDeduplicator
+from browser_use.agent.screenshot_dedup.views import DuplicateScreenshot, ScreenshotDedupSettings
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
 from browser_use.agent.message_manager.utils import convert_input_messages, extract_json_from_model_output, save_conversation
 from browser_use.agent.prompts import AgentMessagePrompt, PlannerPrompt, SystemPrompt
@@ -34,6 +41,7 @@ from browser_use.agent.views import (
 	AgentStepInfo,
 	StepMetadata,
 	ToolCallingMethod,
+	is_rate_limit_error,
 )
 from browser_use.browser.browser import Browser
 from browser_use.browser.context import BrowserContext
@@ -124,6 +132,10 @@ class Agent(Generic[Context]):
 		page_extraction_llm: Optional[BaseChatModel] = None,
 		planner_llm: Optional[BaseChatModel] = None,
 		planner_interval: int = 1,  # Run planner every N steps
+		hedging: Optional[HedgingSettings] = None,
+		hedger: Optional[LLMHedger] = None,
+		checkpoint: Optional[CheckpointSettings] = None,
+		screenshot_dedup: Optional[ScreenshotDedupSettings] = None,
 		# Inject state
 		injected_agent_state: Optional[AgentState] = None,
 		#
@@ -158,6 +170,9 @@ class Agent(Generic[Context]):
 			page_extraction_llm=page_extraction_llm,
 			planner_llm=planner_llm,
 			planner_interval=planner_interval,
+			hedging=hedging or (hedger.settings if hedger else None),
+			checkpoint=checkpoint,
+			screenshot_dedup=screenshot_dedup,
 		)
 
 		# Initialize state
@@ -170,6 +185,9 @@ class Agent(Generic[Context]):
 
 		# Model setup
 		self._set_model_names()
+		# a hedger shared with other agents keeps one budget for all of them
+		self.hedger = hedger or (LLMHedger(hedging) if hedging and hedging.enabled else None)
+		self.checkpoint_store = CheckpointStore(checkpoint.directory) if checkpoint else None
 
 		# for models without tool calling, add available actions to context
 		self.available_actions = self.controller.registry.get_prompt_description()
@@ -195,6 +213,11 @@ class Agent(Generic[Context]):
 			),
 			state=self.state.message_manager_state,
 		)
+		self.screenshot_dedup = (
+			ScreenshotDeduplicator(screenshot_dedup, image_tokens=self._message_manager.settings.image_tokens)
+			if screenshot_dedup and screenshot_dedup.enabled
+			else None
+		)
 
 		# Browser setup
 		self.injected_browser = browser is not None
@@ -203,7 +226,8 @@ class Agent(Generic[Context]):
 		if browser_context:
 			self.browser_context = browser_context
 		elif self.browser:
-			self.browser_context = BrowserContext(browser=self.browser, config=self.browser.config.new_context_config)
+			# each agent gets its own copy so agents sharing a browser do not share context settings
+			self.browser_context = BrowserContext(browser=self.browser, config=copy.deepcopy(self.browser.config.new_context_config))
 		else:
 			self.browser = Browser()
 			self.browser_context = BrowserContext(browser=self.browser)
@@ -330,13 +354,27 @@ class Agent(Generic[Context]):
 		result: list[ActionResult] = []
 		step_start_time = time.time()
 		tokens = 0
+		duplicate_screenshot: Optional[DuplicateScreenshot] = None
 
 		try:
-			state = await self.browser_context.get_state()
+			# screenshots of agents without vision are only taken for the GIF, or when the policy always wants them
+			state = await self.browser_context.get_state(vision=self.settings.use_vision or bool(self.settings.generate_gif))
+
+			if self.screenshot_dedup:
+				duplicate_screenshot = await self.screenshot_dedup.check(
+					state.screenshot, self.state.n_steps, len(self.state.history.history), sent=self.settings.use_vision
+				)
 
 			await self._raise_if_stopped_or_paused()
 
-			self._message_manager.add_state_message(state, self.state.last_result, step_info, self.settings.use_vision)
+			skip_screenshot = duplicate_screenshot is not None and self.screenshot_dedup.settings.skip_in_prompt
+			self._message_manager.add_state_message(
+				state,
+				self.state.last_result,
+				step_info,
+				self.settings.use_vision,
+				repeated_screenshot_step=duplicate_screenshot.step if skip_screenshot else None,
+			)
 
 			# Run planner at specified intervals if planner is configured
 			if self.settings.planner_llm and self.state.n_steps % self.settings.planner_interval == 0:
@@ -412,17 +450,15 @@ class Agent(Generic[Context]):
 					step_error=[r.error for r in result if r.error] if result else ['No result'],
 				)
 			)
-			if not result:
-				return
-
-			if state:
+			# no return in here, it would swallow a CancelledError of the step
+			if result and state:
 				metadata = StepMetadata(
 					step_number=self.state.n_steps,
 					step_start_time=step_start_time,
 					step_end_time=step_end_time,
 					input_tokens=tokens,
 				)
-				self._make_history_item(model_output, state, result, metadata)
+				self._make_history_item(model_output, state, result, metadata, duplicate_screenshot)
 
 	@time_execution_async('--handle_step_error (agent)')
 	async def _handle_step_error(self, error: Exception) -> list[ActionResult]:
@@ -446,10 +482,7 @@ class Agent(Generic[Context]):
 
 			self.state.consecutive_failures += 1
 		else:
-			from google.api_core.exceptions import ResourceExhausted
-			from openai import RateLimitError
-
-			if isinstance(error, RateLimitError) or isinstance(error, ResourceExhausted):
+			if is_rate_limit_error(error):
 				logger.warning(f'{prefix}{error_msg}')
 				await asyncio.sleep(self.settings.retry_delay)
 				self.state.consecutive_failures += 1
@@ -465,20 +498,27 @@ class Agent(Generic[Context]):
 		state: BrowserState,
 		result: list[ActionResult],
 		metadata: Optional[StepMetadata] = None,
+		duplicate_screenshot: Optional[DuplicateScreenshot] = None,
 	) -> None:
-		"""Create and store history item"""
+		"""Create and store history item, a repeated screenshot as a pointer to the item holding it"""
 
 		if model_output:
 			interacted_elements = AgentHistory.get_interacted_element(model_output, state.selector_map)
 		else:
 			interacted_elements = [None]
 
+		screenshot, screenshot_ref = state.screenshot, None
+		if duplicate_screenshot and duplicate_screenshot.history_index < len(self.state.history.history):
+			if self.state.history.history[duplicate_screenshot.history_index].state.screenshot:
+				screenshot, screenshot_ref = None, duplicate_screenshot.history_index
+
 		state_history = BrowserStateHistory(
 			url=state.url,
 			title=state.title,
 			tabs=state.tabs,
 			interacted_element=interacted_elements,
-			screenshot=state.screenshot,
+			screenshot=screenshot,
+			screenshot_ref=screenshot_ref,
 		)
 
 		history_item = AgentHistory(model_output=model_output, result=result, state=state_history, metadata=metadata)
@@ -503,13 +543,19 @@ class Agent(Generic[Context]):
 		else:
 			return input_messages
 
+	async def _ainvoke_llm(self, call: Callable[[BaseChatModel], Awaitable[Any]]) -> Any:
+		"""Run `call` against the agent llm, hedged with a duplicate request if hedging is enabled"""
+		if self.hedger is None:
+			return await call(self.llm)
+		return await self.hedger.ainvoke(call, self.llm)
+
 	@time_execution_async('--get_next_action (agent)')
 	async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
 		"""Get next action from LLM based on current state"""
 		input_messages = self._convert_input_messages(input_messages)
 
 		if self.tool_calling_method == 'raw':
-			output = self.llm.invoke(input_messages)
+			output = await self._ainvoke_llm(lambda llm: llm.ainvoke(input_messages))
 			# TODO: currently invoke does not return reasoning_content, we should override invoke
 			output.content = self._remove_think_tags(str(output.content))
 			try:
@@ -520,12 +566,16 @@ class Agent(Generic[Context]):
 				raise ValueError('Could not parse response.')
 
 		elif self.tool_calling_method is None:
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True)
-			response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
+			response: dict[str, Any] = await self._ainvoke_llm(
+				lambda llm: llm.with_structured_output(self.AgentOutput, include_raw=True).ainvoke(input_messages)
+			)  # type: ignore
 			parsed: AgentOutput | None = response['parsed']
 		else:
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True, method=self.tool_calling_method)
-			response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
+			response: dict[str, Any] = await self._ainvoke_llm(
+				lambda llm: llm.with_structured_output(
+					self.AgentOutput, include_raw=True, method=self.tool_calling_method
+				).ainvoke(input_messages)
+			)  # type: ignore
 			parsed: AgentOutput | None = response['parsed']
 
 		if parsed is None:
@@ -584,12 +634,18 @@ class Agent(Generic[Context]):
 		try:
 			self._log_agent_run()
 
+			resumed = False
+			if self.settings.checkpoint and self.settings.checkpoint.resume:
+				resumed = await self.resume_from_checkpoint()
+
 			# Execute initial actions if provided
-			if self.initial_actions:
+			if self.initial_actions and not resumed:
 				result = await self.multi_act(self.initial_actions, check_for_new_elements=False)
 				self.state.last_result = result
 
-			for step in range(max_steps):
+			# a resumed run continues counting from the checkpoint
+			first_step = self.state.n_steps - 1 if resumed else 0
+			for step in range(first_step, max_steps):
 				# Check if we should stop due to too many failures
 				if self.state.consecutive_failures >= self.settings.max_failures:
 					logger.error(f'❌ Stopping due to {self.settings.max_failures} consecutive failures')
@@ -608,6 +664,9 @@ class Agent(Generic[Context]):
 				step_info = AgentStepInfo(step_number=step, max_steps=max_steps)
 				await self.step(step_info)
 
+				if self.settings.checkpoint and self.state.consecutive_failures == 0 and not self.state.stopped:
+					await self.save_checkpoint()
+
 				if self.state.history.is_done():
 					if self.settings.validate_output and step < max_steps - 1:
 						if not await self._validate_output():
@@ -633,6 +692,15 @@ class Agent(Generic[Context]):
 				)
 			)
 
+			if self.hedger:
+				logger.debug(f'Hedging stats: {self.hedger.stats}')
+
+			if self.screenshot_dedup:
+				logger.debug(f'Screenshot dedup stats: {self.screenshot_dedup.stats}')
+
+			if self.checkpoint_store and self.settings.checkpoint.delete_on_success and self.state.history.is_successful():
+				self.checkpoint_store.delete(self.settings.checkpoint.checkpoint_id)
+
 			if not self.injected_browser_context:
 				await self.browser_context.close()
 
@@ -646,6 +714,87 @@ class Agent(Generic[Context]):
 
 				create_history_gif(task=self.task, history=self.state.history, output_path=output_path)
 
+	async def save_checkpoint(self) -> None:
+		"""Persist the agent state, current URL and browser storage so a later run can resume from here"""
+		if not self.checkpoint_store or not self.settings.checkpoint:
+			return
+
+		url = None
+		storage_state = None
+		try:
+			if self.browser_context.session:
+				url = (await self.browser_context.get_current_page()).url
+				if self.settings.checkpoint.save_storage_state:
+					storage_state = await self.browser_context.session.context.storage_state()
+		except Exception as e:
+			logger.debug(f'Failed to read browser state for checkpoint: {e}')
+
+		try:
+			history = self.state.history.model_dump()
+			for item in history['history']:
+				# screenshots are most of the history's size and not needed to resume
+				item['state']['screenshot'] = None
+				item['state'].pop('screenshot_ref', None)
+
+			checkpoint = AgentCheckpoint(
+				checkpoint_id=self.settings.checkpoint.checkpoint_id,
+				task=self.task,
+				n_steps=self.state.n_steps,
+				is_done=self.state.history.is_done(),
+				url=url,
+				state=self.state.model_dump(mode='json', exclude={'history', 'paused', 'stopped'}),
+				history=history,
+				storage_state=storage_state,
+			)
+			# the file write must not block the browser loop other tasks may share
+			await asyncio.to_thread(self.checkpoint_store.save, checkpoint)
+			logger.debug(f'Saved checkpoint {checkpoint.checkpoint_id} after step {checkpoint.n_steps - 1}')
+		except Exception as e:
+			logger.warning(f'Failed to save checkpoint: {e}')
+
+	async def resume_from_checkpoint(self) -> bool:
+		"""Restore the state of an earlier run with the same checkpoint id, returns False if there is none"""
+		if not self.checkpoint_store or not self.settings.checkpoint:
+			return False
+
+		checkpoint = self.checkpoint_store.load(self.settings.checkpoint.checkpoint_id)
+		if checkpoint is None:
+			return False
+		if checkpoint.task != self.task:
+			logger.info(f'Checkpoint {checkpoint.checkpoint_id} belongs to a different task - starting fresh')
+			return False
+		if checkpoint.is_done:
+			logger.info(f'Checkpoint {checkpoint.checkpoint_id} belongs to a finished run - starting fresh')
+			return False
+
+		try:
+			history = AgentHistoryList.load_from_dict(checkpoint.history, self.AgentOutput)
+			state = AgentState.model_validate({**checkpoint.state, 'history': history})
+		except Exception as e:
+			logger.warning(f'Failed to restore checkpoint {checkpoint.checkpoint_id} - starting fresh: {e}')
+			return False
+
+		self.state = state
+		self._message_manager.state = state.message_manager_state
+
+		if checkpoint.storage_state:
+			await self.browser_context.restore_storage_state(checkpoint.storage_state)
+		if checkpoint.url and checkpoint.url != 'about:blank':
+			try:
+				await self.browser_context.navigate_to(checkpoint.url)
+			except Exception as e:
+				logger.warning(f'Failed to reopen {checkpoint.url} from checkpoint: {e}')
+
+		self.state.last_result = [
+			ActionResult(
+				extracted_content=f'The task was interrupted and resumed after step {checkpoint.n_steps - 1}. '
+				f'The browser was reopened at {checkpoint.url} - check the page, earlier page state may be lost.',
+				include_in_memory=True,
+			)
+		]
+		logger.info(f'🔁 Resumed from checkpoint {checkpoint.checkpoint_id} at step {checkpoint.n_steps}')
+		return True
+
 	# @observe(name='controller.multi_act')
 	@time_execution_async('--multi-act (agent)')
 	async def multi_act(
@@ -659,11 +808,13 @@ class Agent(Generic[Context]):
 		cached_selector_map = await self.browser_context.get_selector_map()
 		cached_path_hashes = set(e.hash.branch_path_hash for e in cached_selector_map.values())
 
-		await self.browser_context.remove_highlights()
+		await self.browser_context.hide_highlights()
 
 		for i, action in enumerate(actions):
-			if action.get_index() is not None and i != 0:
-				new_state = await self.browser_context.get_state()
+			# an unchanged page cannot show new elements, its state is not extracted again
+			if action.get_index() is not None and i != 0 and await self.browser_context.has_page_changed():
+				# has_page_changed already waited for the page to load
+				new_state = await self.browser_context.get_state(vision=False, wait_for_load=False)
 				new_path_hashes = set(e.hash.branch_path_hash for e in new_state.selector_map.values())
 				if check_for_new_elements and not new_path_hashes.issubset(cached_path_hashes):
 					# next action requires index but there are new elements on the page
@@ -708,7 +859,7 @@ class Agent(Generic[Context]):
 		)
 
 		if self.browser_context.session:
-			state = await self.browser_context.get_state()
+			state = await self.browser_context.get_state(vision=self.settings.use_vision)
 			content = AgentMessagePrompt(
 				state=state,
 				result=self.state.last_result,
@@ -812,7 +963,7 @@ class Agent(Generic[Context]):
 
 	async def _execute_history_step(self, history_item: AgentHistory, delay: float) -> list[ActionResult]:
 		"""Execute a single step from history with element validation"""
-		state = await self.browser_context.get_state()
+		state = await self.browser_context.get_state(vision=False)
 		if not state or not history_item.model_output:
 			raise ValueError('Invalid state or model output')
 		updated_actions = []
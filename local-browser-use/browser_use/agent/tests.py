@@ -1,5 +1,11 @@
+import asyncio
+
 import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 
+from browser_use.agent.service import Agent
 from browser_use.agent.views import (
 	ActionResult,
 	AgentBrain,
@@ -7,8 +13,10 @@ from browser_use.agent.views import (
 	AgentHistoryList,
 	AgentOutput,
 )
+from browser_use.browser.browser import Browser
 from browser_use.browser.views import BrowserState, BrowserStateHistory, TabInfo
 from browser_use.controller.registry.service import Registry
+from browser_use.controller.service import Controller
 from browser_use.controller.views import ClickElementAction, DoneAction, ExtractPageContentAction
 from browser_use.dom.views import DOMElementNode
 
@@ -195,3 +203,30 @@ def test_action_creation(action_registry):
 
 # run this with:
 # pytest browser_use/agent/tests.py
+
+
+class IdleLLM(BaseChatModel):
+	@property
+	def _llm_type(self) -> str:
+		return 'idle'
+
+	def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+		return ChatResult(generations=[ChatGeneration(message=AIMessage(content=''))])
+
+
+@pytest.mark.asyncio
+async def test_cancelled_step_raises_cancelled_error():
+	agent = Agent(task='task', llm=IdleLLM(), browser=Browser(), controller=Controller(), tool_calling_method='raw')
+
+	async def slow_state(*args, **kwargs):
+		await asyncio.sleep(10)
+
+	agent.browser_context.get_state = slow_state
+	step = asyncio.create_task(agent.step())
+	await asyncio.sleep(0.05)
+	# cancelled without agent.stop(), the step must not carry on as if it had failed
+	step.cancel()
+
+	with pytest.raises(asyncio.CancelledError):
+		await step
+	assert agent.state.history.history == []
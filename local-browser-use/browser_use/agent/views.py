@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import sys
 import traceback
 import uuid
 from dataclasses import dataclass
@@ -8,9 +9,11 @@ from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional, Type
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from openai import RateLimitError
 from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
 
+from browser_use.agent.checkpoint.views import CheckpointSettings
+from browser_use.agent.hedging.views import HedgingSettings
+from browser_use.agent.screenshot_dedup.views import ScreenshotDedupSettings
 from browser_use.agent.message_manager.views import MessageManagerState
 from browser_use.browser.views import BrowserStateHistory
 from browser_use.controller.registry.views import ActionModel
@@ -58,6 +61,9 @@ class AgentSettings(BaseModel):
 	page_extraction_llm: Optional[BaseChatModel] = None
 	planner_llm: Optional[BaseChatModel] = None
 	planner_interval: int = 1  # Run planner every N steps
+	hedging: Optional[HedgingSettings] = None
+	checkpoint: Optional[CheckpointSettings] = None
+	screenshot_dedup: Optional[ScreenshotDedupSettings] = None
 
 
 class AgentState(BaseModel):
@@ -251,6 +257,11 @@ class AgentHistoryList(BaseModel):
 		"""Load history from JSON file"""
 		with open(filepath, 'r', encoding='utf-8') as f:
 			data = json.load(f)
+		return cls.load_from_dict(data, output_model)
+
+	@classmethod
+	def load_from_dict(cls, data: dict[str, Any], output_model: Type[AgentOutput]) -> 'AgentHistoryList':
+		"""Load history from the output of `model_dump`"""
 		# loop through history and validate output_model actions to enrich with custom actions
 		for h in data['history']:
 			if h['model_output']:
@@ -309,8 +320,14 @@ class AgentHistoryList(BaseModel):
 		return [h.state.url if h.state.url is not None else None for h in self.history]
 
 	def screenshots(self) -> list[str | None]:
-		"""Get all screenshots from history"""
-		return [h.state.screenshot if h.state.screenshot is not None else None for h in self.history]
+		"""Get all screenshots from history, deduplicated ones resolved to the screenshot they repeat"""
+		screenshots = []
+		for h in self.history:
+			screenshot = h.state.screenshot
+			if screenshot is None and h.state.screenshot_ref is not None and h.state.screenshot_ref < len(screenshots):
+				screenshot = screenshots[h.state.screenshot_ref]
+			screenshots.append(screenshot)
+		return screenshots
 
 	def action_names(self) -> list[str]:
 		"""Get all action names from history"""
@@ -373,6 +390,18 @@ class AgentHistoryList(BaseModel):
 		return len(self.history)
 
 
+def is_rate_limit_error(error: Exception) -> bool:
+	"""Rate limit errors of the OpenAI and Google clients, without importing either just to check"""
+	# an error of one of these types means its module is already imported
+	openai = sys.modules.get('openai')
+	if openai is not None and isinstance(error, openai.RateLimitError):
+		return True
+	google_exceptions = sys.modules.get('google.api_core.exceptions')
+	if google_exceptions is not None and isinstance(error, google_exceptions.ResourceExhausted):
+		return True
+	return False
+
+
 class AgentError:
 	"""Container for agent error handling"""
 
@@ -386,7 +415,7 @@ class AgentError:
 		message = ''
 		if isinstance(error, ValidationError):
 			return f'{AgentError.VALIDATION_ERROR}\nDetails: {str(error)}'
-		if isinstance(error, RateLimitError):
+		if is_rate_limit_error(error):
 			return AgentError.RATE_LIMIT_ERROR
 		if include_trace:
 			return f'{str(error)}\nStacktrace:\n{traceback.format_exc()}'
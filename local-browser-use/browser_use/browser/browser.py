@@ -3,18 +3,18 @@ Playwright browser on steroids.
 """
 
 import asyncio
+import copy
 import gc
 import logging
 from dataclasses import dataclass, field
 
 from playwright._impl._api_structures import ProxySettings
 from playwright.async_api import Browser as PlaywrightBrowser
-from playwright.async_api import (
-	Playwright,
-	async_playwright,
-)
+from playwright.async_api import Playwright
 
+from browser_use.browser.cdp_endpoint import probe_cdp, wait_for_cdp
 from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.driver import PlaywrightDriver
 from browser_use.utils import time_execution_async
 
 logger = logging.getLogger(__name__)
@@ -44,14 +44,23 @@ class BrowserConfig:
 		chrome_instance_path: None
 			Path to a Chrome instance to use to connect to your normal browser
 			e.g. '/Applications/Google\ Chrome.app/Contents/MacOS/Google\ Chrome'
+
+		remote_debugging_port: 9222
+			Port the Chrome instance of chrome_instance_path is reached on, see CDPFarm for several instances
+
+		user_data_dir: None
+			Launch a persistent profile from this directory, it keeps the HTTP cache between runs.
+			The browser then has a single context, see ProfilePool for handing profiles to concurrent tasks
 	"""
 
 	headless: bool = False
 	disable_security: bool = True
 	extra_chromium_args: list[str] = field(default_factory=list)
 	chrome_instance_path: str | None = None
+	remote_debugging_port: int = 9222
 	wss_url: str | None = None
 	cdp_url: str | None = None
+	user_data_dir: str | None = None
 
 	proxy: ProxySettings | None = field(default=None)
 	new_context_config: BrowserContextConfig = field(default_factory=BrowserContextConfig)
@@ -86,8 +95,15 @@ class Browser:
 				'--disable-features=IsolateOrigins,site-per-process',
 			]
 
-	async def new_context(self, config: BrowserContextConfig = BrowserContextConfig()) -> BrowserContext:
-		"""Create a browser context"""
+	async def new_context(self, config: BrowserContextConfig | None = None) -> BrowserContext:
+		"""
+		Create a browser context
+
+		Without `config` the context gets its own copy of `new_context_config`, so per-context settings
+		(downloads path, custom attributes) never leak between contexts of the same browser.
+		"""
+		if config is None:
+			config = copy.deepcopy(self.config.new_context_config)
 		return BrowserContext(config=config, browser=self)
 
 	async def get_playwright_browser(self) -> PlaywrightBrowser:
@@ -100,8 +116,13 @@ class Browser:
 	@time_execution_async('--init (browser)')
 	async def _init(self):
 		"""Initialize the browser session"""
-		playwright = await async_playwright().start()
-		browser = await self._setup_browser(playwright)
+		# the driver is shared with the other browsers of this event loop
+		playwright = await PlaywrightDriver().acquire()
+		try:
+			browser = await self._setup_browser(playwright)
+		except BaseException:
+			await PlaywrightDriver().release(playwright)
+			raise
 
 		self.playwright = playwright
 		self.playwright_browser = browser
@@ -130,46 +151,33 @@ class Browser:
 			raise ValueError('Chrome instance path is required')
 		import subprocess
 
-		import requests
+		endpoint = f'http://localhost:{self.config.remote_debugging_port}'
 
-		try:
-			# Check if browser is already running
-			response = requests.get('http://localhost:9222/json/version', timeout=2)
-			if response.status_code == 200:
-				logger.info('Reusing existing Chrome instance')
-				browser = await playwright.chromium.connect_over_cdp(
-					endpoint_url='http://localhost:9222',
-					timeout=20000,  # 20 second timeout for connection
-				)
-				return browser
-		except requests.ConnectionError:
-			logger.debug('No existing Chrome instance found, starting a new one')
-
-		# Start a new Chrome instance
+		# Check if browser is already running
+		if await probe_cdp(endpoint):
+			logger.info('Reusing existing Chrome instance')
+			return await playwright.chromium.connect_over_cdp(
+				endpoint_url=endpoint,
+				timeout=20000,  # 20 second timeout for connection
+			)
+		logger.debug('No existing Chrome instance found, starting a new one')
+
+		# Start a new Chrome instance, it is the user's browser and stays open after we disconnect
 		subprocess.Popen(
 			[
 				self.config.chrome_instance_path,
-				'--remote-debugging-port=9222',
+				f'--remote-debugging-port={self.config.remote_debugging_port}',
 			]
 			+ self.config.extra_chromium_args,
 			stdout=subprocess.DEVNULL,
 			stderr=subprocess.DEVNULL,
 		)
 
-		# Attempt to connect again after starting a new instance
-		for _ in range(10):
-			try:
-				response = requests.get('http://localhost:9222/json/version', timeout=2)
-				if response.status_code == 200:
-					break
-			except requests.ConnectionError:
-				pass
-			await asyncio.sleep(1)
-
 		# Attempt to connect again after starting a new instance
 		try:
+			await wait_for_cdp(endpoint, timeout=10)
 			browser = await playwright.chromium.connect_over_cdp(
-				endpoint_url='http://localhost:9222',
+				endpoint_url=endpoint,
 				timeout=20000,  # 20 second timeout for connection
 			)
 			return browser
@@ -179,11 +187,29 @@ class Browser:
 				' To start chrome in Debug mode, you need to close all existing Chrome instances and try again otherwise we can not connect to the instance.'
 			)
 
-	async def _setup_standard_browser(self, playwright: Playwright) -> PlaywrightBrowser:
-		"""Sets up and returns a Playwright Browser instance with anti-detection measures."""
-		browser = await playwright.chromium.launch(
+	async def _setup_persistent_browser(self, playwright: Playwright) -> PlaywrightBrowser:
+		"""Launches the profile in user_data_dir, its only context is picked up by BrowserContext"""
+		context_config = self.config.new_context_config
+		context = await playwright.chromium.launch_persistent_context(
+			self.config.user_data_dir,
 			headless=self.config.headless,
-			args=[
+			args=self._launch_args(),
+			proxy=self.config.proxy,
+			viewport=context_config.browser_window_size,
+			no_viewport=False,
+			user_agent=context_config.user_agent,
+			java_script_enabled=True,
+			bypass_csp=context_config.disable_security,
+			ignore_https_errors=context_config.disable_security,
+			record_video_dir=context_config.save_recording_path,
+			record_video_size=context_config.browser_window_size,
+			locale=context_config.locale,
+		)
+		return context.browser
+
+	def _launch_args(self) -> list[str]:
+		return (
+			[
 				'--no-sandbox',
 				'--disable-blink-features=AutomationControlled',
 				'--disable-infobars',
@@ -200,7 +226,14 @@ class Browser:
 				# '--window-size=1280,1000',
 			]
 			+ self.disable_security_args
-			+ self.config.extra_chromium_args,
+			+ self.config.extra_chromium_args
+		)
+
+	async def _setup_standard_browser(self, playwright: Playwright) -> PlaywrightBrowser:
+		"""Sets up and returns a Playwright Browser instance with anti-detection measures."""
+		browser = await playwright.chromium.launch(
+			headless=self.config.headless,
+			args=self._launch_args(),
 			proxy=self.config.proxy,
 		)
 		# convert to Browser
@@ -215,6 +248,8 @@ class Browser:
 				return await self._setup_wss(playwright)
 			elif self.config.chrome_instance_path:
 				return await self._setup_browser_with_instance(playwright)
+			elif self.config.user_data_dir:
+				return await self._setup_persistent_browser(playwright)
 			else:
 				return await self._setup_standard_browser(playwright)
 		except Exception as e:
@@ -225,12 +260,15 @@ class Browser:
 		"""Close the browser instance"""
 		try:
 			if not self.config._force_keep_browser_alive:
-				if self.playwright_browser:
-					await self.playwright_browser.close()
-					del self.playwright_browser
-				if self.playwright:
-					await self.playwright.stop()
-					del self.playwright
+				try:
+					if self.playwright_browser:
+						await self.playwright_browser.close()
+						del self.playwright_browser
+				finally:
+					# always give the shared driver back, a leaked reference would keep it running forever
+					if self.playwright:
+						await PlaywrightDriver().release(self.playwright)
+						del self.playwright
 
 		except Exception as e:
 			logger.debug(f'Failed to close browser properly: {e}')
@@ -0,0 +1,65 @@
+"""
+Non-blocking helpers to launch Chromium with a remote debugging port and wait until it accepts CDP connections.
+"""
+
+import asyncio
+import logging
+import socket
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+async def probe_cdp(endpoint: str, timeout: float = 2.0) -> Optional[dict]:
+	"""The /json/version payload of a CDP endpoint, None if nothing answers there"""
+	import httpx
+
+	try:
+		async with httpx.AsyncClient(timeout=timeout) as client:
+			response = await client.get(f'{endpoint}/json/version')
+	except httpx.HTTPError:
+		return None
+	if response.status_code != 200:
+		return None
+	return response.json()
+
+
+async def wait_for_cdp(
+	endpoint: str, timeout: float = 10.0, process: Optional[asyncio.subprocess.Process] = None
+) -> dict:
+	"""Poll an endpoint until it answers, fails early when the launched `process` exits"""
+	deadline = time.monotonic() + timeout
+	delay = 0.05
+	while True:
+		version = await probe_cdp(endpoint, timeout=min(2.0, timeout))
+		if version is not None:
+			return version
+		if process is not None and process.returncode is not None:
+			raise RuntimeError(f'Chromium exited with code {process.returncode} before {endpoint} was ready')
+		if time.monotonic() > deadline:
+			raise TimeoutError(f'No CDP endpoint at {endpoint} after {timeout}s')
+		await asyncio.sleep(delay)
+		delay = min(delay * 2, 0.5)
+
+
+def port_is_free(port: int, host: str = '127.0.0.1') -> bool:
+	with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+		try:
+			sock.bind((host, port))
+		except OSError:
+			return False
+	return True
+
+
+async def launch_chromium(executable_path: str, port: int, args: list[str]) -> asyncio.subprocess.Process:
+	"""Start Chromium listening for CDP on `port`, returns without waiting for it to be ready"""
+	logger.debug(f'Launching {executable_path} with remote debugging port {port}')
+	return await asyncio.create_subprocess_exec(
+		executable_path,
+		f'--remote-debugging-port={port}',
+		*args,
+		stdin=asyncio.subprocess.DEVNULL,
+		stdout=asyncio.subprocess.DEVNULL,
+		stderr=asyncio.subprocess.DEVNULL,
+	)
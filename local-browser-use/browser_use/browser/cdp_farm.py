@@ -0,0 +1,189 @@
+"""
+Pool of Chromium processes reached over CDP, so concurrent tasks spread over all cores.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Optional
+
+from playwright.async_api import Browser as PlaywrightBrowser
+from playwright.async_api import Playwright
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.cdp_endpoint import launch_chromium, port_is_free, wait_for_cdp
+from browser_use.browser.driver import PlaywrightDriver
+from browser_use.browser.pool import BrowserPool, BrowserPoolConfig, PooledBrowser
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CDPFarmConfig(BrowserPoolConfig):
+	"""
+	Configuration for the CDPFarm, on top of the BrowserPoolConfig fields.
+	`size` is the number of Chromium processes, `browser_config` provides their launch arguments.
+
+	Default values:
+	    executable_path: None
+	        Chromium binary to launch, None uses Playwright's Chromium
+
+	    base_port: 9222
+	        First remote debugging port tried for launched processes, ports in use are skipped
+
+	    attach_endpoints: []
+	        CDP endpoints of already running processes, e.g. 'http://localhost:9333', used before launching new ones
+
+	    user_data_root: None
+	        Directory holding one profile per port, None gives every process a temporary profile
+
+	    startup_timeout: 20.0
+	        Seconds a launched process has to open its CDP endpoint
+	"""
+
+	executable_path: str | None = None
+	base_port: int = 9222
+	attach_endpoints: list[str] = field(default_factory=list)
+	user_data_root: str | None = None
+	startup_timeout: float = 20.0
+
+
+class FarmBrowser(Browser):
+	"""
+	Browser connected over CDP to one process of a CDPFarm.
+
+	Unlike a Browser with `cdp_url`, every BrowserContext gets a new isolated context instead of the default one.
+	Closing it terminates the process if the farm launched it, attached processes are only disconnected.
+	"""
+
+	def __init__(
+		self,
+		config: BrowserConfig,
+		endpoint: str,
+		process: Optional[asyncio.subprocess.Process] = None,
+		temporary_user_data_dir: str | None = None,
+	):
+		super().__init__(config)
+		self.endpoint = endpoint
+		self.process = process
+		self.temporary_user_data_dir = temporary_user_data_dir
+
+	async def _setup_browser(self, playwright: Playwright) -> PlaywrightBrowser:
+		return await playwright.chromium.connect_over_cdp(self.endpoint, timeout=20000)
+
+	async def close(self):
+		try:
+			await super().close()
+		finally:
+			if self.process and self.process.returncode is None:
+				self.process.terminate()
+				try:
+					await asyncio.wait_for(self.process.wait(), timeout=5)
+				except asyncio.TimeoutError:
+					self.process.kill()
+					await self.process.wait()
+			if self.temporary_user_data_dir:
+				shutil.rmtree(self.temporary_user_data_dir, ignore_errors=True)
+				self.temporary_user_data_dir = None
+
+
+class CDPFarm(BrowserPool):
+	"""
+	BrowserPool whose browsers are separate Chromium processes on distinct remote debugging ports.
+
+	New contexts go to the process with the fewest active contexts. A process that dies is noticed through
+	its dropped CDP connection and restarted in the background, health checks catch processes that hang.
+	"""
+
+	def __init__(self, config: CDPFarmConfig = CDPFarmConfig()):
+		super().__init__(config)
+		self._ports: set[int] = set()  # remote debugging ports of the launched processes
+		self._attached: set[str] = set()  # attach_endpoints in use
+
+	def endpoints(self) -> list[str]:
+		return [pooled.browser.endpoint for pooled in self._browsers if not pooled.retired]
+
+	async def _create_browser(self) -> Browser:
+		endpoint = next((endpoint for endpoint in self.config.attach_endpoints if endpoint not in self._attached), None)
+		if endpoint is not None:
+			self._attached.add(endpoint)
+			browser = FarmBrowser(self.config.browser_config, endpoint)
+		else:
+			browser = await self._launch_process()
+
+		try:
+			await wait_for_cdp(browser.endpoint, timeout=self.config.startup_timeout, process=browser.process)
+			playwright_browser = await browser.get_playwright_browser()
+		except BaseException:
+			await browser.close()
+			self._release(browser)
+			raise
+
+		playwright_browser.on('disconnected', lambda _: self._on_disconnected(browser))
+		logger.debug(f'Chromium process at {browser.endpoint} joined the farm')
+		return browser
+
+	async def _launch_process(self) -> FarmBrowser:
+		port = self._reserve_port()
+		temporary_user_data_dir = None
+		if self.config.user_data_root:
+			user_data_dir = os.path.join(self.config.user_data_root, f'port-{port}')
+			os.makedirs(user_data_dir, exist_ok=True)
+		else:
+			user_data_dir = temporary_user_data_dir = tempfile.mkdtemp(prefix='browser-use-farm-')
+
+		browser = FarmBrowser(
+			self.config.browser_config, f'http://127.0.0.1:{port}', temporary_user_data_dir=temporary_user_data_dir
+		)
+		# without a window to keep open, a Chromium started outside Playwright would exit right away
+		args = [arg for arg in browser._launch_args() if arg != '--no-startup-window']
+		args.append(f'--user-data-dir={user_data_dir}')
+		if self.config.browser_config.headless:
+			args.append('--headless=new')
+		args.append('about:blank')
+
+		try:
+			browser.process = await launch_chromium(self.config.executable_path or await self._default_executable(), port, args)
+		except BaseException:
+			await browser.close()
+			self._ports.discard(port)
+			raise
+		return browser
+
+	async def _default_executable(self) -> str:
+		playwright = await PlaywrightDriver().acquire()
+		try:
+			return playwright.chromium.executable_path
+		finally:
+			await PlaywrightDriver().release(playwright)
+
+	def _reserve_port(self) -> int:
+		port = self.config.base_port
+		while port in self._ports or not port_is_free(port):
+			port += 1
+		self._ports.add(port)
+		return port
+
+	def _release(self, browser: FarmBrowser) -> None:
+		self._attached.discard(browser.endpoint)
+		if browser.process is not None:
+			self._ports.discard(int(browser.endpoint.rsplit(':', 1)[1]))
+
+	def _on_disconnected(self, browser: FarmBrowser) -> None:
+		pooled = next((pooled for pooled in self._browsers if pooled.browser is browser), None)
+		if pooled is None or pooled.retired or self._closed:
+			# closed by the farm itself
+			return
+		logger.warning(f'Chromium process at {browser.endpoint} disconnected, restarting it')
+		task = asyncio.create_task(self.recycle(browser))
+		self._background_tasks.add(task)
+		task.add_done_callback(self._background_tasks.discard)
+
+	async def _discard(self, pooled: PooledBrowser) -> None:
+		try:
+			await super()._discard(pooled)
+		finally:
+			self._release(pooled.browser)
@@ -0,0 +1,131 @@
+"""
+In-page tracking of DOM changes, so an unchanged page is not extracted again.
+"""
+
+import logging
+from typing import Optional
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# Installed as an init script, so every document of every page and frame counts its changes from the start.
+# The token is [document ids, summed versions] over the page and its same-origin frames, which the DOM snapshot
+# also reads. A navigation of any of them gives new document ids. Without a tracker in one of them it is null.
+# Changes made by our own highlights do not count, they are drawn and removed by the DOM script.
+# Besides DOM mutations, scrolls, resizes, hover and focus changes, CSS animations and transitions, web fonts and
+# size changes of the document count as changes. Not seen: canvas and video content, and animations driven by
+# requestAnimationFrame without DOM writes, e.g. WebGL maps. A cached state of such pages is only as fresh as its
+# last counted change.
+CHANGE_TRACKER_SCRIPT = """
+(() => {
+  if (window.__browserUseChanges) return;
+  const HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container';
+  const HIGHLIGHT_ATTRIBUTE = 'browser-user-highlight-id';
+  const changes = window.__browserUseChanges = {
+    id: Math.random().toString(36).slice(2),
+    version: 0,
+    token: () => {
+      const ids = [];
+      let version = 0;
+      const visit = win => {
+        const tracked = win.__browserUseChanges;
+        if (!tracked) return false;
+        ids.push(tracked.id);
+        version += tracked.version;
+        for (let i = 0; i < win.frames.length; i++) {
+          const frame = win.frames[i];
+          try {
+            frame.document;
+          } catch (e) {
+            continue;  // cross-origin frames are not part of the snapshot either
+          }
+          if (!visit(frame)) return false;
+        }
+        return true;
+      };
+      return visit(window) ? [ids.join(','), version] : null;
+    },
+  };
+
+  const isOwnChange = record => {
+    if (record.type === 'attributes' && record.attributeName === HIGHLIGHT_ATTRIBUTE) return true;
+    const nodes = record.type === 'childList'
+      ? [...record.addedNodes, ...record.removedNodes]
+      : [record.target];
+    return nodes.length > 0 && nodes.every(node => {
+      const element = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+      return element && (element.id === HIGHLIGHT_CONTAINER_ID || element.closest?.('#' + HIGHLIGHT_CONTAINER_ID));
+    });
+  };
+
+  new MutationObserver(records => {
+    if (!records.every(isOwnChange)) changes.version++;
+  }).observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+
+  // scrolling and resizing move the elements without touching the DOM
+  const bump = () => { changes.version++; };
+  window.addEventListener('scroll', bump, { capture: true, passive: true });
+  window.addEventListener('resize', bump, { passive: true });
+  // CSS-only state: :hover and :focus rules, and animations and transitions that show, hide or move elements
+  for (const event of ['mouseover', 'mouseout', 'focusin', 'focusout', 'animationstart', 'animationend', 'transitionend']) {
+    window.addEventListener(event, bump, { capture: true, passive: true });
+  }
+  // layout changes without a DOM change, e.g. a web font that finished loading, or content reflowing into a new size
+  if (document.fonts) document.fonts.addEventListener('loadingdone', bump);
+  if (window.ResizeObserver) {
+    let initial = true;
+    const resized = new ResizeObserver(() => {
+      // observing reports the current size once, that is no change
+      if (initial) initial = false;
+      else bump();
+    });
+    resized.observe(document.documentElement);
+  }
+})();
+"""
+
+# Reads the token, and puts back the highlights taken off by `HIDE_HIGHLIGHTS_SCRIPT` when the token is `expected`.
+READ_TOKEN_SCRIPT = """
+expected => {
+  const changes = window.__browserUseChanges;
+  const token = changes ? changes.token() : null;
+  const hidden = window.__browserUseHiddenHighlights;
+  if (expected && hidden) {
+    if (token && token[0] === expected[0] && token[1] === expected[1]) document.body.appendChild(hidden);
+    window.__browserUseHiddenHighlights = null;
+  }
+  return token;
+}
+"""
+
+# Takes the highlights out of the document without losing them, page content reads stay free of their labels
+HIDE_HIGHLIGHTS_SCRIPT = """
+() => {
+  const container = document.getElementById('playwright-highlight-container');
+  if (container) {
+    container.remove();
+    window.__browserUseHiddenHighlights = container;
+  }
+}
+"""
+
+ChangeToken = tuple[str, int]
+
+
+async def read_change_token(page: Page, expected: Optional[ChangeToken] = None) -> Optional[ChangeToken]:
+	"""Current change token of a page, None if it cannot be tracked (installed late) or is not reachable"""
+	try:
+		token = await page.evaluate(READ_TOKEN_SCRIPT, list(expected) if expected else None)
+	except Exception as e:
+		logger.debug(f'Failed to read the change token: {e}')
+		return None
+	if token is None:
+		# pages and frames that existed before the init script was added start tracking now
+		for frame in page.frames:
+			try:
+				await frame.evaluate(CHANGE_TRACKER_SCRIPT)
+			except Exception:
+				pass
+		return None
+	return token[0], int(token[1])
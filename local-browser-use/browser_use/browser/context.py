@@ -3,7 +3,6 @@ Playwright browser on steroids.
 """
 
 import asyncio
-import base64
 import gc
 import json
 import logging
@@ -11,7 +10,7 @@ import os
 import re
 import time
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Optional, TypedDict
 
 from playwright._impl._errors import TimeoutError
@@ -25,6 +24,15 @@ from playwright.async_api import (
 	Page,
 )
 
+from browser_use.browser.changes import CHANGE_TRACKER_SCRIPT, HIDE_HIGHLIGHTS_SCRIPT, ChangeToken, read_change_token
+from browser_use.browser.downloads import DownloadManager
+from browser_use.browser.elements import hit_test, resolve_registered_element
+from browser_use.browser.network import NetworkIdleTracker
+from browser_use.browser.printing import PrintToPDF
+from browser_use.browser.resource_policy import ResourceBlocker, ResourcePolicy
+from browser_use.browser.screenshots import ScreenshotCapturer, ScreenshotPolicy
+from browser_use.browser.settle import AdaptiveSettleConfig, SettleProfiles, shared_settle_profiles
+from browser_use.browser.tabs import TabRegistry
 from browser_use.browser.views import (
 	BrowserError,
 	BrowserState,
@@ -32,7 +40,7 @@ from browser_use.browser.views import (
 	URLNotAllowedError,
 )
 from browser_use.dom.service import DomService
-from browser_use.dom.views import DOMElementNode, SelectorMap
+from browser_use.dom.views import DOMElementNode, DOMState, PageInfo, SelectorMap
 from browser_use.utils import time_execution_async, time_execution_sync
 
 if TYPE_CHECKING:
@@ -68,6 +76,9 @@ class BrowserContextConfig:
 	    maximum_wait_page_load_time: 5.0
 	        Maximum time to wait for page load before proceeding anyway
 
+	    adaptive_settle: None
+	        AdaptiveSettleConfig to learn per site how long pages take to settle and shorten the network wait for fast sites
+
 	    wait_between_actions: 1.0
 	        Time to wait between multiple per step actions
 
@@ -86,6 +97,19 @@ class BrowserContextConfig:
 	    save_downloads_path: None
 	        Path to save downloads to
 
+	    download_filename: None
+	        Filename for downloads instead of the name suggested by the server, e.g. a per-order name
+
+	    download_start_timeout: 0.25
+	        Seconds a click waits after the page loaded for a download to start, later downloads are reported with the next action
+
+	    print_to_pdf: False
+	        Save window.print() as a PDF to save_downloads_path instead of opening the print preview,
+	        the preview still opens where the browser cannot print to PDF
+
+	    resource_policy: None
+	        ResourcePolicy with the ads, trackers and resource types to block, nothing is blocked without one
+
 	    trace_path: None
 	        Path to save trace files. It will auto name the file with the TRACE_PATH/{context_id}.zip
 
@@ -107,12 +131,19 @@ class BrowserContextConfig:
 
 	    include_dynamic_attributes: bool = True
 	        Include dynamic attributes in the CSS selector. If you want to reuse the css_selectors, it might be better to set this to False.
+
+	    coordinate_clicks: False
+	        Click elements at the position captured by the DOM snapshot after a hit test, instead of locating them first
+
+	    screenshot: ScreenshotPolicy()
+	        When state screenshots are taken, their format, quality and size
 	"""
 
 	cookies_file: str | None = None
 	minimum_wait_page_load_time: float = 0.25
 	wait_for_network_idle_page_load_time: float = 0.5
 	maximum_wait_page_load_time: float = 5
+	adaptive_settle: AdaptiveSettleConfig | None = None
 	wait_between_actions: float = 0.5
 
 	disable_security: bool = True
@@ -122,6 +153,10 @@ class BrowserContextConfig:
 
 	save_recording_path: str | None = None
 	save_downloads_path: str | None = None
+	download_filename: str | None = None
+	download_start_timeout: float = 0.25
+	print_to_pdf: bool = False
+	resource_policy: ResourcePolicy | None = None
 	trace_path: str | None = None
 	locale: str | None = None
 	user_agent: str = (
@@ -132,6 +167,8 @@ class BrowserContextConfig:
 	viewport_expansion: int = 500
 	allowed_domains: list[str] | None = None
 	include_dynamic_attributes: bool = True
+	coordinate_clicks: bool = False
+	screenshot: ScreenshotPolicy = field(default_factory=ScreenshotPolicy)
 
 	_force_keep_context_alive: bool = False
 
@@ -155,19 +192,32 @@ class BrowserContext:
 	def __init__(
 		self,
 		browser: 'Browser',
-		config: BrowserContextConfig = BrowserContextConfig(),
+		config: BrowserContextConfig | None = None,
 		state: Optional[BrowserContextState] = None,
 	):
 		self.context_id = str(uuid.uuid4())
 		logger.debug(f'Initializing new browser context with id: {self.context_id}')
 
-		self.config = config
+		self.config = config or BrowserContextConfig()
 		self.browser = browser
 
 		self.state = state or BrowserContextState()
 
 		# Initialize these as None - they'll be set up when needed
 		self.session: BrowserSession | None = None
+		self.downloads: DownloadManager | None = None
+		self.printing: PrintToPDF | None = None
+		self.resources: ResourceBlocker | None = None
+		self.network: dict[Page, NetworkIdleTracker] = {}
+		self.tabs = TabRegistry()
+		self.screenshots = ScreenshotCapturer(self.config.screenshot)
+		# page and change token of the last DOM snapshot, see browser/changes.py
+		self._snapshot_token: tuple[Page, ChangeToken] | None = None
+		# page, snapshot id and selector map of the element registry the last snapshot left in the page
+		self._element_registry: tuple[Page, str, SelectorMap] | None = None
+		self.settle: SettleProfiles | None = (
+			shared_settle_profiles(self.config.adaptive_settle) if self.config.adaptive_settle else None
+		)
 
 	async def __aenter__(self):
 		"""Async context manager entry"""
@@ -196,8 +246,27 @@ class BrowserContext:
 					logger.debug(f'Failed to remove CDP listener: {e}')
 				self._page_event_handler = None
 
+			try:
+				self.session.context.remove_listener('page', self._track_network)
+			except Exception as e:
+				logger.debug(f'Failed to remove network listener: {e}')
+			for tracker in self.network.values():
+				tracker.detach()
+			self.network.clear()
+			self.tabs.detach(self.session.context)
+			self.screenshots.clear()
+
 			await self.save_cookies()
 
+			if self.settle:
+				await asyncio.to_thread(self.settle.save)
+
+			if self.downloads:
+				await self.downloads.close()
+
+			if self.resources:
+				logger.info(f'🚫  Resource policy: {self.resources.stats}')
+
 			if self.config.trace_path:
 				try:
 					await self.session.context.tracing.stop(path=os.path.join(self.config.trace_path, f'{self.context_id}.zip'))
@@ -239,6 +308,12 @@ class BrowserContext:
 		context = await self._create_context(playwright_browser)
 		self._page_event_handler = None
 
+		# a synchronous listener, so the tracker sees the first request of a new page
+		context.on('page', self._track_network)
+		for page in context.pages:
+			self._track_network(page)
+		self.tabs.attach(context)
+
 		# Get or create a page to use
 		pages = context.pages
 
@@ -279,6 +354,7 @@ class BrowserContext:
 						break
 
 		# Bring page to front
+		self.tabs.activate(active_page)
 		await active_page.bring_to_front()
 		await active_page.wait_for_load_state('load')
 
@@ -314,6 +390,9 @@ class BrowserContext:
 		elif self.browser.config.chrome_instance_path and len(browser.contexts) > 0:
 			# Connect to existing Chrome instance instead of creating new one
 			context = browser.contexts[0]
+		elif self.browser.config.user_data_dir and len(browser.contexts) > 0:
+			# Persistent profiles have exactly one context, launched with the browser
+			context = browser.contexts[0]
 		else:
 			# Original code for creating new context
 			context = await browser.new_context(
@@ -331,6 +410,16 @@ class BrowserContext:
 		if self.config.trace_path:
 			await context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
+		if self.config.save_downloads_path:
+			self.downloads = DownloadManager(self.config.save_downloads_path, self.config.download_filename)
+			self.downloads.attach(context)
+			if self.config.print_to_pdf:
+				await self.enable_print_to_pdf(context)
+
+		if self.config.resource_policy:
+			self.resources = ResourceBlocker(self.config.resource_policy)
+			await self.resources.attach(context)
+
 		# Load cookies if they exist
 		if self.config.cookies_file and os.path.exists(self.config.cookies_file):
 			with open(self.config.cookies_file, 'r') as f:
@@ -338,6 +427,9 @@ class BrowserContext:
 				logger.info(f'Loaded {len(cookies)} cookies from {self.config.cookies_file}')
 				await context.add_cookies(cookies)
 
+		# counts DOM changes so unchanged pages are not extracted again
+		await context.add_init_script(CHANGE_TRACKER_SCRIPT)
+
 		# Expose anti-detection scripts
 		await context.add_init_script(
 			"""
@@ -377,172 +469,24 @@ class BrowserContext:
 
 		return context
 
-	async def _wait_for_stable_network(self):
-		page = await self.get_current_page()
-
-		pending_requests = set()
-		last_activity = asyncio.get_event_loop().time()
-
-		# Define relevant resource types and content types
-		RELEVANT_RESOURCE_TYPES = {
-			'document',
-			'stylesheet',
-			'image',
-			'font',
-			'script',
-			'iframe',
-		}
-
-		RELEVANT_CONTENT_TYPES = {
-			'text/html',
-			'text/css',
-			'application/javascript',
-			'image/',
-			'font/',
-			'application/json',
-		}
-
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
-		async def on_request(request):
-			# Filter by resource type
-			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
-				return
-
-			# Filter out streaming, websocket, and other real-time requests
-			if request.resource_type in {
-				'websocket',
-				'media',
-				'eventsource',
-				'manifest',
-				'other',
-			}:
-				return
-
-			# Filter out by URL patterns
-			url = request.url.lower()
-			if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
-				return
-
-			# Filter out data URLs and blob URLs
-			if url.startswith(('data:', 'blob:')):
-				return
-
-			# Filter out requests with certain headers
-			headers = request.headers
-			if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in [
-				'video',
-				'audio',
-			]:
-				return
-
-			nonlocal last_activity
-			pending_requests.add(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request started: {request.url} ({request.resource_type})')
-
-		async def on_response(response):
-			request = response.request
-			if request not in pending_requests:
-				return
-
-			# Filter by content type if available
-			content_type = response.headers.get('content-type', '').lower()
-
-			# Skip if content type indicates streaming or real-time data
-			if any(
-				t in content_type
-				for t in [
-					'streaming',
-					'video',
-					'audio',
-					'webm',
-					'mp4',
-					'event-stream',
-					'websocket',
-					'protobuf',
-				]
-			):
-				pending_requests.remove(request)
-				return
-
-			# Only process relevant content types
-			if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
-				pending_requests.remove(request)
-				return
-
-			# Skip if response is too large (likely not essential for page load)
-			content_length = response.headers.get('content-length')
-			if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB
-				pending_requests.remove(request)
-				return
-
-			nonlocal last_activity
-			pending_requests.remove(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request resolved: {request.url} ({content_type})')
-
-		# Attach event listeners
-		page.on('request', on_request)
-		page.on('response', on_response)
+	def _track_network(self, page: Page) -> NetworkIdleTracker:
+		"""Install the network tracker of a page, once for its lifetime"""
+		if page not in self.network:
+			self.network[page] = NetworkIdleTracker(page, self.config.wait_for_network_idle_page_load_time).attach()
+			page.once('close', lambda _: self.network.pop(page, None))
+		return self.network[page]
 
-		try:
-			# Wait for idle time
-			start_time = asyncio.get_event_loop().time()
-			while True:
-				await asyncio.sleep(0.1)
-				now = asyncio.get_event_loop().time()
-				if len(pending_requests) == 0 and (now - last_activity) >= self.config.wait_for_network_idle_page_load_time:
-					break
-				if now - start_time > self.config.maximum_wait_page_load_time:
-					logger.debug(
-						f'Network timeout after {self.config.maximum_wait_page_load_time}s with {len(pending_requests)} '
-						f'pending requests: {[r.url for r in pending_requests]}'
-					)
-					break
+	async def _wait_for_stable_network(self, timeout: float | None = None):
+		page = await self.get_current_page()
+		tracker = self._track_network(page)
+		timeout = timeout or self.config.maximum_wait_page_load_time
 
-		finally:
-			# Clean up event listeners
-			page.remove_listener('request', on_request)
-			page.remove_listener('response', on_response)
+		if not await tracker.wait_for_idle(timeout):
+			pending = tracker.pending
+			logger.debug(
+				f'Network timeout after {timeout:.2f}s with {len(pending)} pending requests: {[r.url for r in pending]}'
+			)
+			return
 
 		logger.debug(f'Network stabilized for {self.config.wait_for_network_idle_page_load_time} seconds')
 
@@ -554,10 +498,21 @@ class BrowserContext:
 		"""
 		# Start timing
 		start_time = time.time()
+		minimum_wait = timeout_overwrite or self.config.minimum_wait_page_load_time
 
 		# Wait for page load
 		try:
-			await self._wait_for_stable_network()
+			page = await self.get_current_page()
+			if self.settle:
+				settle = self.settle.settle_times(page.url, self.config.maximum_wait_page_load_time, self.config.minimum_wait_page_load_time)
+				# an idle page settles at once, such waits would pull the learned timeout towards zero
+				busy = not self._track_network(page).idle.is_set()
+				await self._wait_for_stable_network(settle.timeout)
+				if busy:
+					# a click may have navigated to another site meanwhile, the wait belongs to where the page is now
+					self.settle.record(page.url, time.time() - start_time)
+			else:
+				await self._wait_for_stable_network()
 
 			# Check if the loaded URL is allowed
 			page = await self.get_current_page()
@@ -570,7 +525,7 @@ class BrowserContext:
 
 		# Calculate remaining time to meet minimum WAIT_TIME
 		elapsed = time.time() - start_time
-		remaining = max((timeout_overwrite or self.config.minimum_wait_page_load_time) - elapsed, 0)
+		remaining = max(minimum_wait - elapsed, 0)
 
 		logger.debug(f'--Page loaded in {elapsed:.2f} seconds, waiting for additional {remaining:.2f} seconds')
 
@@ -621,6 +576,42 @@ class BrowserContext:
 		await page.goto(url)
 		await page.wait_for_load_state()
 
+	async def enable_print_to_pdf(self, context: PlaywrightBrowserContext | None = None) -> bool:
+		"""Route window.print() of this context to a PDF in save_downloads_path, installed once per context"""
+		if self.printing:
+			return True
+		if not self.downloads:
+			return False
+		if context is None:
+			context = (await self.get_session()).context
+		self.printing = PrintToPDF(self.downloads)
+		await self.printing.attach(context)
+		return True
+
+	async def restore_storage_state(self, storage_state: dict) -> None:
+		"""Restore cookies and localStorage saved with Playwright's `storage_state()` into the running context"""
+		session = await self.get_session()
+
+		cookies = storage_state.get('cookies')
+		if cookies:
+			await session.context.add_cookies(cookies)
+
+		origins = {
+			origin['origin']: {item['name']: item['value'] for item in origin.get('localStorage', [])}
+			for origin in storage_state.get('origins', [])
+		}
+		if origins:
+			# localStorage can only be written from a page of the origin, so seed it whenever one loads
+			await session.context.add_init_script(
+				'(origins => {'
+				'  const items = origins[window.location.origin];'
+				'  if (!items) return;'
+				'  for (const [name, value] of Object.entries(items)) {'
+				'    if (window.localStorage.getItem(name) === null) window.localStorage.setItem(name, value);'
+				'  }'
+				f'}})({json.dumps(origins)});'
+			)
+
 	async def refresh_page(self):
 		"""Refresh the current page"""
 		page = await self.get_current_page()
@@ -741,11 +732,12 @@ class BrowserContext:
 		return structure
 
 	@time_execution_sync('--get_state')  # This decorator might need to be updated to handle async
-	async def get_state(self) -> BrowserState:
-		"""Get the current state of the browser"""
-		await self._wait_for_page_and_frames_load()
+	async def get_state(self, vision: bool = True, wait_for_load: bool = True) -> BrowserState:
+		"""Get the current state of the browser, `wait_for_load=False` when the caller just waited, e.g. in has_page_changed"""
+		if wait_for_load:
+			await self._wait_for_page_and_frames_load()
 		session = await self.get_session()
-		session.cached_state = await self._update_state()
+		session.cached_state = await self._update_state(vision=vision)
 
 		# Save cookies if a file is specified
 		if self.config.cookies_file:
@@ -753,50 +745,53 @@ class BrowserContext:
 
 		return session.cached_state
 
-	async def _update_state(self, focus_element: int = -1) -> BrowserState:
-		"""Update and return state."""
+	async def _update_state(self, focus_element: int = -1, vision: bool = True) -> BrowserState:
+		"""Update and return state, with a screenshot if the policy wants one for a caller with or without vision."""
 		session = await self.get_session()
+		page = await self.get_current_page()
+		take_screenshot = self.config.screenshot.wanted(vision)
+
+		if focus_element == -1:
+			reused = await self._reuse_unchanged_state(session, page, take_screenshot)
+			if reused:
+				return reused
 
-		# Check if current page is still valid, if not switch to another available page
 		try:
-			page = await self.get_current_page()
-			# Test if page is still accessible
-			await page.evaluate('1')
-		except Exception as e:
-			logger.debug(f'Current page is no longer accessible: {str(e)}')
-			# Get all available pages
-			pages = session.context.pages
-			if pages:
+			try:
+				content, page_info = await self._snapshot(page, focus_element)
+			except Exception as e:
+				# the DOM script doubles as the liveness check, only a page that went away is replaced
+				if not page.is_closed() and page in session.context.pages:
+					raise
+				logger.debug(f'Current page is no longer accessible: {str(e)}')
+				if not session.context.pages:
+					raise BrowserError('Browser closed: no valid pages available')
 				self.state.target_id = None
 				page = await self._get_current_page(session)
-				logger.debug(f'Switched to page: {await page.title()}')
-			else:
-				raise BrowserError('Browser closed: no valid pages available')
+				content, page_info = await self._snapshot(page, focus_element)
+				logger.debug(f'Switched to page: {page_info.title}')
+			self.tabs.update(page, url=page.url, title=page_info.title)
 
-		try:
-			await self.remove_highlights()
-			dom_service = DomService(page)
-			content = await dom_service.get_clickable_elements(
-				focus_element=focus_element,
-				viewport_expansion=self.config.viewport_expansion,
-				highlight_elements=self.config.highlight_elements,
-			)
-
-			screenshot_b64 = await self.take_screenshot()
-			pixels_above, pixels_below = await self.get_scroll_info(page)
+			# after the DOM script, the screenshot shows its highlights
+			screenshot_b64, mime_type = await self._screenshot(page) if take_screenshot else (None, None)
 
 			self.current_state = BrowserState(
 				element_tree=content.element_tree,
 				selector_map=content.selector_map,
 				url=page.url,
-				title=await page.title(),
-				tabs=await self.get_tabs_info(),
+				title=page_info.title,
+				tabs=self.tabs.tabs(),
 				screenshot=screenshot_b64,
-				pixels_above=pixels_above,
-				pixels_below=pixels_below,
+				screenshot_mime_type=mime_type or 'image/png',
+				pixels_above=page_info.pixels_above,
+				pixels_below=page_info.pixels_below,
 			)
+			self._snapshot_token = (page, page_info.change_token) if page_info.change_token else None
+			self._element_registry = (page, page_info.snapshot_id, content.selector_map) if page_info.snapshot_id else None
 
 			return self.current_state
+		except BrowserError:
+			raise
 		except Exception as e:
 			logger.error(f'Failed to update state: {str(e)}')
 			# Return last known good state if available
@@ -804,27 +799,84 @@ class BrowserContext:
 				return self.current_state
 			raise
 
+	async def _reuse_unchanged_state(self, session: BrowserSession, page: Page, take_screenshot: bool) -> BrowserState | None:
+		"""The cached state with a new screenshot if the page did not change since it was taken, else None"""
+		if session.cached_state is None or self._snapshot_token is None or self._snapshot_token[0] is not page:
+			return None
+		# puts back highlights hidden by hide_highlights in the same round trip
+		if await read_change_token(page, expected=self._snapshot_token[1]) != self._snapshot_token[1]:
+			return None
+
+		screenshot_b64, mime_type = None, session.cached_state.screenshot_mime_type
+		if take_screenshot:
+			try:
+				screenshot_b64, mime_type = await self._screenshot(page)
+			except Exception as e:
+				logger.debug(f'Failed to take screenshot of unchanged page: {e}')
+				return None
+
+		logger.debug('Page unchanged since the last snapshot, reusing its DOM state')
+		self.current_state = replace(
+			session.cached_state,
+			url=page.url,
+			tabs=self.tabs.tabs(),
+			screenshot=screenshot_b64,
+			screenshot_mime_type=mime_type,
+		)
+		return self.current_state
+
+	async def has_page_changed(self) -> bool:
+		"""
+		Whether the current page changed since the last get_state, checked once it settled.
+		A get_state right after it can pass `wait_for_load=False`, the page load wait was already paid here.
+		"""
+		await self._wait_for_page_and_frames_load()
+		page = await self.get_current_page()
+		if self._snapshot_token is None or self._snapshot_token[0] is not page:
+			return True
+		return await read_change_token(page) != self._snapshot_token[1]
+
+	async def _snapshot(self, page: Page, focus_element: int) -> tuple[DOMState, PageInfo]:
+		"""DOM, title and scroll metrics in one evaluate, concurrently with bringing the page to front"""
+		dom_service = DomService(page)
+		(content, page_info), _ = await asyncio.gather(
+			dom_service.get_page_snapshot(
+				focus_element=focus_element,
+				viewport_expansion=self.config.viewport_expansion,
+				highlight_elements=self.config.highlight_elements,
+				remove_highlights=True,
+			),
+			page.bring_to_front(),
+		)
+		return content, page_info
+
 	# region - Browser Actions
 	@time_execution_async('--take_screenshot')
-	async def take_screenshot(self, full_page: bool = False) -> str:
+	async def take_screenshot(self, full_page: bool | None = None) -> str:
 		"""
-		Returns a base64 encoded screenshot of the current page.
+		Returns a base64 encoded screenshot of the current page, in the format of the screenshot policy.
 		"""
 		page = await self.get_current_page()
 
 		await page.bring_to_front()
 		await page.wait_for_load_state()
 
-		screenshot = await page.screenshot(
-			full_page=full_page,
-			animations='disabled',
-		)
-
-		screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
+		screenshot_b64, _ = await self._screenshot(page, full_page)
+		return screenshot_b64
 
-		# await self.remove_highlights()
+	async def _screenshot(self, page: Page, full_page: bool | None = None) -> tuple[str, str]:
+		return await self.screenshots.capture(page, full_page)
 
-		return screenshot_b64
+	async def hide_highlights(self):
+		"""
+		Take the highlights off the page while acting on it.
+		Unlike remove_highlights, a state reused for an unchanged page can show them again without a new snapshot.
+		"""
+		try:
+			page = await self.get_current_page()
+			await page.evaluate(HIDE_HIGHLIGHTS_SCRIPT)
+		except Exception as e:
+			logger.debug(f'Failed to hide highlights (this is usually ok): {str(e)}')
 
 	@time_execution_async('--remove_highlights')
 	async def remove_highlights(self):
@@ -919,6 +971,44 @@ class BrowserContext:
 		base_selector = ' > '.join(css_parts)
 		return base_selector
 
+	VALID_CLASS_NAME = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
+	WHITESPACE = re.compile(r'\s+')
+
+	# Expanded set of safe attributes that are stable and useful for selection
+	SAFE_ATTRIBUTES = frozenset(
+		{
+			# Data attributes (if they're stable in your application)
+			'id',
+			# Standard HTML attributes
+			'name',
+			'type',
+			'placeholder',
+			# Accessibility attributes
+			'aria-label',
+			'aria-labelledby',
+			'aria-describedby',
+			'role',
+			# Common form attributes
+			'for',
+			'autocomplete',
+			'required',
+			'readonly',
+			# Media attributes
+			'alt',
+			'title',
+			'src',
+			# Custom stable attributes (add any application-specific ones)
+			'href',
+			'target',
+		}
+	)
+	SAFE_AND_DYNAMIC_ATTRIBUTES = SAFE_ATTRIBUTES | {
+		'data-id',
+		'data-qa',
+		'data-cy',
+		'data-testid',
+	}
+
 	@classmethod
 	@time_execution_sync('--enhanced_css_selector_for_element')
 	def _enhanced_css_selector_for_element(cls, element: DOMElementNode, include_dynamic_attributes: bool = True) -> str:
@@ -937,9 +1027,6 @@ class BrowserContext:
 
 			# Handle class attributes
 			if 'class' in element.attributes and element.attributes['class'] and include_dynamic_attributes:
-				# Define a regex pattern for valid class names in CSS
-				valid_class_name_pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
-
 				# Iterate through the class attribute values
 				classes = element.attributes['class'].split()
 				for class_name in classes:
@@ -948,48 +1035,14 @@ class BrowserContext:
 						continue
 
 					# Check if the class name is valid
-					if valid_class_name_pattern.match(class_name):
+					if cls.VALID_CLASS_NAME.match(class_name):
 						# Append the valid class name to the CSS selector
 						css_selector += f'.{class_name}'
 					else:
 						# Skip invalid class names
 						continue
 
-			# Expanded set of safe attributes that are stable and useful for selection
-			SAFE_ATTRIBUTES = {
-				# Data attributes (if they're stable in your application)
-				'id',
-				# Standard HTML attributes
-				'name',
-				'type',
-				'placeholder',
-				# Accessibility attributes
-				'aria-label',
-				'aria-labelledby',
-				'aria-describedby',
-				'role',
-				# Common form attributes
-				'for',
-				'autocomplete',
-				'required',
-				'readonly',
-				# Media attributes
-				'alt',
-				'title',
-				'src',
-				# Custom stable attributes (add any application-specific ones)
-				'href',
-				'target',
-			}
-
-			if include_dynamic_attributes:
-				dynamic_attributes = {
-					'data-id',
-					'data-qa',
-					'data-cy',
-					'data-testid',
-				}
-				SAFE_ATTRIBUTES.update(dynamic_attributes)
+			safe_attributes = cls.SAFE_AND_DYNAMIC_ATTRIBUTES if include_dynamic_attributes else cls.SAFE_ATTRIBUTES
 
 			# Handle other attributes
 			for attribute, value in element.attributes.items():
@@ -1000,7 +1053,7 @@ class BrowserContext:
 				if not attribute.strip():
 					continue
 
-				if attribute not in SAFE_ATTRIBUTES:
+				if attribute not in safe_attributes:
 					continue
 
 				# Escape special characters in attribute names
@@ -1012,7 +1065,7 @@ class BrowserContext:
 				elif any(char in value for char in '"\'<>`\n\r\t'):
 					# Use contains for values with special characters
 					# Regex-substitute *any* whitespace with a single space, then strip.
-					collapsed_value = re.sub(r'\s+', ' ', value).strip()
+					collapsed_value = cls.WHITESPACE.sub(' ', value).strip()
 					# Escape embedded double-quotes.
 					safe_value = collapsed_value.replace('"', '\\"')
 					css_selector += f'[{safe_attribute}*="{safe_value}"]'
@@ -1030,6 +1083,15 @@ class BrowserContext:
 	async def get_locate_element(self, element: DOMElementNode) -> Optional[ElementHandle]:
 		current_frame = await self.get_current_page()
 
+		# elements of the last snapshot resolve through its registry in the page, selectors are the fallback
+		element_handle = await self._get_registered_element(current_frame, element)
+		if element_handle:
+			try:
+				await element_handle.scroll_into_view_if_needed()
+			except Exception as e:
+				logger.debug(f'Failed to scroll element into view: {e}')
+			return element_handle
+
 		# Start with the target element and collect all parents
 		parents: list[DOMElementNode] = []
 		current = element
@@ -1069,6 +1131,31 @@ class BrowserContext:
 			logger.error(f'Failed to locate element: {str(e)}')
 			return None
 
+	def _registry_snapshot_id(self, page: Page, element: DOMElementNode) -> str | None:
+		"""Snapshot id of the page's element registry if the element belongs to that snapshot"""
+		if self._element_registry is None or element.highlight_index is None:
+			return None
+		registry_page, snapshot_id, selector_map = self._element_registry
+		if registry_page is not page or selector_map.get(element.highlight_index) is not element:
+			return None
+		return snapshot_id
+
+	async def _get_registered_element(self, page: Page, element: DOMElementNode) -> Optional[ElementHandle]:
+		"""The element from the registry of its snapshot, None if the page no longer holds that snapshot"""
+		snapshot_id = self._registry_snapshot_id(page, element)
+		if snapshot_id is None:
+			return None
+		return await resolve_registered_element(page, snapshot_id, element)
+
+	async def _get_clickable_point(self, page: Page, element: DOMElementNode) -> tuple[int, int] | None:
+		"""Captured center of the element if clicking there still reaches it, None to locate the element instead"""
+		if not self.config.coordinate_clicks:
+			return None
+		snapshot_id = self._registry_snapshot_id(page, element)
+		if snapshot_id is None:
+			return None
+		return await hit_test(page, snapshot_id, element)
+
 	@time_execution_async('--input_text_element_node')
 	async def _input_text_element_node(self, element_node: DOMElementNode, text: str):
 		"""
@@ -1124,38 +1211,36 @@ class BrowserContext:
 			# if element_node.highlight_index is not None:
 			# 	await self._update_state(focus_element=element_node.highlight_index)
 
+			async def perform_click(click_func):
+				"""Performs the actual click, handling both download
+				and navigation scenarios."""
+				marker = self.downloads.mark() if self.downloads else 0
+				await click_func()
+				await page.wait_for_load_state()
+				await self._check_and_handle_navigation(page)
+
+				# downloads are captured in the background, only wait if this click started one
+				if self.downloads:
+					# the download event often fires a moment after the click's load state
+					started = await self.downloads.wait_for_start(marker, self.config.download_start_timeout)
+					if started:
+						await self.downloads.wait_for(started)
+						for info in started:
+							info.reported = True
+						saved = [info.path for info in started if info.status == 'completed']
+						if saved:
+							return saved[-1]
+
+			# the position from the snapshot saves locating the element, and works on canvas-like widgets
+			point = await self._get_clickable_point(page, element_node)
+			if point:
+				return await perform_click(lambda: page.mouse.click(*point))
+
 			element_handle = await self.get_locate_element(element_node)
 
 			if element_handle is None:
 				raise Exception(f'Element: {repr(element_node)} not found')
 
-			async def perform_click(click_func):
-				"""Performs the actual click, handling both download
-				and navigation scenarios."""
-				if self.config.save_downloads_path:
-					try:
-						# Try short-timeout expect_download to detect a file download has been been triggered
-						async with page.expect_download(timeout=5000) as download_info:
-							await click_func()
-						download = await download_info.value
-						# Determine file path
-						suggested_filename = download.suggested_filename
-						unique_filename = await self._get_unique_filename(self.config.save_downloads_path, suggested_filename)
-						download_path = os.path.join(self.config.save_downloads_path, unique_filename)
-						await download.save_as(download_path)
-						logger.debug(f'Download triggered. Saved file to: {download_path}')
-						return download_path
-					except TimeoutError:
-						# If no download is triggered, treat as normal click
-						logger.debug('No download triggered within timeout. Checking navigation...')
-						await page.wait_for_load_state()
-						await self._check_and_handle_navigation(page)
-				else:
-					# Standard click logic if no download is expected
-					await click_func()
-					await page.wait_for_load_state()
-					await self._check_and_handle_navigation(page)
-
 			try:
 				return await perform_click(lambda: element_handle.click(timeout=1500))
 			except URLNotAllowedError as e:
@@ -1175,27 +1260,19 @@ class BrowserContext:
 
 	@time_execution_async('--get_tabs_info')
 	async def get_tabs_info(self) -> list[TabInfo]:
-		"""Get information about all tabs"""
-		session = await self.get_session()
-
-		tabs_info = []
-		for page_id, page in enumerate(session.context.pages):
-			tab_info = TabInfo(page_id=page_id, url=page.url, title=await page.title())
-			tabs_info.append(tab_info)
-
-		return tabs_info
+		"""Get information about all tabs, read from the tab registry without asking the browser"""
+		await self.get_session()
+		return self.tabs.tabs()
 
 	@time_execution_async('--switch_to_tab')
 	async def switch_to_tab(self, page_id: int) -> None:
-		"""Switch to a specific tab by its page_id"""
-		session = await self.get_session()
-		pages = session.context.pages
+		"""Switch to a specific tab by its page_id, -1 is the most recently opened tab"""
+		await self.get_session()
+		page = self.tabs.page(page_id)
 
-		if page_id >= len(pages):
+		if page is None:
 			raise BrowserError(f'No tab found with page_id: {page_id}')
 
-		page = pages[page_id]
-
 		# Check if the tab's URL is allowed before switching
 		if not self._is_url_allowed(page.url):
 			raise BrowserError(f'Cannot switch to tab with non-allowed URL: {page.url}')
@@ -1208,6 +1285,7 @@ class BrowserContext:
 					self.state.target_id = target['targetId']
 					break
 
+		self.tabs.activate(page)
 		await page.bring_to_front()
 		await page.wait_for_load_state()
 
@@ -1219,6 +1297,7 @@ class BrowserContext:
 
 		session = await self.get_session()
 		new_page = await session.context.new_page()
+		self.tabs.activate(new_page)
 		await new_page.wait_for_load_state()
 
 		if url:
@@ -1248,6 +1327,11 @@ class BrowserContext:
 						if page.url == target['url']:
 							return page
 
+		# the tab the agent switched to, or the latest popup
+		active_page = self.tabs.active_page()
+		if active_page is not None and not active_page.is_closed():
+			return active_page
+
 		# Fallback to last page
 		return pages[-1] if pages else await session.context.new_page()
 
@@ -1312,9 +1396,9 @@ class BrowserContext:
 
 	async def get_scroll_info(self, page: Page) -> tuple[int, int]:
 		"""Get scroll position information for the current page."""
-		scroll_y = await page.evaluate('window.scrollY')
-		viewport_height = await page.evaluate('window.innerHeight')
-		total_height = await page.evaluate('document.documentElement.scrollHeight')
+		scroll_y, viewport_height, total_height = await page.evaluate(
+			'[window.scrollY, window.innerHeight, document.documentElement.scrollHeight]'
+		)
 		pixels_above = scroll_y
 		pixels_below = total_height - (scroll_y + viewport_height)
 		return pixels_above, pixels_below
@@ -0,0 +1,149 @@
+"""
+Event driven download handling for a browser context.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Download, Page
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DownloadInfo:
+	id: int
+	url: str
+	suggested_filename: str
+	path: Optional[str] = None
+	status: Literal['in_progress', 'completed', 'failed'] = 'in_progress'
+	error: Optional[str] = None
+	started_at: float = field(default_factory=time.monotonic)
+	finished_at: Optional[float] = None
+	reported: bool = False
+
+
+class DownloadManager:
+	"""
+	Captures every download of a context in the background.
+
+	Listens to the `download` event of all pages instead of wrapping clicks in `expect_download`,
+	so ordinary clicks never wait for a download that is not coming.
+	Downloads are saved to `downloads_path` as `filename` if given, otherwise under the suggested name made unique.
+	"""
+
+	def __init__(self, downloads_path: str, filename: Optional[str] = None):
+		self.downloads_path = downloads_path
+		self.filename = filename
+		self.downloads: list[DownloadInfo] = []
+		self._tasks: dict[int, asyncio.Task] = {}
+		self._started = asyncio.Event()
+
+	def attach(self, context: PlaywrightBrowserContext) -> None:
+		"""Watch all current and future pages of the context"""
+		for page in context.pages:
+			self.watch_page(page)
+		context.on('page', self.watch_page)
+
+	def watch_page(self, page: Page) -> None:
+		page.on('download', self._on_download)
+
+	def mark(self) -> int:
+		"""Marker to pass to `started_since` to find downloads started after this call"""
+		return len(self.downloads)
+
+	def started_since(self, marker: int) -> list[DownloadInfo]:
+		return self.downloads[marker:]
+
+	async def wait_for_start(self, marker: int, timeout: float) -> list[DownloadInfo]:
+		"""Downloads started since `marker`, waits up to `timeout` seconds for one if none has started yet"""
+		if len(self.downloads) == marker and timeout > 0:
+			self._started.clear()
+			try:
+				await asyncio.wait_for(self._started.wait(), timeout=timeout)
+			except asyncio.TimeoutError:
+				pass
+		return self.started_since(marker)
+
+	async def wait_for(self, downloads: list[DownloadInfo], timeout: Optional[float] = None) -> list[DownloadInfo]:
+		"""Wait until the given downloads are saved or failed, returns them"""
+		tasks = [self._tasks[info.id] for info in downloads if info.id in self._tasks]
+		if tasks:
+			await asyncio.wait(tasks, timeout=timeout)
+		return downloads
+
+	def pop_unreported(self) -> list[DownloadInfo]:
+		"""Finished downloads the agent has not been told about yet"""
+		finished = [info for info in self.downloads if info.status != 'in_progress' and not info.reported]
+		for info in finished:
+			info.reported = True
+		return finished
+
+	async def close(self, timeout: float = 5.0) -> None:
+		"""Give running downloads `timeout` seconds to finish before the context goes away"""
+		pending = [task for task in self._tasks.values() if not task.done()]
+		if not pending:
+			return
+		_, still_pending = await asyncio.wait(pending, timeout=timeout)
+		for task in still_pending:
+			task.cancel()
+		if still_pending:
+			logger.warning(f'Cancelled {len(still_pending)} downloads that did not finish before the context was closed')
+
+	def record(self, download: Download) -> DownloadInfo:
+		"""
+		Save a download that did not come from a page's `download` event, e.g. a printed page.
+
+		Anything with `url`, `suggested_filename` and an async `save_as(path)` works.
+		"""
+		info = DownloadInfo(id=len(self.downloads), url=download.url, suggested_filename=download.suggested_filename)
+		self.downloads.append(info)
+		self._started.set()
+		logger.debug(f'Download started: {info.suggested_filename} from {info.url}')
+
+		task = asyncio.create_task(self._save(download, info))
+		self._tasks[info.id] = task
+		task.add_done_callback(lambda _: self._tasks.pop(info.id, None))
+		return info
+
+	def _on_download(self, download: Download) -> None:
+		self.record(download)
+
+	async def _save(self, download: Download, info: DownloadInfo) -> None:
+		try:
+			os.makedirs(self.downloads_path, exist_ok=True)
+			# reserve the path right away so concurrent downloads with the same name do not collide
+			info.path = self._target_path(info.suggested_filename)
+			# save_as waits for the download to finish, the browser already streams it to a temporary file
+			await download.save_as(info.path)
+			info.status = 'completed'
+			logger.info(f'💾  Download saved to: {info.path}')
+		except asyncio.CancelledError:
+			info.status = 'failed'
+			info.error = 'cancelled'
+			raise
+		except Exception as e:
+			info.status = 'failed'
+			info.error = str(e)
+			logger.warning(f'Download of {info.suggested_filename} failed: {e}')
+		finally:
+			info.finished_at = time.monotonic()
+
+	def _target_path(self, suggested_filename: str) -> str:
+		if self.filename:
+			# custom names are fixed by the caller, a retried task overwrites its earlier file
+			return os.path.join(self.downloads_path, self.filename)
+
+		base, ext = os.path.splitext(suggested_filename)
+		taken = {info.path for info in self.downloads if info.path and info.status != 'failed'}
+		counter = 1
+		filename = suggested_filename
+		while os.path.exists(os.path.join(self.downloads_path, filename)) or os.path.join(self.downloads_path, filename) in taken:
+			filename = f'{base} ({counter}){ext}'
+			counter += 1
+		return os.path.join(self.downloads_path, filename)
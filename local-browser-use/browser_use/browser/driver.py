@@ -0,0 +1,103 @@
+"""
+Playwright driver shared by all browsers of an event loop.
+"""
+
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+
+from playwright.async_api import Playwright, async_playwright
+
+from browser_use.utils import singleton
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Driver:
+	playwright: Optional[Playwright] = None
+	refs: int = 0
+	lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+	idle_handle: Optional[asyncio.TimerHandle] = None
+
+
+@singleton
+class PlaywrightDriver:
+	"""
+	Reference counted Playwright driver, one Node process per event loop instead of one per Browser.
+
+	The driver starts with the first `acquire` and stops with the last `release`. On loops marked with
+	`keep_warm`, e.g. the loop of a browser pool, it stops `idle_timeout` seconds after the last `release` instead,
+	so a browser replaced right after closing its predecessor does not pay for a driver restart.
+	Other loops are often short lived (one `asyncio.run` per task) and would close before the idle timer fires.
+	Playwright objects belong to the loop that started them, a driver is never shared across loops.
+	"""
+
+	def __init__(self, idle_timeout: float = 5.0):
+		self.idle_timeout = idle_timeout
+		self._drivers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Driver] = weakref.WeakKeyDictionary()
+		self._warm_loops: weakref.WeakSet[asyncio.AbstractEventLoop] = weakref.WeakSet()
+
+	def keep_warm(self) -> None:
+		"""Keep the driver of the running loop for `idle_timeout` seconds after its last release, the loop must outlive that"""
+		self._warm_loops.add(asyncio.get_running_loop())
+
+	async def acquire(self) -> Playwright:
+		loop = asyncio.get_running_loop()
+		driver = self._drivers.get(loop)
+		if driver is None:
+			driver = self._drivers[loop] = _Driver()
+
+		driver.refs += 1
+		if driver.idle_handle:
+			driver.idle_handle.cancel()
+			driver.idle_handle = None
+
+		try:
+			async with driver.lock:
+				if driver.playwright is None:
+					logger.debug('Starting Playwright driver')
+					driver.playwright = await async_playwright().start()
+				return driver.playwright
+		except BaseException:
+			driver.refs -= 1
+			raise
+
+	async def release(self, playwright: Playwright) -> None:
+		"""Give back a driver from `acquire`, must be called on the loop that acquired it"""
+		loop = asyncio.get_running_loop()
+		driver = self._drivers.get(loop)
+		if driver is None or driver.playwright is not playwright or driver.refs == 0:
+			logger.debug('Released a Playwright driver that is not tracked on this loop')
+			return
+
+		driver.refs -= 1
+		if driver.refs > 0:
+			return
+		if self.idle_timeout <= 0 or loop not in self._warm_loops:
+			await self._stop_if_idle(driver)
+		else:
+			driver.idle_handle = loop.call_later(self.idle_timeout, lambda: loop.create_task(self._stop_if_idle(driver)))
+
+	def refs(self) -> int:
+		"""Browsers holding the driver of the running loop"""
+		driver = self._drivers.get(asyncio.get_running_loop())
+		return driver.refs if driver else 0
+
+	def is_running(self) -> bool:
+		driver = self._drivers.get(asyncio.get_running_loop())
+		return bool(driver and driver.playwright)
+
+	async def _stop_if_idle(self, driver: _Driver) -> None:
+		async with driver.lock:
+			driver.idle_handle = None
+			if driver.refs > 0 or driver.playwright is None:
+				return
+			playwright, driver.playwright = driver.playwright, None
+			logger.debug('Stopping idle Playwright driver')
+			try:
+				await playwright.stop()
+			except Exception as e:
+				logger.debug(f'Failed to stop Playwright driver: {e}')
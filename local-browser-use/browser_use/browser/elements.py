@@ -0,0 +1,101 @@
+"""
+Resolves highlighted elements of the last DOM snapshot through the registry buildDomTree.js keeps in the page.
+"""
+
+import logging
+from typing import Optional
+
+from playwright.async_api import ElementHandle, Page
+
+from browser_use.dom.views import DOMElementNode
+
+logger = logging.getLogger(__name__)
+
+# Returns the registered element, or the iframe of this document on the way down to it when it lives in another
+# document: a handle created in one frame clicks at the wrong offset inside another, so those resolve in their own frame.
+LOOKUP_SCRIPT = """
+([snapshotId, index, tagName]) => {
+  const registry = window.__browserUseElements;
+  const element = registry && registry.snapshotId === snapshotId ? registry.elements[index] : null;
+  if (!element || !element.isConnected || element.tagName.toLowerCase() !== tagName) return null;
+  let frame = element.ownerDocument === document ? null : element.ownerDocument.defaultView.frameElement;
+  while (frame && frame.ownerDocument !== document) frame = frame.ownerDocument.defaultView.frameElement;
+  return frame || (element.ownerDocument === document ? element : null);
+}
+"""
+
+
+def _iframe_depth(element: DOMElementNode) -> int:
+	depth = 0
+	parent = element.parent
+	while parent is not None:
+		if parent.tag_name == 'iframe':
+			depth += 1
+		parent = parent.parent
+	return depth
+
+
+async def resolve_registered_element(page: Page, snapshot_id: str, element: DOMElementNode) -> Optional[ElementHandle]:
+	"""
+	Live handle of a highlighted element, in one evaluate for the page and one more per iframe around the element.
+	None when the page no longer holds that snapshot or the element was removed since.
+	"""
+	args = [snapshot_id, element.highlight_index, element.tag_name]
+	try:
+		handle = (await page.evaluate_handle(LOOKUP_SCRIPT, args)).as_element()
+		# each lookup returns the next iframe down, the element itself once in its own document
+		for _ in range(_iframe_depth(element)):
+			if handle is None:
+				return None
+			frame = await handle.content_frame()
+			await handle.dispose()
+			if frame is None:
+				return None
+			handle = (await frame.evaluate_handle(LOOKUP_SCRIPT, args)).as_element()
+		return handle
+	except Exception as e:
+		logger.debug(f'Failed to resolve element {element.highlight_index} from the registry: {e}')
+		return None
+
+# Whether a click at the point reaches the registered element, through shadow roots and same-origin iframes.
+# Fails when the page scrolled, the element moved or something covers it.
+HIT_TEST_SCRIPT = """
+([snapshotId, index, x, y]) => {
+  const registry = window.__browserUseElements;
+  const element = registry && registry.snapshotId === snapshotId ? registry.elements[index] : null;
+  if (!element || !element.isConnected) return false;
+  let hit = document.elementFromPoint(x, y);
+  while (hit) {
+    if (hit.shadowRoot) {
+      const inner = hit.shadowRoot.elementFromPoint(x, y);
+      if (inner && inner !== hit) { hit = inner; continue; }
+    }
+    if (hit.tagName === 'IFRAME' && hit.contentDocument) {
+      const rect = hit.getBoundingClientRect();
+      x -= rect.left + hit.clientLeft;
+      y -= rect.top + hit.clientTop;
+      const inner = hit.contentDocument.elementFromPoint(x, y);
+      if (inner) { hit = inner; continue; }
+    }
+    break;
+  }
+  for (let node = hit; node; node = node.parentNode || node.host) {
+    if (node === element) return true;
+  }
+  return false;
+}
+"""
+
+
+async def hit_test(page: Page, snapshot_id: str, element: DOMElementNode) -> Optional[tuple[int, int]]:
+	"""Viewport center of an element captured by the snapshot, if a click there still lands on the element"""
+	coordinates = element.viewport_coordinates
+	if coordinates is None or element.highlight_index is None:
+		return None
+	x, y = coordinates.center.x, coordinates.center.y
+	try:
+		if await page.evaluate(HIT_TEST_SCRIPT, [snapshot_id, element.highlight_index, x, y]):
+			return x, y
+	except Exception as e:
+		logger.debug(f'Failed to hit test element {element.highlight_index}: {e}')
+	return None
@@ -0,0 +1,168 @@
+"""
+Event driven tracking of the requests a page still waits for.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Callable
+
+from playwright.async_api import Page, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Requests the page needs to render, anything else never delays the idle state
+RELEVANT_RESOURCE_TYPES = frozenset({'document', 'stylesheet', 'image', 'font', 'script', 'iframe'})
+
+IGNORED_URL_PATTERNS = [
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+]
+
+# one pass over the URL instead of a substring search per pattern
+IGNORED_URL_RE = re.compile('|'.join(re.escape(pattern) for pattern in IGNORED_URL_PATTERNS), re.IGNORECASE)
+STREAMING_CONTENT_RE = re.compile('streaming|video|audio|webm|mp4|event-stream|websocket|protobuf', re.IGNORECASE)
+RELEVANT_CONTENT_RE = re.compile(r'text/html|text/css|application/javascript|image/|font/|application/json', re.IGNORECASE)
+MAX_RELEVANT_CONTENT_LENGTH = 5 * 1024 * 1024
+
+
+def is_relevant_request(request: Request) -> bool:
+	if request.resource_type not in RELEVANT_RESOURCE_TYPES:
+		return False
+	url = request.url
+	if url.startswith(('data:', 'blob:')) or IGNORED_URL_RE.search(url):
+		return False
+	headers = request.headers
+	if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in ('video', 'audio'):
+		return False
+	return True
+
+
+class NetworkIdleTracker:
+	"""
+	Keeps the set of in-flight requests of a page, installed once when the page is created.
+
+	`idle` is set once no relevant request has been pending for `idle_time` seconds, so waiting on an
+	already idle page returns right away and a busy page is released the moment it turns quiet.
+	`relevant` decides which requests are waited for, by default those a page load needs.
+	"""
+
+	def __init__(self, page: Page, idle_time: float = 0.5, relevant: Callable[[Request], bool] = is_relevant_request):
+		self.page = page
+		self.idle_time = idle_time
+		self.relevant = relevant
+		self.idle = asyncio.Event()
+		self._pending: set[Request] = set()
+		self._timer: asyncio.TimerHandle | None = None
+		self._loop = asyncio.get_running_loop()
+		self.last_activity = self._loop.time()
+
+	@property
+	def pending(self) -> set[Request]:
+		return set(self._pending)
+
+	def attach(self) -> 'NetworkIdleTracker':
+		self.page.on('request', self._on_request)
+		self.page.on('response', self._on_response)
+		self.page.on('requestfailed', self._on_request_done)
+		self._schedule_idle()
+		return self
+
+	def detach(self) -> None:
+		for event, handler in (
+			('request', self._on_request),
+			('response', self._on_response),
+			('requestfailed', self._on_request_done),
+		):
+			try:
+				self.page.remove_listener(event, handler)
+			except Exception:
+				pass
+		if self._timer:
+			self._timer.cancel()
+			self._timer = None
+
+	async def wait_for_idle(self, timeout: float) -> bool:
+		"""Wait until the page is idle, False if it is still busy after `timeout` seconds"""
+		if self.idle.is_set():
+			return True
+		try:
+			await asyncio.wait_for(self.idle.wait(), timeout)
+			return True
+		except asyncio.TimeoutError:
+			return False
+
+	def mark_activity(self) -> None:
+		"""Restart the quiet period, e.g. after a scroll that is about to load lazy content"""
+		self._schedule_idle()
+
+	def _schedule_idle(self, activity: bool = True) -> None:
+		now = self._loop.time()
+		if activity:
+			self.last_activity = now
+			self.idle.clear()
+		if self._timer:
+			self._timer.cancel()
+			self._timer = None
+		if not self._pending:
+			self._timer = self._loop.call_later(max(self.idle_time - (now - self.last_activity), 0), self.idle.set)
+
+	def _on_request(self, request: Request) -> None:
+		if self.relevant(request):
+			self._pending.add(request)
+			self._schedule_idle()
+
+	def _on_response(self, response: Response) -> None:
+		request = response.request
+		if request not in self._pending:
+			return
+
+		# streaming, irrelevant or huge responses stop being waited for without counting as activity
+		headers = response.headers
+		content_type = headers.get('content-type', '')
+		content_length = headers.get('content-length', '')
+		relevant = not (
+			STREAMING_CONTENT_RE.search(content_type)
+			or not RELEVANT_CONTENT_RE.search(content_type)
+			or (content_length.isdigit() and int(content_length) > MAX_RELEVANT_CONTENT_LENGTH)
+		)
+		self._on_request_done(request, activity=relevant)
+
+	def _on_request_done(self, request: Request, activity: bool = True) -> None:
+		if request in self._pending:
+			self._pending.discard(request)
+			self._schedule_idle(activity)
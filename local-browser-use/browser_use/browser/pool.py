@@ -0,0 +1,288 @@
+"""
+Pool of pre-launched browsers that hands out fresh contexts on warm processes.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.driver import PlaywrightDriver
+from browser_use.browser.watchdog import BrowserWatchdog, WatchdogConfig
+from browser_use.utils import time_execution_async
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BrowserPoolConfig:
+	"""
+	Configuration for the BrowserPool.
+
+	Default values:
+	    size: 2
+	        Number of browsers kept launched and ready
+
+	    max_contexts_per_browser: 1
+	        Number of isolated contexts (tasks) that may run on one browser at the same time.
+	        Contexts have separate cookies, storage and downloads, but share the browser's memory.
+
+	    max_uses_per_browser: 50
+	        Browsers are replaced after handing out this many contexts to bound memory growth
+
+	    health_check_timeout: 5.0
+	        Seconds a browser has to answer the health check before it is replaced
+
+	    checkout_timeout: None
+	        Seconds to wait for a free browser, None waits forever
+
+	    browser_config: BrowserConfig()
+	        Configuration used to launch every browser of the pool
+
+	    watchdog: None
+	        With a WatchdogConfig, browsers are sampled in the background and recycled when
+	        their memory grows over its limits or a renderer hangs
+	"""
+
+	size: int = 2
+	max_contexts_per_browser: int = 1
+	max_uses_per_browser: int = 50
+	health_check_timeout: float = 5.0
+	checkout_timeout: float | None = None
+	browser_config: BrowserConfig = field(default_factory=BrowserConfig)
+	watchdog: WatchdogConfig | None = None
+
+
+@dataclass
+class PooledBrowser:
+	browser: Browser
+	id: str = field(default_factory=lambda: str(uuid.uuid4()))
+	uses: int = 0  # contexts handed out so far
+	active: int = 0  # contexts currently checked out
+	retired: bool = False  # no new contexts, closed once the active ones are returned
+	launched_at: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+	"""
+	Keeps `size` browsers launched so tasks skip the Chromium cold start.
+
+	Every checkout gets a clean BrowserContext, the browser process itself is reused
+	and may serve up to `max_contexts_per_browser` tasks at once.
+	All methods must be awaited from the event loop that started the pool, Playwright objects are bound to it.
+	"""
+
+	def __init__(self, config: BrowserPoolConfig = BrowserPoolConfig()):
+		self.config = config
+		self._browsers: list[PooledBrowser] = []
+		self._released = asyncio.Event()
+		self._launching = 0
+		self._background_tasks: set[asyncio.Task] = set()
+		self._started = False
+		self._closed = False
+		self.watchdog = BrowserWatchdog(self, config.watchdog) if config.watchdog else None
+
+	@property
+	def browser_count(self) -> int:
+		"""Number of launched browsers, including retired ones still serving contexts"""
+		return len(self._browsers)
+
+	@property
+	def active_contexts(self) -> int:
+		return sum(pooled.active for pooled in self._browsers)
+
+	@property
+	def pooled_browsers(self) -> list[PooledBrowser]:
+		return list(self._browsers)
+
+	@time_execution_async('--start (browser pool)')
+	async def start(self) -> None:
+		"""Launch the browsers of the pool, safe to call more than once"""
+		if self._started:
+			return
+		self._started = True
+		# the pool's loop lives as long as the pool, replacement browsers reuse the driver of retired ones
+		PlaywrightDriver().keep_warm()
+
+		missing = self.config.size - self._live_count()
+		results = await asyncio.gather(*(self._launch() for _ in range(missing)), return_exceptions=True)
+		for result in results:
+			if isinstance(result, BaseException):
+				logger.error(f'Failed to launch pooled browser: {result}')
+		if self.watchdog:
+			self.watchdog.start()
+		logger.debug(f'Browser pool started with {self.browser_count} browsers')
+
+	async def checkout(self) -> Browser:
+		"""Reserve a context slot on the least loaded healthy browser, waits if all slots are in use"""
+		if self._closed:
+			raise RuntimeError('Browser pool is closed')
+		await self.start()
+		return await asyncio.wait_for(self._checkout(), timeout=self.config.checkout_timeout)
+
+	async def _checkout(self) -> Browser:
+		while True:
+			pooled = self._least_loaded()
+			if pooled is None and self._live_count() < self.config.size:
+				# a launch failed or a browser was retired - launch on demand instead of waiting
+				pooled = await self._launch()
+			if pooled is None:
+				self._released.clear()
+				await self._released.wait()
+				continue
+
+			# reserve the slot before the health check so concurrent checkouts see it
+			pooled.active += 1
+			if not await self._is_healthy(pooled):
+				logger.warning(f'Pooled browser {pooled.id} failed the health check, replacing it')
+				pooled.active -= 1
+				await self._retire(pooled)
+				continue
+
+			pooled.uses += 1
+			if pooled.uses >= self.config.max_uses_per_browser:
+				logger.debug(f'Pooled browser {pooled.id} reached {pooled.uses} uses, recycling it once its contexts are closed')
+				await self._retire(pooled)
+			return pooled.browser
+
+	async def checkin(self, browser: Browser, discard: bool = False) -> None:
+		"""Release a context slot, the browser is replaced if it is worn out, unhealthy or `discard` is set"""
+		pooled = next((pooled for pooled in self._browsers if pooled.browser is browser), None)
+		if pooled is None or pooled.active == 0:
+			raise ValueError('Browser was not checked out from this pool')
+
+		pooled.active -= 1
+		if not pooled.retired and (discard or self._closed or not await self._is_healthy(pooled)):
+			await self._retire(pooled)
+		elif pooled.retired and pooled.active == 0:
+			await self._remove(pooled)
+		self._released.set()
+
+	async def recycle(self, browser: Browser) -> None:
+		"""Replace a browser in the background, it is closed once its running contexts are returned"""
+		pooled = next((pooled for pooled in self._browsers if pooled.browser is browser), None)
+		if pooled is None:
+			raise ValueError('Browser does not belong to this pool')
+		await self._retire(pooled)
+		self._released.set()
+
+	@asynccontextmanager
+	async def browser_context(self, config: BrowserContextConfig | None = None) -> AsyncIterator[BrowserContext]:
+		"""
+		Check out a browser and yield a new context on it.
+
+		The context is closed and its slot returned to the pool on exit.
+		Without `config` the context gets a copy of the pool's `new_context_config`.
+		"""
+		browser = await self.checkout()
+		context = await browser.new_context(config)
+		try:
+			yield context
+		finally:
+			try:
+				await context.close()
+			finally:
+				await self.checkin(browser)
+
+	async def close(self) -> None:
+		"""Close all idle browsers, browsers with open contexts are closed when their last context is returned"""
+		self._closed = True
+		if self.watchdog:
+			await self.watchdog.stop()
+		for task in self._background_tasks:
+			task.cancel()
+
+		for pooled in list(self._browsers):
+			await self._retire(pooled)
+		self._released.set()
+
+	def _least_loaded(self) -> PooledBrowser | None:
+		candidates = [
+			pooled for pooled in self._browsers if not pooled.retired and pooled.active < self.config.max_contexts_per_browser
+		]
+		return min(candidates, key=lambda pooled: pooled.active, default=None)
+
+	def _live_count(self) -> int:
+		return sum(1 for pooled in self._browsers if not pooled.retired) + self._launching
+
+	async def _create_browser(self) -> Browser:
+		browser = Browser(config=self.config.browser_config)
+		await browser.get_playwright_browser()
+		return browser
+
+	async def _launch(self) -> PooledBrowser:
+		self._launching += 1
+		try:
+			pooled = PooledBrowser(browser=await self._create_browser())
+		finally:
+			self._launching -= 1
+		self._browsers.append(pooled)
+		return pooled
+
+	async def _retire(self, pooled: PooledBrowser) -> None:
+		"""Stop handing out contexts of a browser and launch its replacement"""
+		if pooled.retired:
+			return
+		pooled.retired = True
+		if not self._closed:
+			self._replenish()
+		if pooled.active == 0:
+			await self._remove(pooled)
+
+	async def _remove(self, pooled: PooledBrowser) -> None:
+		if pooled in self._browsers:
+			self._browsers.remove(pooled)
+		await self._discard(pooled)
+
+	async def _is_healthy(self, pooled: PooledBrowser) -> bool:
+		playwright_browser = pooled.browser.playwright_browser
+		if playwright_browser is None or not playwright_browser.is_connected():
+			return False
+
+		try:
+			# a round trip to the browser process also catches hung browsers that are still connected
+			session = await asyncio.wait_for(playwright_browser.new_browser_cdp_session(), self.config.health_check_timeout)
+			try:
+				await asyncio.wait_for(session.send('Browser.getVersion'), self.config.health_check_timeout)
+			finally:
+				await session.detach()
+		except Exception as e:
+			logger.debug(f'Health check of pooled browser {pooled.id} failed: {e}')
+			return False
+		return True
+
+	async def _discard(self, pooled: PooledBrowser) -> None:
+		try:
+			await pooled.browser.close()
+		except Exception as e:
+			logger.debug(f'Failed to close pooled browser {pooled.id}: {e}')
+
+	def _replenish(self) -> None:
+		"""Launch a replacement browser in the background so the next checkout stays warm"""
+
+		async def replace():
+			pooled = None
+			try:
+				pooled = PooledBrowser(browser=await self._create_browser())
+			except Exception as e:
+				logger.error(f'Failed to launch replacement browser: {e}')
+			finally:
+				self._launching -= 1
+
+			if pooled is not None:
+				self._browsers.append(pooled)
+				if self._closed:
+					await self._retire(pooled)
+			# wake up waiting checkouts, after a failed launch they launch on demand
+			self._released.set()
+
+		# counted right away so a concurrent checkout does not launch a browser too many
+		self._launching += 1
+		task = asyncio.create_task(replace())
+		self._background_tasks.add(task)
+		task.add_done_callback(self._background_tasks.discard)
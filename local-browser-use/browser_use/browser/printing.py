@@ -0,0 +1,106 @@
+"""
+Print-to-PDF for a browser context without driving the print preview UI.
+"""
+
+import logging
+import re
+from typing import Optional
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Page
+
+from browser_use.browser.downloads import DownloadManager
+from browser_use.browser.watchdog import busy_page
+
+logger = logging.getLogger(__name__)
+
+PRINT_BINDING = '__browserUsePrintToPDF'
+
+# Replaces window.print in every frame, the binding is exposed by PrintToPDF.attach.
+# The browser's own print dialog opens when the page could not be saved, e.g. where page.pdf is not supported.
+PRINT_OVERRIDE_SCRIPT = f"""
+(() => {{
+	if (window.{PRINT_BINDING}_installed) return;
+	window.{PRINT_BINDING}_installed = true;
+	const print = window.print;
+	window.print = () => {{
+		window.{PRINT_BINDING}(document.title).then(
+			(saved) => {{ if (!saved) print.call(window); }},
+			() => print.call(window)
+		);
+	}};
+}})();
+"""
+
+DEFAULT_PDF_OPTIONS = {
+	'format': 'A4',
+	'print_background': True,
+	'margin': {'top': '0.4in', 'right': '0.4in', 'bottom': '0.4in', 'left': '0.4in'},
+}
+
+
+class PrintedPage:
+	"""Quacks like a Playwright Download so printed pages go through DownloadManager like any other file"""
+
+	def __init__(self, page: Page, suggested_filename: str, pdf_options: dict):
+		self.page = page
+		self.url = page.url
+		self.suggested_filename = suggested_filename
+		self.pdf_options = pdf_options
+
+	async def save_as(self, path: str) -> None:
+		with busy_page(self.page):
+			await self.page.pdf(path=path, **self.pdf_options)
+
+
+class PrintToPDF:
+	"""
+	Saves `window.print()` as a PDF into the downloads path of the context.
+
+	The page's print call goes straight to `page.pdf` through a binding, no dialog is opened.
+	The PDF is tracked by the context's DownloadManager, so the click that printed reports it like a download.
+	Browsers that cannot print to PDF, e.g. headed Chromium builds without `page.pdf`, open the print dialog as before.
+	"""
+
+	def __init__(self, downloads: DownloadManager, pdf_options: Optional[dict] = None):
+		self.downloads = downloads
+		self.pdf_options = pdf_options or DEFAULT_PDF_OPTIONS
+		# set once page.pdf failed, later print calls open the dialog right away
+		self.unsupported = False
+
+	async def attach(self, context: PlaywrightBrowserContext) -> None:
+		"""Install the binding and the window.print override, once per context"""
+		try:
+			await context.expose_binding(PRINT_BINDING, self._on_print)
+		except Exception as e:
+			# a reused context (cdp_url, existing Chrome) may already have it from an earlier BrowserContext
+			logger.debug(f'Print binding not installed: {e}')
+			return
+		await context.add_init_script(PRINT_OVERRIDE_SCRIPT)
+
+		# the init script only runs on the next navigation, pages that are already open get it now
+		for page in context.pages:
+			for frame in page.frames:
+				try:
+					await frame.evaluate(PRINT_OVERRIDE_SCRIPT)
+				except Exception as e:
+					logger.debug(f'Print override not installed in {frame.url}: {e}')
+
+	async def _on_print(self, source: dict, title: str) -> bool:
+		"""Save the printing page as a PDF, returns False to let the page open its print dialog instead"""
+		if self.unsupported:
+			return False
+
+		page = source['page']
+		filename = re.sub(r'[^A-Za-z0-9 ._-]', '_', title or '').strip() or 'print'
+		logger.debug(f'window.print() on {page.url}, saving as PDF')
+		info = self.downloads.record(PrintedPage(page, f'{filename}.pdf', self.pdf_options))
+		await self.downloads.wait_for([info])
+		if info.status == 'completed':
+			return True
+
+		logger.warning(f'Printing to PDF failed, opening the print dialog instead: {info.error}')
+		# the dialog takes over, the agent is not told about a failed file it never asked for
+		info.reported = True
+		self.unsupported = True
+		return False
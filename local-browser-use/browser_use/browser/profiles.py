@@ -0,0 +1,242 @@
+"""
+Reusable on-disk browser profiles, so repeat visits to a site load its assets from the HTTP cache.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parts of a Chromium profile that hold cookies and site data, wiped between tasks to keep them isolated
+STORAGE_PATHS = [
+	'Default/Cookies',
+	'Default/Cookies-journal',
+	'Default/Network/Cookies',
+	'Default/Network/Cookies-journal',
+	'Default/Local Storage',
+	'Default/Session Storage',
+	'Default/IndexedDB',
+	'Default/Service Worker',
+	'Default/Web Data',
+	'Default/Sessions',
+]
+
+# Parts that only hold caches, dropped when a profile grows over its size cap
+CACHE_PATHS = [
+	'Default/Cache',
+	'Default/Code Cache',
+	'Default/GPUCache',
+	'GrShaderCache',
+	'ShaderCache',
+]
+
+
+@dataclass
+class ProfilePoolConfig:
+	"""
+	Configuration for the ProfilePool.
+
+	Default values:
+	    directory: 'browser_profiles'
+	        Root directory, profiles live in directory/<site group>/slot-<n>
+
+	    slots: 2
+	        Profiles per site group, i.e. how many tasks on the same sites can run at the same time
+
+	    max_profile_size_mb: 500
+	        The caches of a profile larger than this are dropped when it is returned
+
+	    max_idle: 7 days
+	        Profiles unused for this many seconds are deleted by cleanup
+
+	    cleanup_interval: 3600
+	        Seconds between cleanups, they run when a profile is returned
+
+	    isolate_storage: True
+	        Wipe cookies and site storage before every task, only the HTTP cache is shared between tasks
+	"""
+
+	directory: str = 'browser_profiles'
+	slots: int = 2
+	max_profile_size_mb: float = 500
+	max_idle: float = 7 * 24 * 3600
+	cleanup_interval: float = 3600
+	isolate_storage: bool = True
+
+
+def _wake(released: asyncio.Future) -> None:
+	if not released.done():
+		released.set_result(None)
+
+
+@dataclass
+class ProfileLease:
+	site_group: str
+	slot: int
+	path: str
+	leased_at: float = field(default_factory=time.time)
+
+
+class ProfilePool:
+	"""
+	Hands out one profile directory per running task, grouped by site.
+
+	Tasks of the same site group reuse each other's profiles, so a portal's scripts, styles and images come
+	from the disk cache after the first visit. Leases are tracked with a thread lock, the pool can be shared
+	by tasks running on different event loops. Waiting checkouts are woken on their own loop when a profile is returned.
+	"""
+
+	def __init__(self, config: ProfilePoolConfig | None = None):
+		self.config = config or ProfilePoolConfig()
+		self._lock = threading.Lock()
+		self._leased: set[str] = set()  # paths of the profiles in use
+		self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []  # checkouts waiting for a free profile
+		self._last_cleanup = time.monotonic()
+
+	def path(self, site_group: str, slot: int) -> str:
+		group = re.sub(r'[^A-Za-z0-9._-]', '_', site_group)
+		return os.path.abspath(os.path.join(self.config.directory, group, f'slot-{slot}'))
+
+	def try_checkout(self, site_group: str = 'default') -> Optional[ProfileLease]:
+		"""Lease a free profile of the site group, None if all its slots are taken"""
+		with self._lock:
+			slot = self._reserve(site_group)
+		return None if slot is None else self._lease(site_group, slot)
+
+	async def checkout(self, site_group: str = 'default', timeout: float | None = None) -> ProfileLease:
+		"""Lease a profile, waiting for a slot of the site group to become free"""
+		loop = asyncio.get_running_loop()
+		deadline = None if timeout is None else loop.time() + timeout
+		while True:
+			released = loop.create_future()
+			with self._lock:
+				slot = self._reserve(site_group)
+				if slot is None:
+					# registered under the lock, a profile returned right after the check still wakes us
+					self._waiters.append((loop, released))
+			if slot is not None:
+				return self._lease(site_group, slot)
+
+			try:
+				await asyncio.wait_for(released, None if deadline is None else max(deadline - loop.time(), 0))
+			except asyncio.TimeoutError:
+				raise TimeoutError(f'No free browser profile for {site_group} after {timeout}s')
+			finally:
+				with self._lock:
+					if (loop, released) in self._waiters:
+						self._waiters.remove((loop, released))
+
+	def _reserve(self, site_group: str) -> Optional[int]:
+		"""Mark the first free slot of the site group as leased, must hold the lock"""
+		for slot in range(self.config.slots):
+			path = self.path(site_group, slot)
+			if path not in self._leased:
+				self._leased.add(path)
+				return slot
+		return None
+
+	def _lease(self, site_group: str, slot: int) -> ProfileLease:
+		"""Prepare the directory of a reserved slot"""
+		lease = ProfileLease(site_group=site_group, slot=slot, path=self.path(site_group, slot))
+		try:
+			os.makedirs(lease.path, exist_ok=True)
+			if self.config.isolate_storage:
+				self._remove(lease.path, STORAGE_PATHS)
+			# cleanup measures idleness by the directory's mtime
+			os.utime(lease.path)
+		except BaseException:
+			self._release(lease.path)
+			raise
+		logger.debug(f'Leased profile {lease.path}')
+		return lease
+
+	def checkin(self, lease: ProfileLease) -> None:
+		"""Return a profile, enforcing its size cap and running the periodic cleanup when due"""
+		try:
+			if self.size_mb(lease.path) > self.config.max_profile_size_mb:
+				logger.info(f'Profile {lease.path} is over {self.config.max_profile_size_mb} MB, dropping its cache')
+				self._remove(lease.path, CACHE_PATHS)
+		finally:
+			self._release(lease.path)
+
+		if time.monotonic() - self._last_cleanup > self.config.cleanup_interval:
+			self.cleanup()
+
+	@asynccontextmanager
+	async def profile(self, site_group: str = 'default', timeout: float | None = None) -> AsyncIterator[ProfileLease]:
+		lease = await self.checkout(site_group, timeout)
+		try:
+			yield lease
+		finally:
+			# a size check walks the whole profile, keep it off the event loop
+			await asyncio.to_thread(self.checkin, lease)
+
+	def cleanup(self) -> None:
+		"""Delete profiles idle for longer than max_idle and cap the size of the others"""
+		self._last_cleanup = time.monotonic()
+		if not os.path.isdir(self.config.directory):
+			return
+
+		now = time.time()
+		for group in os.listdir(self.config.directory):
+			group_dir = os.path.join(self.config.directory, group)
+			if not os.path.isdir(group_dir):
+				continue
+			for slot_dir in os.listdir(group_dir):
+				match = re.fullmatch(r'slot-(\d+)', slot_dir)
+				if not match:
+					continue
+				path = os.path.abspath(os.path.join(group_dir, slot_dir))
+				slot = int(match.group(1))
+				with self._lock:
+					if path in self._leased:
+						continue
+					# hold the slot while we work on it
+					self._leased.add(path)
+				try:
+					if now - os.path.getmtime(path) > self.config.max_idle or slot >= self.config.slots:
+						logger.debug(f'Deleting idle profile {path}')
+						shutil.rmtree(path, ignore_errors=True)
+					elif self.size_mb(path) > self.config.max_profile_size_mb:
+						self._remove(path, CACHE_PATHS)
+				finally:
+					self._release(path)
+
+	def _release(self, path: str) -> None:
+		"""Free a profile and wake the waiting checkouts, each on its own event loop"""
+		with self._lock:
+			self._leased.discard(path)
+			waiters, self._waiters = self._waiters, []
+		for loop, released in waiters:
+			try:
+				loop.call_soon_threadsafe(_wake, released)
+			except RuntimeError:
+				pass  # the loop of that checkout is closed
+
+	@staticmethod
+	def size_mb(path: str) -> float:
+		total = 0
+		for root, _, files in os.walk(path):
+			for name in files:
+				try:
+					total += os.path.getsize(os.path.join(root, name))
+				except OSError:
+					pass
+		return total / (1024 * 1024)
+
+	@staticmethod
+	def _remove(profile_path: str, relative_paths: list[str]) -> None:
+		for relative_path in relative_paths:
+			path = os.path.join(profile_path, relative_path)
+			if os.path.isdir(path):
+				shutil.rmtree(path, ignore_errors=True)
+			elif os.path.exists(path):
+				os.remove(path)
@@ -0,0 +1,149 @@
+"""
+Blocks resources the agent never needs (ads, analytics, fonts, media) through context routing.
+"""
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Route
+
+logger = logging.getLogger(__name__)
+
+AD_AND_ANALYTICS_DOMAINS = [
+	'doubleclick.net',
+	'googlesyndication.com',
+	'googleadservices.com',
+	'google-analytics.com',
+	'googletagmanager.com',
+	'adnxs.com',
+	'adsrvr.org',
+	'amazon-adsystem.com',
+	'criteo.com',
+	'taboola.com',
+	'outbrain.com',
+	'facebook.net',
+	'connect.facebook.net',
+	'hotjar.com',
+	'clarity.ms',
+	'newrelic.com',
+	'nr-data.net',
+	'segment.io',
+	'mixpanel.com',
+	'quantserve.com',
+	'scorecardresearch.com',
+]
+
+
+@dataclass
+class ResourcePolicy:
+	"""
+	Which requests of a context are aborted before they hit the network
+
+	Default values:
+	    block_resource_types: ['font', 'media']
+	        Playwright resource types to block, e.g. 'image', 'stylesheet', 'font', 'media'
+
+	    block_url_patterns: []
+	        Regular expressions matched against the full request URL
+
+	    block_domains: AD_AND_ANALYTICS_DOMAINS
+	        Domains to block, subdomains included
+
+	    allow_domains: []
+	        Domains that are never blocked, wins over everything else
+
+	    text_only: False
+	        Also block images, for agents running with use_vision=False
+
+	    site_overrides: {}
+	        Per site changes keyed by the domain of the page, e.g. {'county.gov': {'block_resource_types': []}}
+
+	Routing disables Playwright's HTTP cache for the context.
+	"""
+
+	block_resource_types: list[str] = field(default_factory=lambda: ['font', 'media'])
+	block_url_patterns: list[str] = field(default_factory=list)
+	block_domains: list[str] = field(default_factory=lambda: list(AD_AND_ANALYTICS_DOMAINS))
+	allow_domains: list[str] = field(default_factory=list)
+	text_only: bool = False
+	site_overrides: dict[str, dict] = field(default_factory=dict)
+
+
+def _domain_matches(host: str, domains) -> bool:
+	return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class _CompiledPolicy:
+	def __init__(self, policy: ResourcePolicy):
+		self.resource_types = set(policy.block_resource_types)
+		if policy.text_only:
+			self.resource_types.add('image')
+		self.url_pattern = re.compile('|'.join(f'(?:{p})' for p in policy.block_url_patterns)) if policy.block_url_patterns else None
+		self.block_domains = tuple(policy.block_domains)
+		self.allow_domains = tuple(policy.allow_domains)
+
+	def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+		host = urlparse(url).hostname or ''
+		if _domain_matches(host, self.allow_domains):
+			return None
+		if resource_type in self.resource_types:
+			return resource_type
+		if _domain_matches(host, self.block_domains):
+			return 'domain'
+		if self.url_pattern and self.url_pattern.search(url):
+			return 'pattern'
+		return None
+
+
+class ResourceBlocker:
+	"""Applies a ResourcePolicy to a context and counts what it blocked"""
+
+	def __init__(self, policy: ResourcePolicy):
+		self.policy = policy
+		self._default = _CompiledPolicy(policy)
+		self._overrides = {}  # site domain -> _CompiledPolicy, compiled on first use
+		self.allowed = 0
+		self.blocked = Counter()  # reason -> count
+
+	async def attach(self, context: PlaywrightBrowserContext) -> None:
+		await context.route('**/*', self._handle)
+
+	def policy_for(self, page_url: str) -> _CompiledPolicy:
+		host = urlparse(page_url).hostname or ''
+		for domain, changes in self.policy.site_overrides.items():
+			if _domain_matches(host, (domain,)):
+				if domain not in self._overrides:
+					self._overrides[domain] = _CompiledPolicy(replace(self.policy, **changes))
+				return self._overrides[domain]
+		return self._default
+
+	def block_reason(self, url: str, resource_type: str, page_url: str = '') -> Optional[str]:
+		if resource_type == 'document' or url.startswith('data:'):
+			# navigations always go through, blocking them would break the agent instead of the page
+			return None
+		return self.policy_for(page_url or url).block_reason(url, resource_type)
+
+	@property
+	def stats(self) -> dict:
+		return {'allowed': self.allowed, 'blocked': sum(self.blocked.values()), 'blocked_by': dict(self.blocked)}
+
+	async def _handle(self, route: Route) -> None:
+		request = route.request
+		try:
+			page_url = request.frame.page.url
+		except Exception:
+			# service worker requests have no frame
+			page_url = ''
+
+		reason = self.block_reason(request.url, request.resource_type, page_url)
+		if reason:
+			self.blocked[reason] += 1
+			await route.abort('blockedbyclient')
+		else:
+			self.allowed += 1
+			await route.fallback()
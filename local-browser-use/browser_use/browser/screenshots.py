@@ -0,0 +1,146 @@
+"""
+Screenshots of the agent's state: whether they are taken, in which format and at which size.
+"""
+
+import base64
+import logging
+from dataclasses import dataclass
+from typing import Literal
+
+from playwright.async_api import CDPSession, Page
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+
+
+@dataclass
+class ScreenshotPolicy:
+	"""
+	Screenshots taken for the browser state
+
+	Default values:
+	    mode: 'vision'
+	        'always' takes one for every state, e.g. for history and GIFs of agents without vision,
+	        'vision' only when the caller uses it (see BrowserContext.get_state), 'off' never
+
+	    format: 'png'
+	        'png', 'jpeg' or 'webp', the lossy formats are several times smaller for the same page
+
+	    quality: 80
+	        Compression quality of jpeg and webp, 0-100
+
+	    scale: 'device'
+	        'device' keeps the device scale factor of HiDPI windows, 'css' captures one pixel per CSS pixel
+
+	    max_dimension: None
+	        Downscale so no side is longer than this many pixels, e.g. 1024 for vision models
+
+	    full_page: False
+	        Capture the whole scrollable page instead of clipping to the viewport
+	"""
+
+	mode: Literal['always', 'vision', 'off'] = 'vision'
+	format: Literal['png', 'jpeg', 'webp'] = 'png'
+	quality: int = 80
+	scale: Literal['device', 'css'] = 'device'
+	max_dimension: int | None = None
+	full_page: bool = False
+
+	@property
+	def mime_type(self) -> str:
+		return MIME_TYPES[self.format]
+
+	def wanted(self, vision: bool) -> bool:
+		"""Whether a state read by a caller with or without vision gets a screenshot"""
+		return self.mode == 'always' or (self.mode == 'vision' and vision)
+
+
+class ScreenshotCapturer:
+	"""
+	Takes screenshots over one CDP session per page. Page.captureScreenshot returns base64 directly,
+	supports webp and scales while capturing, so no image is decoded or re-encoded in Python.
+	Browsers without CDP fall back to Playwright's screenshot, which has no webp.
+	"""
+
+	def __init__(self, policy: ScreenshotPolicy):
+		self.policy = policy
+		# None for pages without CDP, the device pixel ratio is read once per page
+		self._sessions: dict[Page, CDPSession | None] = {}
+		self._pixel_ratios: dict[Page, float] = {}
+
+	async def capture(self, page: Page, full_page: bool | None = None) -> tuple[str, str]:
+		"""Base64 screenshot of the page and its mime type"""
+		full_page = self.policy.full_page if full_page is None else full_page
+		session = await self._session(page)
+		if session is None:
+			return await self._capture_with_playwright(page, full_page)
+
+		params: dict = {'format': self.policy.format}
+		if self.policy.format != 'png':
+			params['quality'] = self.policy.quality
+		clip = await self._clip(page, session, full_page)
+		if clip:
+			params['clip'] = clip
+			params['captureBeyondViewport'] = full_page
+		result = await session.send('Page.captureScreenshot', params)
+		return result['data'], self.policy.mime_type
+
+	def clear(self) -> None:
+		self._sessions.clear()
+		self._pixel_ratios.clear()
+
+	async def _session(self, page: Page) -> CDPSession | None:
+		if page in self._sessions:
+			return self._sessions[page]
+		try:
+			session = await page.context.new_cdp_session(page)
+		except Exception as e:
+			logger.debug(f'No CDP session for screenshots, using Playwright: {e}')
+			session = None
+		self._sessions[page] = session
+		page.once('close', lambda _: self._forget(page))
+		return session
+
+	def _forget(self, page: Page) -> None:
+		self._sessions.pop(page, None)
+		self._pixel_ratios.pop(page, None)
+
+	async def _clip(self, page: Page, session: CDPSession, full_page: bool) -> dict | None:
+		"""Region and scale to capture, None for the viewport as the browser renders it"""
+		policy = self.policy
+		if not full_page and policy.scale == 'device' and not policy.max_dimension:
+			return None
+
+		metrics = await session.send('Page.getLayoutMetrics')
+		if full_page:
+			content = metrics['cssContentSize']
+			x, y, width, height = 0, 0, content['width'], content['height']
+		else:
+			viewport = metrics['cssVisualViewport']
+			x, y, width, height = viewport['pageX'], viewport['pageY'], viewport['clientWidth'], viewport['clientHeight']
+
+		# the captured image has clip size × scale × device pixel ratio pixels
+		pixel_ratio = await self._pixel_ratio(page)
+		scale = 1 / pixel_ratio if policy.scale == 'css' else 1.0
+		longest = max(width, height) * pixel_ratio * scale
+		if policy.max_dimension and longest > policy.max_dimension:
+			scale *= policy.max_dimension / longest
+		return {'x': x, 'y': y, 'width': width, 'height': height, 'scale': scale}
+
+	async def _pixel_ratio(self, page: Page) -> float:
+		if page not in self._pixel_ratios:
+			self._pixel_ratios[page] = float(await page.evaluate('window.devicePixelRatio') or 1)
+		return self._pixel_ratios[page]
+
+	async def _capture_with_playwright(self, page: Page, full_page: bool) -> tuple[str, str]:
+		# Playwright only writes png and jpeg, downscaling is left to the browser's scale option
+		image_type = 'png' if self.policy.format == 'png' else 'jpeg'
+		screenshot = await page.screenshot(
+			full_page=full_page,
+			type=image_type,
+			quality=self.policy.quality if image_type == 'jpeg' else None,
+			scale=self.policy.scale,
+			animations='disabled',
+		)
+		return base64.b64encode(screenshot).decode('utf-8'), MIME_TYPES[image_type]
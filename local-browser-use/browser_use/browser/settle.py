@@ -0,0 +1,179 @@
+"""
+Per-site page settle times learned from history, so fast portals are not waited on like slow ones.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# path segments that differ between pages of the same kind, e.g. /parcel/12345 and /parcel/67890
+_VARIABLE_SEGMENT_RE = re.compile(r'^(?:\d+|[0-9a-f]{8,}|[0-9a-f-]{36}|.*\d{4,}.*)$', re.IGNORECASE)
+
+
+@dataclass
+class AdaptiveSettleConfig:
+	"""
+	Configuration of adaptive page settle times.
+
+	Default values:
+	    path: None
+	        JSON file the profiles are kept in between runs, None keeps them in memory only
+
+	    percentile: 90
+	        Settle time percentile a page of a site gets to become idle
+
+	    margin: 1.5
+	        Factor on the percentile, leaves room for pages slower than the ones seen so far
+
+	    min_samples: 5
+	        Pages of a site to observe before its settle time is adapted
+
+	    max_samples: 50
+	        Samples kept per site, older ones are dropped so profiles follow changes of the site
+
+	    min_timeout: 1.0
+	        Lower bound of the learned network idle timeout, the configured maximum is the upper bound
+
+	    path_depth: 2
+	        Leading path segments that tell pages of a site apart, e.g. county.gov/tax/search
+	"""
+
+	path: str | None = None
+	percentile: float = 90
+	margin: float = 1.5
+	min_samples: int = 5
+	max_samples: int = 50
+	min_timeout: float = 1.0
+	path_depth: int = 2
+
+
+@dataclass
+class SettleTimes:
+	timeout: float  # longest wait for the network to become idle
+	minimum: float  # minimum time between an action and reading the page, always the configured one
+
+
+def settle_key(url: str, path_depth: int = 2) -> Optional[str]:
+	"""Domain and path pattern of a URL, None for pages without a host like about:blank"""
+	parsed = urlparse(url)
+	if not parsed.hostname:
+		return None
+	segments = [segment for segment in parsed.path.split('/') if segment][:path_depth]
+	pattern = '/'.join('*' if _VARIABLE_SEGMENT_RE.match(segment) else segment for segment in segments)
+	return f'{parsed.hostname}/{pattern}'
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+	ordered = sorted(values)
+	index = min(int(round(percentile / 100 * (len(ordered) - 1))), len(ordered) - 1)
+	return ordered[index]
+
+
+class SettleProfiles:
+	"""
+	Settle times of past pages per domain and path pattern.
+
+	Pages of a path pattern without enough history fall back to the domain, then to the configured waits.
+	Only the network idle timeout is learned, and only ever shortened. The configured minimum wait stays,
+	it covers pages that render after their network went idle, which the settle times do not see.
+	Only waits on a busy network are recorded, a page that was idle already says nothing about its site.
+	Profiles are shared by all contexts using the same file, across threads, see `shared_settle_profiles`.
+	"""
+
+	def __init__(self, config: AdaptiveSettleConfig | None = None):
+		self.config = config or AdaptiveSettleConfig()
+		self._lock = threading.Lock()
+		self._samples: dict[str, list[float]] = {}
+		self._dirty = False
+		if self.config.path:
+			self.load()
+
+	def record(self, url: str, seconds: float) -> None:
+		"""Record how long a page of `url` took to settle"""
+		key = settle_key(url, self.config.path_depth)
+		if key is None:
+			return
+		domain = key.split('/', 1)[0]
+		with self._lock:
+			for name in (key, domain):
+				samples = self._samples.setdefault(name, [])
+				samples.append(round(seconds, 3))
+				del samples[: -self.config.max_samples]
+			self._dirty = True
+
+	def settle_times(self, url: str, timeout: float, minimum: float) -> SettleTimes:
+		"""Waits for a page of `url`, the configured `timeout` and `minimum` without enough history"""
+		samples = self._history(url)
+		if samples is None:
+			return SettleTimes(timeout=timeout, minimum=minimum)
+
+		learned = _percentile(samples, self.config.percentile) * self.config.margin
+		return SettleTimes(
+			timeout=min(max(learned, self.config.min_timeout), timeout),
+			minimum=minimum,
+		)
+
+	def _history(self, url: str) -> Optional[list[float]]:
+		key = settle_key(url, self.config.path_depth)
+		if key is None:
+			return None
+		with self._lock:
+			for name in (key, key.split('/', 1)[0]):
+				samples = self._samples.get(name)
+				if samples and len(samples) >= self.config.min_samples:
+					return list(samples)
+		return None
+
+	def load(self) -> None:
+		try:
+			with open(self.config.path) as f:
+				data = json.load(f)
+		except FileNotFoundError:
+			return
+		except (OSError, ValueError) as e:
+			logger.warning(f'Ignoring unreadable settle profiles {self.config.path}: {e}')
+			return
+		with self._lock:
+			self._samples = {key: [float(value) for value in values] for key, values in data.items()}
+
+	def save(self) -> None:
+		"""Write the profiles to `path` if they changed, the file is replaced atomically"""
+		if not self.config.path:
+			return
+		with self._lock:
+			if not self._dirty:
+				return
+			data = json.dumps(self._samples, indent=1, sort_keys=True)
+			self._dirty = False
+
+		directory = os.path.dirname(os.path.abspath(self.config.path))
+		os.makedirs(directory, exist_ok=True)
+		tmp_path = f'{self.config.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+		try:
+			with open(tmp_path, 'w') as f:
+				f.write(data)
+			os.replace(tmp_path, self.config.path)
+		except OSError as e:
+			logger.warning(f'Failed to save settle profiles to {self.config.path}: {e}')
+			with self._lock:
+				self._dirty = True
+
+
+_shared_profiles: dict[str | None, SettleProfiles] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_settle_profiles(config: AdaptiveSettleConfig) -> SettleProfiles:
+	"""Profiles of `config.path` shared by every context of the process, created on first use"""
+	with _shared_lock:
+		profiles = _shared_profiles.get(config.path)
+		if profiles is None:
+			profiles = _shared_profiles[config.path] = SettleProfiles(config)
+		return profiles
@@ -0,0 +1,120 @@
+"""
+Open tabs of a context with stable ids, kept up to date from page events.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Frame, Page
+
+from browser_use.browser.views import TabInfo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Tab:
+	id: int
+	page: Page
+	url: str
+	title: str = ''
+
+
+class TabRegistry:
+	"""
+	Tabs of a context in the order they were opened, each with an id that stays valid while the tab is open.
+
+	URL and title are cached from `framenavigated`, `domcontentloaded` and `load` events, so listing tabs
+	needs no round trip to the browser. Popups become the active tab when they open, like a user would see them.
+	"""
+
+	def __init__(self):
+		self._tabs: dict[int, Tab] = {}
+		self._next_id = 0
+		self.active_id: int | None = None
+		self._title_tasks: set[asyncio.Task] = set()
+
+	def attach(self, context: PlaywrightBrowserContext) -> None:
+		context.on('page', self.add)
+		for page in context.pages:
+			self.add(page)
+
+	def detach(self, context: PlaywrightBrowserContext) -> None:
+		try:
+			context.remove_listener('page', self.add)
+		except Exception as e:
+			logger.debug(f'Failed to remove tab listener: {e}')
+		for task in self._title_tasks:
+			task.cancel()
+		self._tabs.clear()
+		self.active_id = None
+
+	def add(self, page: Page) -> Tab:
+		tab = self.tab_for(page)
+		if tab:
+			return tab
+
+		tab = Tab(id=self._next_id, page=page, url=page.url)
+		self._next_id += 1
+		self._tabs[tab.id] = tab
+		self.active_id = tab.id
+
+		page.on('framenavigated', lambda frame: self._on_navigated(tab, frame))
+		page.on('domcontentloaded', lambda _: self._refresh_title(tab))
+		page.on('load', lambda _: self._refresh_title(tab))
+		page.once('close', lambda _: self._remove(tab))
+		self._refresh_title(tab)
+		return tab
+
+	def tabs(self) -> list[TabInfo]:
+		return [TabInfo(page_id=tab.id, url=tab.url, title=tab.title) for tab in self._tabs.values()]
+
+	def tab_for(self, page: Page) -> Tab | None:
+		return next((tab for tab in self._tabs.values() if tab.page is page), None)
+
+	def page(self, tab_id: int) -> Page | None:
+		"""Page of a tab id, negative ids count from the most recently opened tab"""
+		if tab_id < 0:
+			tabs = list(self._tabs.values())
+			return tabs[tab_id].page if -len(tabs) <= tab_id else None
+		tab = self._tabs.get(tab_id)
+		return tab.page if tab else None
+
+	def activate(self, page: Page) -> None:
+		tab = self.tab_for(page) or self.add(page)
+		self.active_id = tab.id
+
+	def active_page(self) -> Page | None:
+		tab = self._tabs.get(self.active_id) if self.active_id is not None else None
+		return tab.page if tab else None
+
+	def update(self, page: Page, url: str, title: str) -> None:
+		"""Store URL and title read by other means, e.g. the DOM snapshot"""
+		tab = self.tab_for(page)
+		if tab:
+			tab.url = url
+			tab.title = title
+
+	def _on_navigated(self, tab: Tab, frame: Frame) -> None:
+		if frame.parent_frame is None:
+			tab.url = frame.url
+
+	def _refresh_title(self, tab: Tab) -> None:
+		async def refresh():
+			try:
+				tab.title = await tab.page.title()
+			except Exception:
+				# navigating or closed pages have no title to read, the next event brings it
+				pass
+
+		task = asyncio.create_task(refresh())
+		self._title_tasks.add(task)
+		task.add_done_callback(self._title_tasks.discard)
+
+	def _remove(self, tab: Tab) -> None:
+		self._tabs.pop(tab.id, None)
+		if self.active_id == tab.id:
+			# like the browser, fall back to the most recently opened tab
+			self.active_id = next(reversed(self._tabs), None)
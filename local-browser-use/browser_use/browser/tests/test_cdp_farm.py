@@ -0,0 +1,139 @@
+import asyncio
+import gc
+import json
+
+import pytest
+
+from browser_use.browser.cdp_endpoint import port_is_free, probe_cdp, wait_for_cdp
+from browser_use.browser.cdp_farm import CDPFarm, CDPFarmConfig, FarmBrowser
+
+
+async def serve_version(port: int) -> asyncio.AbstractServer:
+	"""Minimal HTTP server answering /json/version like Chromium does"""
+	body = json.dumps({'Browser': 'Chrome/130.0.0.0', 'webSocketDebuggerUrl': f'ws://127.0.0.1:{port}/devtools/browser/x'})
+
+	async def handle(reader, writer):
+		await reader.readuntil(b'\r\n\r\n')
+		writer.write(
+			f'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n{body}'.encode()
+		)
+		await writer.drain()
+		writer.close()
+
+	return await asyncio.start_server(handle, '127.0.0.1', port)
+
+
+class FakePlaywrightBrowser:
+	def __init__(self):
+		self.handlers = {}
+
+	def on(self, event, handler):
+		self.handlers[event] = handler
+
+	async def close(self):
+		pass
+
+
+class FakeProcess:
+	"""Stands in for the Chromium process of a farm browser"""
+
+	returncode = None
+
+	def terminate(self):
+		self.returncode = -15
+
+	def kill(self):
+		self.returncode = -9
+
+	async def wait(self):
+		return self.returncode
+
+
+class FakeFarm(CDPFarm):
+	"""Farm whose processes are fake endpoints, nothing is launched"""
+
+	def __init__(self, config: CDPFarmConfig):
+		super().__init__(config)
+		self.servers = {}
+		self.closed = []
+
+	async def _launch_process(self) -> FarmBrowser:
+		port = self._reserve_port()
+		self.servers[port] = await serve_version(port)
+		browser = FarmBrowser(self.config.browser_config, f'http://127.0.0.1:{port}')
+
+		async def connect():
+			browser.playwright_browser = FakePlaywrightBrowser()
+			return browser.playwright_browser
+
+		browser.get_playwright_browser = connect
+		# pretend the farm launched it, so its port is released on close
+		browser.process = FakeProcess()
+		return browser
+
+	async def _is_healthy(self, pooled) -> bool:
+		return True
+
+	async def _discard(self, pooled) -> None:
+		self.closed.append(pooled.browser)
+		await pooled.browser.close()
+		self._release(pooled.browser)
+
+
+def free_base_port() -> int:
+	port = 19222
+	while not port_is_free(port):
+		port += 10
+	return port
+
+
+@pytest.mark.asyncio
+async def test_probe_does_not_block_and_waits_for_endpoint():
+	port = free_base_port()
+	endpoint = f'http://127.0.0.1:{port}'
+	assert await probe_cdp(endpoint, timeout=0.5) is None
+	with pytest.raises(TimeoutError):
+		await wait_for_cdp(endpoint, timeout=0.2)
+
+	async def start_later():
+		await asyncio.sleep(0.2)
+		return await serve_version(port)
+
+	server_task = asyncio.create_task(start_later())
+	version = await wait_for_cdp(endpoint, timeout=5)
+	assert version['Browser'].startswith('Chrome')
+	(await server_task).close()
+
+
+@pytest.mark.asyncio
+async def test_farm_balances_and_restarts_dead_processes():
+	unretrieved = []
+	asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+	farm = FakeFarm(CDPFarmConfig(size=2, max_contexts_per_browser=2, base_port=free_base_port()))
+	await farm.start()
+	assert len(set(farm.endpoints())) == 2
+
+	first = await farm.checkout()
+	second = await farm.checkout()
+	# the second context goes to the idle process, not next to the first one
+	assert first is not second
+
+	# the first process dies, it is replaced on a new port while its task is still running
+	farm.servers[int(first.endpoint.rsplit(':', 1)[1])].close()
+	first.playwright_browser.handlers['disconnected'](first.playwright_browser)
+	await asyncio.sleep(0.1)
+	assert first.endpoint not in farm.endpoints()
+	assert len(farm.endpoints()) == 2
+
+	await farm.checkin(first)
+	await farm.checkin(second)
+	assert farm.closed == [first]
+	await farm.close()
+	for server in farm.servers.values():
+		server.close()
+
+	# closing the browsers, also from their destructors, must not fail in the background
+	del farm, first, second
+	gc.collect()
+	await asyncio.sleep(0.1)
+	assert unretrieved == []
@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+import pytest
+
+from browser_use.browser.downloads import DownloadManager
+
+
+class FakeDownload:
+	def __init__(self, suggested_filename: str, delay: float = 0, fail: bool = False):
+		self.url = f'https://example.com/{suggested_filename}'
+		self.suggested_filename = suggested_filename
+		self.delay = delay
+		self.fail = fail
+
+	async def save_as(self, path: str) -> None:
+		await asyncio.sleep(self.delay)
+		if self.fail:
+			raise RuntimeError('download canceled')
+		with open(path, 'w') as f:
+			f.write(self.suggested_filename)
+
+
+@pytest.mark.asyncio
+async def test_downloads_are_saved_in_background(tmp_path):
+	manager = DownloadManager(str(tmp_path))
+	marker = manager.mark()
+
+	manager._on_download(FakeDownload('report.pdf', delay=0.01))
+	manager._on_download(FakeDownload('report.pdf'))
+	started = manager.started_since(marker)
+	assert [info.status for info in started] == ['in_progress', 'in_progress']
+
+	await manager.wait_for(started)
+	assert [os.path.basename(info.path) for info in started] == ['report.pdf', 'report (1).pdf']
+	assert all(os.path.exists(info.path) for info in started)
+
+
+@pytest.mark.asyncio
+async def test_custom_filename(tmp_path):
+	manager = DownloadManager(str(tmp_path), filename='order-42.pdf')
+	manager._on_download(FakeDownload('annual.pdf'))
+	[info] = await manager.wait_for(manager.started_since(0))
+
+	assert info.path == str(tmp_path / 'order-42.pdf')
+	assert (tmp_path / 'order-42.pdf').read_text() == 'annual.pdf'
+
+
+@pytest.mark.asyncio
+async def test_finished_downloads_are_reported_once(tmp_path):
+	manager = DownloadManager(str(tmp_path))
+	manager._on_download(FakeDownload('ok.csv'))
+	manager._on_download(FakeDownload('broken.csv', fail=True))
+	await manager.wait_for(manager.started_since(0))
+
+	reported = manager.pop_unreported()
+	assert [(info.suggested_filename, info.status) for info in reported] == [('ok.csv', 'completed'), ('broken.csv', 'failed')]
+	assert manager.pop_unreported() == []
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_downloads_after_timeout(tmp_path):
+	manager = DownloadManager(str(tmp_path))
+	manager._on_download(FakeDownload('huge.iso', delay=10))
+
+	await manager.close(timeout=0.01)
+	await asyncio.sleep(0)
+	[info] = manager.downloads
+	assert info.status == 'failed'
+	assert info.error == 'cancelled'
+
+
+@pytest.mark.asyncio
+async def test_wait_for_start_catches_late_download(tmp_path):
+	manager = DownloadManager(str(tmp_path))
+	marker = manager.mark()
+
+	asyncio.get_running_loop().call_later(0.05, manager._on_download, FakeDownload('late.pdf'))
+	started = await manager.wait_for_start(marker, timeout=1)
+
+	assert [info.suggested_filename for info in started] == ['late.pdf']
+	assert await manager.wait_for_start(manager.mark(), timeout=0.01) == []
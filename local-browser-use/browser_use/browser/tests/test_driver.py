@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from browser_use.browser.driver import PlaywrightDriver
+
+
+@pytest.mark.asyncio
+async def test_driver_is_shared_and_stopped_when_idle():
+	driver = PlaywrightDriver()
+	driver.idle_timeout = 0.05
+	driver.keep_warm()
+
+	first = await driver.acquire()
+	second = await driver.acquire()
+	assert first is second
+	assert driver.refs() == 2
+
+	await driver.release(first)
+	await driver.release(second)
+	# a browser launched within the idle timeout reuses the running driver
+	assert driver.is_running()
+	third = await driver.acquire()
+	assert third is first
+	await driver.release(third)
+
+	await asyncio.sleep(0.2)
+	assert not driver.is_running()
+	assert driver.refs() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquire_starts_one_driver():
+	driver = PlaywrightDriver()
+	driver.idle_timeout = 0
+
+	drivers = await asyncio.gather(*[driver.acquire() for _ in range(5)])
+	assert len({id(playwright) for playwright in drivers}) == 1
+
+	for playwright in drivers:
+		await driver.release(playwright)
+	assert not driver.is_running()
+
+
+@pytest.mark.asyncio
+async def test_driver_of_other_loops_stops_with_last_release():
+	driver = PlaywrightDriver()
+	driver.idle_timeout = 5
+
+	# a per-task loop may be closed right after the task, an idle timer would never fire
+	playwright = await driver.acquire()
+	await driver.release(playwright)
+	assert not driver.is_running()
@@ -0,0 +1,203 @@
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.elements import HIT_TEST_SCRIPT, LOOKUP_SCRIPT, resolve_registered_element
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode
+
+
+def node(tag_name, index=None, parent=None, attributes=None):
+	return DOMElementNode(
+		tag_name=tag_name,
+		xpath=f'html/body/{tag_name}',
+		attributes=attributes or {},
+		children=[],
+		is_visible=True,
+		parent=parent,
+		highlight_index=index,
+	)
+
+
+class FakeHandle:
+	def __init__(self, name, frame=None):
+		self.name = name
+		self.frame = frame
+		self.scrolled = False
+		self.clicked = False
+
+	def as_element(self):
+		return self
+
+	async def content_frame(self):
+		return self.frame
+
+	async def dispose(self):
+		pass
+
+	async def scroll_into_view_if_needed(self):
+		self.scrolled = True
+
+	async def click(self, timeout=None):
+		self.clicked = True
+
+
+class FakeFrame:
+	"""Evaluates the lookup script against a registry of {index: handle}"""
+
+	def __init__(self, snapshot_id, elements):
+		self.snapshot_id = snapshot_id
+		self.elements = elements
+		self.lookups = []
+
+	async def evaluate_handle(self, script, args):
+		assert script == LOOKUP_SCRIPT
+		self.lookups.append(args)
+		snapshot_id, index, _ = args
+		return self.elements.get(index) if snapshot_id == self.snapshot_id else FakeNull()
+
+
+class FakeNull:
+	def as_element(self):
+		return None
+
+
+@pytest.mark.asyncio
+async def test_elements_inside_iframes_resolve_in_their_frame():
+	button = FakeHandle('button')
+	frame = FakeFrame('snap', {3: button})
+	page = FakeFrame('snap', {3: FakeHandle('iframe', frame=frame)})
+	element = node('button', 3, parent=node('iframe', parent=node('body')))
+
+	assert await resolve_registered_element(page, 'snap', element) is button
+	assert frame.lookups == [['snap', 3, 'button']]
+	# another snapshot replaced the registry
+	assert await resolve_registered_element(page, 'old', element) is None
+
+
+@pytest.mark.asyncio
+async def test_elements_inside_nested_iframes_resolve_frame_by_frame():
+	button = FakeHandle('button')
+	inner = FakeFrame('snap', {3: button})
+	outer = FakeFrame('snap', {3: FakeHandle('inner iframe', frame=inner)})
+	page = FakeFrame('snap', {3: FakeHandle('outer iframe', frame=outer)})
+	element = node('button', 3, parent=node('iframe', parent=node('body', parent=node('iframe', parent=node('body')))))
+
+	assert await resolve_registered_element(page, 'snap', element) is button
+	assert (outer.lookups, inner.lookups) == ([['snap', 3, 'button']], [['snap', 3, 'button']])
+	# an element that is no iframe where the snapshot had one, e.g. after a navigation
+	outer.elements[3] = FakeHandle('div')
+	assert await resolve_registered_element(page, 'snap', element) is None
+
+
+@pytest.mark.asyncio
+async def test_locate_element_uses_the_registry_of_the_current_snapshot():
+	button = FakeHandle('button')
+	page = FakeFrame('snap', {0: button})
+	element = node('button', 0, parent=node('body'))
+	context = BrowserContext(browser=Browser())
+
+	async def current_page():
+		return page
+
+	context.get_current_page = current_page
+	context._element_registry = (page, 'snap', {0: element})
+
+	assert await context.get_locate_element(element) is button
+	assert button.scrolled
+	# nodes of older selector maps are not resolved by index
+	assert await context._get_registered_element(page, node('button', 0)) is None
+
+
+def test_selector_for_element_keeps_safe_attributes():
+	element = node('input', 0, attributes={'class': 'field 9bad', 'name': 'parcel', 'data-testid': 'parcel-id', 'onclick': 'x()'})
+
+	assert BrowserContext._enhanced_css_selector_for_element(element) == (
+		'html > body > input.field[name="parcel"][data-testid="parcel-id"]'
+	)
+	assert BrowserContext._enhanced_css_selector_for_element(element, include_dynamic_attributes=False) == (
+		'html > body > input[name="parcel"]'
+	)
+
+
+def test_snapshot_rects_fill_viewport_and_page_coordinates():
+	element, _ = DomService(page=None)._parse_node(
+		{'tagName': 'button', 'xpath': 'html/body/button', 'highlightIndex': 0, 'rect': {'x': 10, 'y': 20, 'width': 100, 'height': 40}},
+		scroll=(0, 500),
+	)
+
+	assert element.viewport_coordinates.center.model_dump() == {'x': 60, 'y': 40}
+	assert element.viewport_coordinates.bottom_right.model_dump() == {'x': 110, 'y': 60}
+	assert element.page_coordinates.center.model_dump() == {'x': 60, 'y': 540}
+
+
+class FakeMouse:
+	def __init__(self):
+		self.clicks = []
+
+	async def click(self, x, y):
+		self.clicks.append((x, y))
+
+
+class ClickPage:
+	url = 'https://county.gov/'
+
+	def __init__(self, hit):
+		self.hit = hit
+		self.mouse = FakeMouse()
+		self.hit_tests = []
+
+	async def evaluate(self, script, args):
+		assert script == HIT_TEST_SCRIPT
+		self.hit_tests.append(args)
+		return self.hit
+
+	async def evaluate_handle(self, script, args):
+		return FakeHandle('button')
+
+	async def wait_for_load_state(self):
+		pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('hit', [True, False])
+async def test_click_at_captured_position_after_hit_test(hit):
+	page = ClickPage(hit)
+	element, _ = DomService(page=None)._parse_node(
+		{'tagName': 'canvas', 'xpath': 'html/body/canvas', 'highlightIndex': 2, 'rect': {'x': 0, 'y': 0, 'width': 200, 'height': 100}}
+	)
+	context = BrowserContext(browser=Browser(), config=BrowserContextConfig(coordinate_clicks=True))
+
+	async def current_page():
+		return page
+
+	context.get_current_page = current_page
+	context._element_registry = (page, 'snap', {2: element})
+	located = []
+	original_locate = context.get_locate_element
+
+	async def locate(element_node):
+		located.append(element_node)
+		return await original_locate(element_node)
+
+	context.get_locate_element = locate
+
+	await context._click_element_node(element)
+
+	assert page.hit_tests == [['snap', 2, 100, 50]]
+	# a page that moved or covers the element falls back to locating it
+	assert page.mouse.clicks == ([(100, 50)] if hit else [])
+	assert located == ([] if hit else [element])
+
+
+@pytest.mark.asyncio
+async def test_clicks_locate_the_element_unless_coordinate_clicks_are_on():
+	page = ClickPage(True)
+	element, _ = DomService(page=None)._parse_node(
+		{'tagName': 'button', 'xpath': 'html/body/button', 'highlightIndex': 2, 'rect': {'x': 0, 'y': 0, 'width': 200, 'height': 100}}
+	)
+	context = BrowserContext(browser=Browser())
+	context._element_registry = (page, 'snap', {2: element})
+
+	assert await context._get_clickable_point(page, element) is None
+	assert page.hit_tests == []
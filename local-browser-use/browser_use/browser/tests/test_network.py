@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from browser_use.browser.network import NetworkIdleTracker, is_relevant_request
+
+
+class FakeRequest:
+	def __init__(self, url, resource_type='script', headers=None):
+		self.url = url
+		self.resource_type = resource_type
+		self.headers = headers or {}
+
+
+class FakeResponse:
+	def __init__(self, request, content_type='application/javascript'):
+		self.request = request
+		self.headers = {'content-type': content_type}
+
+
+class FakePage:
+	def __init__(self):
+		self.handlers = {}
+
+	def on(self, event, handler):
+		self.handlers[event] = handler
+
+	def remove_listener(self, event, handler):
+		self.handlers.pop(event, None)
+
+	def emit(self, event, payload):
+		self.handlers[event](payload)
+
+
+def test_ignored_requests_are_not_tracked():
+	assert is_relevant_request(FakeRequest('https://county.gov/app.js'))
+	assert not is_relevant_request(FakeRequest('https://www.Google-Analytics.com/collect.js'))
+	assert not is_relevant_request(FakeRequest('https://county.gov/api', resource_type='xhr'))
+	assert not is_relevant_request(FakeRequest('data:image/png;base64,AAAA', resource_type='image'))
+
+
+@pytest.mark.asyncio
+async def test_idle_page_returns_at_once_and_busy_page_on_quiet():
+	page = FakePage()
+	tracker = NetworkIdleTracker(page, idle_time=0.05).attach()
+	await asyncio.sleep(0.1)
+
+	start = asyncio.get_running_loop().time()
+	assert await tracker.wait_for_idle(timeout=1)
+	assert asyncio.get_running_loop().time() - start < 0.01
+
+	script = FakeRequest('https://county.gov/app.js')
+	blocked = FakeRequest('https://county.gov/font.woff2', resource_type='font')
+	page.emit('request', script)
+	page.emit('request', blocked)
+	assert not tracker.idle.is_set()
+	assert not await tracker.wait_for_idle(timeout=0.1)
+
+	# aborted requests are done too, e.g. ones blocked by the resource policy
+	page.emit('requestfailed', blocked)
+	page.emit('response', FakeResponse(script))
+	assert tracker.pending == set()
+	assert await tracker.wait_for_idle(timeout=1)
+
+	tracker.detach()
+	assert page.handlers == {}
+
+
+@pytest.mark.asyncio
+async def test_custom_filter_and_marked_activity():
+	page = FakePage()
+	tracker = NetworkIdleTracker(page, idle_time=0.05, relevant=lambda request: request.resource_type == 'xhr').attach()
+	assert await tracker.wait_for_idle(timeout=1)
+
+	# e.g. a scroll, the page is busy until it was quiet for idle_time again
+	tracker.mark_activity()
+	assert not tracker.idle.is_set()
+	assert await tracker.wait_for_idle(timeout=1)
+
+	tile = FakeRequest('https://tiles.county.gov/12/34/56.pbf', resource_type='xhr')
+	page.emit('request', FakeRequest('https://county.gov/app.js'))
+	page.emit('request', tile)
+	assert tracker.pending == {tile}
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContextConfig
+from browser_use.browser.pool import BrowserPool, BrowserPoolConfig, PooledBrowser
+
+
+class FakePool(BrowserPool):
+	"""Pool that hands out unlaunched browsers, health is controlled by the test"""
+
+	def __init__(self, config: BrowserPoolConfig):
+		super().__init__(config)
+		self.launched: list[Browser] = []
+		self.closed: list[Browser] = []
+		self.unhealthy: set[int] = set()
+
+	async def _create_browser(self) -> Browser:
+		browser = Browser(config=self.config.browser_config)
+		self.launched.append(browser)
+		return browser
+
+	async def _is_healthy(self, pooled: PooledBrowser) -> bool:
+		return id(pooled.browser) not in self.unhealthy
+
+	async def _discard(self, pooled: PooledBrowser) -> None:
+		self.closed.append(pooled.browser)
+
+
+@pytest.mark.asyncio
+async def test_browsers_are_reused():
+	pool = FakePool(BrowserPoolConfig(size=2))
+	await pool.start()
+	assert len(pool.launched) == 2
+	assert pool.browser_count == 2
+
+	browser = await pool.checkout()
+	await pool.checkin(browser)
+	assert await pool.checkout() in pool.launched
+	assert len(pool.launched) == 2
+
+
+@pytest.mark.asyncio
+async def test_browser_is_recycled_after_max_uses():
+	pool = FakePool(BrowserPoolConfig(size=1, max_uses_per_browser=2))
+
+	first = await pool.checkout()
+	await pool.checkin(first)
+	assert await pool.checkout() is first
+	await pool.checkin(first)
+
+	await asyncio.sleep(0)  # let the replacement launch
+	assert pool.closed == [first]
+	second = await pool.checkout()
+	assert second is not first
+	assert pool.active_contexts == 1
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_browser_is_replaced_on_checkout():
+	pool = FakePool(BrowserPoolConfig(size=1))
+	await pool.start()
+	broken = pool.launched[0]
+	pool.unhealthy.add(id(broken))
+
+	browser = await pool.checkout()
+	assert browser is not broken
+	assert pool.closed == [broken]
+
+
+@pytest.mark.asyncio
+async def test_checkout_waits_for_free_browser():
+	pool = FakePool(BrowserPoolConfig(size=1, checkout_timeout=0.05))
+	browser = await pool.checkout()
+
+	with pytest.raises(asyncio.TimeoutError):
+		await pool.checkout()
+
+	waiter = asyncio.create_task(pool.checkout())
+	await asyncio.sleep(0)
+	await pool.checkin(browser)
+	assert await waiter is browser
+
+
+@pytest.mark.asyncio
+async def test_contexts_share_browsers_up_to_the_limit():
+	pool = FakePool(BrowserPoolConfig(size=2, max_contexts_per_browser=2, checkout_timeout=0.05))
+
+	browsers = [await pool.checkout() for _ in range(4)]
+	assert len(pool.launched) == 2
+	# spread over the least loaded browser first
+	assert browsers[0] is not browsers[1]
+	assert sorted(browsers.count(browser) for browser in pool.launched) == [2, 2]
+
+	with pytest.raises(asyncio.TimeoutError):
+		await pool.checkout()
+
+
+@pytest.mark.asyncio
+async def test_retired_browser_closes_after_last_context():
+	pool = FakePool(BrowserPoolConfig(size=1, max_contexts_per_browser=2, max_uses_per_browser=2))
+
+	first = await pool.checkout()
+	assert await pool.checkout() is first
+	# worn out, but both contexts are still open
+	assert pool.closed == []
+
+	await asyncio.sleep(0)
+	assert await pool.checkout() is not first
+
+	await pool.checkin(first)
+	assert pool.closed == []
+	await pool.checkin(first)
+	assert pool.closed == [first]
+
+
+@pytest.mark.asyncio
+async def test_contexts_get_their_own_config():
+	context_config = BrowserContextConfig(save_downloads_path='/tmp/shared')
+	pool = FakePool(BrowserPoolConfig(size=1, max_contexts_per_browser=2, browser_config=BrowserConfig(new_context_config=context_config)))
+
+	async with pool.browser_context() as first, pool.browser_context() as second:
+		first.config.save_downloads_path = '/tmp/order-1'
+		assert first.browser is second.browser
+		assert second.config.save_downloads_path == '/tmp/shared'
+	assert context_config.save_downloads_path == '/tmp/shared'
+	assert pool.active_contexts == 0
+
+
+@pytest.mark.asyncio
+async def test_close_discards_idle_and_returned_browsers():
+	pool = FakePool(BrowserPoolConfig(size=2))
+	browser = await pool.checkout()
+	await pool.close()
+	assert len(pool.closed) == 1
+
+	await pool.checkin(browser)
+	assert len(pool.closed) == 2
+	with pytest.raises(RuntimeError):
+		await pool.checkout()
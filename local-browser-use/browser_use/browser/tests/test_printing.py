@@ -0,0 +1,90 @@
+import pytest
+
+from browser_use.browser.downloads import DownloadManager
+from browser_use.browser.printing import PRINT_BINDING, PrintToPDF
+
+
+class FakeFrame:
+	url = 'https://example.com/invoice'
+
+	def __init__(self):
+		self.scripts = []
+
+	async def evaluate(self, script):
+		self.scripts.append(script)
+
+
+class FakePage:
+	url = 'https://example.com/invoice'
+
+	def __init__(self, headless: bool = True):
+		self.headless = headless
+		self.frames = [FakeFrame()]
+
+	async def pdf(self, path: str, **options) -> None:
+		if not self.headless:
+			raise RuntimeError('PDF generation is only supported for headless')
+		with open(path, 'wb') as f:
+			f.write(b'%PDF')
+
+
+class FakeContext:
+	def __init__(self, pages=()):
+		self.bindings = {}
+		self.init_scripts = []
+		self.pages = list(pages)
+
+	async def expose_binding(self, name, callback):
+		if name in self.bindings:
+			raise RuntimeError(f'Function "{name}" has been already registered')
+		self.bindings[name] = callback
+
+	async def add_init_script(self, script):
+		self.init_scripts.append(script)
+
+
+@pytest.mark.asyncio
+async def test_print_is_saved_as_download(tmp_path):
+	downloads = DownloadManager(str(tmp_path))
+	context = FakeContext()
+	await PrintToPDF(downloads).attach(context)
+	assert 'window.print' in context.init_scripts[0]
+
+	assert await context.bindings[PRINT_BINDING]({'page': FakePage()}, 'Invoice #42')
+	[info] = await downloads.wait_for(downloads.started_since(0))
+
+	assert info.status == 'completed'
+	assert info.path == str(tmp_path / 'Invoice _42.pdf')
+	assert (tmp_path / 'Invoice _42.pdf').read_bytes() == b'%PDF'
+
+
+@pytest.mark.asyncio
+async def test_override_is_installed_once_per_context(tmp_path):
+	context = FakeContext()
+	await PrintToPDF(DownloadManager(str(tmp_path))).attach(context)
+	await PrintToPDF(DownloadManager(str(tmp_path))).attach(context)
+
+	assert len(context.init_scripts) == 1
+
+
+@pytest.mark.asyncio
+async def test_open_pages_get_the_override(tmp_path):
+	page = FakePage()
+	await PrintToPDF(DownloadManager(str(tmp_path))).attach(FakeContext(pages=[page]))
+
+	assert 'window.print' in page.frames[0].scripts[0]
+
+
+@pytest.mark.asyncio
+async def test_print_dialog_opens_when_pdf_is_not_supported(tmp_path):
+	downloads = DownloadManager(str(tmp_path))
+	printing = PrintToPDF(downloads)
+	context = FakeContext()
+	await printing.attach(context)
+
+	assert not await context.bindings[PRINT_BINDING]({'page': FakePage(headless=False)}, 'Invoice')
+	assert printing.unsupported
+	assert downloads.pop_unreported() == []
+	# later prints go to the dialog without trying again
+	assert not await context.bindings[PRINT_BINDING]({'page': FakePage()}, 'Invoice')
+	assert len(downloads.downloads) == 1
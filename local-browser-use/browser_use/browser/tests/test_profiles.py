@@ -0,0 +1,78 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from browser_use.browser.profiles import ProfilePool, ProfilePoolConfig
+
+
+def write(path: str, size: int = 10) -> None:
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, 'wb') as f:
+		f.write(b'x' * size)
+
+
+@pytest.mark.asyncio
+async def test_one_profile_per_slot(tmp_path):
+	pool = ProfilePool(ProfilePoolConfig(directory=str(tmp_path), slots=2))
+
+	first = await pool.checkout('county.gov')
+	second = await pool.checkout('county.gov')
+	assert {first.slot, second.slot} == {0, 1}
+	assert pool.try_checkout('county.gov') is None
+	assert pool.try_checkout('other.gov') is not None
+
+	with pytest.raises(TimeoutError):
+		await pool.checkout('county.gov', timeout=0.05)
+
+	pool.checkin(first)
+	assert (await pool.checkout('county.gov')).path == first.path
+
+
+@pytest.mark.asyncio
+async def test_waiting_checkout_is_woken_by_checkin_from_another_thread(tmp_path):
+	pool = ProfilePool(ProfilePoolConfig(directory=str(tmp_path), slots=1))
+	lease = pool.try_checkout('county.gov')
+
+	waiting = asyncio.ensure_future(pool.checkout('county.gov', timeout=5))
+	await asyncio.sleep(0.01)
+	assert not waiting.done()
+
+	start = asyncio.get_running_loop().time()
+	threading.Thread(target=pool.checkin, args=(lease,)).start()
+	assert (await waiting).path == lease.path
+	assert asyncio.get_running_loop().time() - start < 0.05
+	assert pool._waiters == []
+
+
+@pytest.mark.asyncio
+async def test_storage_is_wiped_and_cache_kept(tmp_path):
+	pool = ProfilePool(ProfilePoolConfig(directory=str(tmp_path), slots=1))
+	async with pool.profile('county.gov') as lease:
+		write(os.path.join(lease.path, 'Default/Network/Cookies'))
+		write(os.path.join(lease.path, 'Default/Local Storage/leveldb/000003.log'))
+		write(os.path.join(lease.path, 'Default/Cache/Cache_Data/data_1'))
+
+	async with pool.profile('county.gov') as lease:
+		assert not os.path.exists(os.path.join(lease.path, 'Default/Network/Cookies'))
+		assert not os.path.exists(os.path.join(lease.path, 'Default/Local Storage'))
+		assert os.path.exists(os.path.join(lease.path, 'Default/Cache/Cache_Data/data_1'))
+
+
+def test_size_cap_and_idle_cleanup(tmp_path):
+	pool = ProfilePool(ProfilePoolConfig(directory=str(tmp_path), slots=2, max_profile_size_mb=0.001, max_idle=60))
+	big = pool.try_checkout('county.gov')
+	write(os.path.join(big.path, 'Default/Cache/Cache_Data/data_1'), size=4096)
+	write(os.path.join(big.path, 'Default/Preferences'))
+	pool.checkin(big)
+	assert not os.path.exists(os.path.join(big.path, 'Default/Cache'))
+	assert os.path.exists(os.path.join(big.path, 'Default/Preferences'))
+
+	idle = pool.try_checkout('other.gov')
+	pool.checkin(idle)
+	os.utime(idle.path, (time.time() - 120, time.time() - 120))
+	pool.cleanup()
+	assert not os.path.exists(idle.path)
+	assert os.path.exists(big.path)
@@ -0,0 +1,62 @@
+import pytest
+
+from browser_use.browser.resource_policy import ResourceBlocker, ResourcePolicy
+
+
+class FakeRequest:
+	def __init__(self, url: str, resource_type: str):
+		self.url = url
+		self.resource_type = resource_type
+		self.frame = None  # like a service worker request, falls back to the request URL
+
+
+class FakeRoute:
+	def __init__(self, url: str, resource_type: str):
+		self.request = FakeRequest(url, resource_type)
+		self.result = None
+
+	async def abort(self, error_code=None):
+		self.result = 'aborted'
+
+	async def fallback(self):
+		self.result = 'continued'
+
+
+def test_default_policy_blocks_trackers_fonts_and_media():
+	blocker = ResourceBlocker(ResourcePolicy())
+
+	assert blocker.block_reason('https://www.google-analytics.com/collect', 'xhr') == 'domain'
+	assert blocker.block_reason('https://county.gov/fonts/a.woff2', 'font') == 'font'
+	assert blocker.block_reason('https://county.gov/logo.png', 'image') is None
+	assert blocker.block_reason('https://county.gov/app.js', 'script') is None
+	# never block navigations
+	assert blocker.block_reason('https://doubleclick.net/', 'document') is None
+
+
+def test_text_only_patterns_and_allow_list():
+	blocker = ResourceBlocker(
+		ResourcePolicy(text_only=True, block_url_patterns=[r'/banners?/', r'\.gif$'], allow_domains=['maps.county.gov'])
+	)
+
+	assert blocker.block_reason('https://county.gov/logo.png', 'image') == 'image'
+	assert blocker.block_reason('https://county.gov/banner/x.js', 'script') == 'pattern'
+	assert blocker.block_reason('https://maps.county.gov/tile.png', 'image') is None
+
+
+def test_site_overrides_apply_to_requests_of_that_site():
+	blocker = ResourceBlocker(ResourcePolicy(text_only=True, site_overrides={'parcels.gov': {'text_only': False}}))
+
+	assert blocker.block_reason('https://cdn.net/map.png', 'image', page_url='https://www.parcels.gov/map') is None
+	assert blocker.block_reason('https://cdn.net/map.png', 'image', page_url='https://other.gov/') == 'image'
+
+
+@pytest.mark.asyncio
+async def test_routes_are_counted():
+	blocker = ResourceBlocker(ResourcePolicy())
+	blocked = FakeRoute('https://googletagmanager.com/gtm.js', 'script')
+	allowed = FakeRoute('https://county.gov/app.js', 'script')
+	await blocker._handle(blocked)
+	await blocker._handle(allowed)
+
+	assert (blocked.result, allowed.result) == ('aborted', 'continued')
+	assert blocker.stats == {'allowed': 1, 'blocked': 1, 'blocked_by': {'domain': 1}}
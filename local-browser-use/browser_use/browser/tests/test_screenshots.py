@@ -0,0 +1,91 @@
+import base64
+
+import pytest
+
+from browser_use.browser.screenshots import ScreenshotCapturer, ScreenshotPolicy
+
+
+class FakeSession:
+	def __init__(self):
+		self.sent = []
+
+	async def send(self, method, params=None):
+		self.sent.append((method, params))
+		if method == 'Page.getLayoutMetrics':
+			return {
+				'cssVisualViewport': {'pageX': 0, 'pageY': 300, 'clientWidth': 1280, 'clientHeight': 1100},
+				'cssContentSize': {'width': 1280, 'height': 5000},
+			}
+		return {'data': 'aW1hZ2U='}
+
+
+class FakeCDPContext:
+	def __init__(self, session):
+		self.session = session
+		self.sessions_created = 0
+
+	async def new_cdp_session(self, page):
+		self.sessions_created += 1
+		return self.session
+
+
+class FakePage:
+	def __init__(self, context=None):
+		if context:
+			self.context = context
+
+	async def evaluate(self, script):
+		return 2
+
+	async def screenshot(self, **kwargs):
+		self.kwargs = kwargs
+		return b'jpeg'
+
+	def once(self, event, handler):
+		pass
+
+
+def test_policy_decides_when_screenshots_are_taken():
+	assert ScreenshotPolicy().wanted(vision=True)
+	assert not ScreenshotPolicy().wanted(vision=False)
+	assert ScreenshotPolicy(mode='always').wanted(vision=False)
+	assert not ScreenshotPolicy(mode='off').wanted(vision=True)
+
+
+@pytest.mark.asyncio
+async def test_viewport_capture_needs_a_single_call():
+	session = FakeSession()
+	context = FakeCDPContext(session)
+	capturer = ScreenshotCapturer(ScreenshotPolicy(format='webp', quality=60))
+	page = FakePage(context)
+
+	assert await capturer.capture(page) == ('aW1hZ2U=', 'image/webp')
+	await capturer.capture(page)
+
+	assert session.sent == [('Page.captureScreenshot', {'format': 'webp', 'quality': 60})] * 2
+	assert context.sessions_created == 1
+
+
+@pytest.mark.asyncio
+async def test_downscaled_capture_clips_to_the_viewport():
+	session = FakeSession()
+	capturer = ScreenshotCapturer(ScreenshotPolicy(format='jpeg', scale='css', max_dimension=640))
+
+	await capturer.capture(FakePage(FakeCDPContext(session)))
+
+	params = session.sent[-1][1]
+	# 1280 CSS pixels at a device pixel ratio of 2 end up 640 pixels wide
+	assert params['clip'] == {'x': 0, 'y': 300, 'width': 1280, 'height': 1100, 'scale': 0.25}
+	assert params['captureBeyondViewport'] is False
+
+
+@pytest.mark.asyncio
+async def test_browsers_without_cdp_fall_back_to_playwright():
+	capturer = ScreenshotCapturer(ScreenshotPolicy(format='webp', quality=50))
+	page = FakePage()
+
+	data, mime_type = await capturer.capture(page)
+
+	assert base64.b64decode(data) == b'jpeg'
+	assert mime_type == 'image/jpeg'
+	assert page.kwargs['type'] == 'jpeg' and page.kwargs['quality'] == 50
@@ -0,0 +1,41 @@
+from browser_use.browser.settle import AdaptiveSettleConfig, SettleProfiles, settle_key
+
+
+def test_settle_key_groups_pages_of_a_kind():
+	assert settle_key('https://county.gov/parcel/12345?tab=tax') == 'county.gov/parcel/*'
+	assert settle_key('https://county.gov/parcel/67890') == 'county.gov/parcel/*'
+	assert settle_key('https://county.gov/') == 'county.gov/'
+	assert settle_key('about:blank') is None
+
+
+def test_fast_sites_get_shorter_waits_within_bounds(tmp_path):
+	config = AdaptiveSettleConfig(path=str(tmp_path / 'settle.json'), min_samples=3)
+	profiles = SettleProfiles(config)
+
+	# without history the configured waits apply
+	assert profiles.settle_times('https://fast.gov/search', timeout=5, minimum=0.25).timeout == 5
+
+	for seconds in (0.2, 0.3, 0.4):
+		profiles.record('https://fast.gov/search', seconds)
+		profiles.record('https://slow.gov/search', seconds * 20)
+
+	fast = profiles.settle_times('https://fast.gov/search', timeout=5, minimum=0.25)
+	assert fast.timeout == config.min_timeout
+	assert fast.minimum == 0.25
+	# slow sites are never waited on longer than configured
+	assert profiles.settle_times('https://slow.gov/search', timeout=5, minimum=0.25).timeout == 5
+	# other pages of the site fall back to the domain's history
+	assert profiles.settle_times('https://fast.gov/other', timeout=5, minimum=0.25).timeout == config.min_timeout
+
+	profiles.save()
+	reloaded = SettleProfiles(config)
+	assert reloaded.settle_times('https://fast.gov/search', timeout=5, minimum=0.25) == fast
+
+
+def test_configured_minimum_wait_is_kept():
+	profiles = SettleProfiles(AdaptiveSettleConfig(min_samples=3))
+	for seconds in (0.01, 0.02, 0.03):
+		profiles.record('https://fast.gov/search', seconds)
+
+	# fast network waits do not mean the page has rendered, the minimum wait stays
+	assert profiles.settle_times('https://fast.gov/search', timeout=5, minimum=0.5).minimum == 0.5
@@ -0,0 +1,176 @@
+import base64
+
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.changes import CHANGE_TRACKER_SCRIPT, READ_TOKEN_SCRIPT, read_change_token
+from browser_use.browser.context import BrowserContext, BrowserSession
+
+DOM_SCRIPT_RESULT = {
+	'rootId': '1',
+	'map': {
+		'0': {'tagName': 'button', 'xpath': 'html/body/button', 'attributes': {}, 'isVisible': True, 'highlightIndex': 0},
+		'1': {'tagName': 'body', 'xpath': 'html/body', 'attributes': {}, 'isVisible': True, 'children': ['0']},
+	},
+	'pageInfo': {'url': 'https://county.gov/', 'title': 'Tax search', 'scrollY': 100, 'viewportHeight': 800, 'scrollHeight': 2000},
+}
+
+
+class FakePage:
+	url = 'https://county.gov/'
+
+	def __init__(self):
+		self.evaluations = []
+		self.calls = []
+
+	async def evaluate(self, script, args=None):
+		self.evaluations.append(args)
+		return DOM_SCRIPT_RESULT
+
+	async def bring_to_front(self):
+		self.calls.append('bring_to_front')
+
+	async def screenshot(self, **kwargs):
+		self.calls.append('screenshot')
+		return b'png'
+
+	async def title(self):
+		return 'Tax search'
+
+	def is_closed(self):
+		return False
+
+	def on(self, event, handler):
+		pass
+
+	def once(self, event, handler):
+		pass
+
+
+class FakeContext:
+	def __init__(self, pages):
+		self.pages = pages
+
+
+@pytest.mark.asyncio
+async def test_state_is_captured_in_one_evaluate():
+	page = FakePage()
+	context = BrowserContext(browser=Browser())
+	context.session = BrowserSession(context=FakeContext([page]), cached_state=None)
+	context.tabs.add(page)
+
+	state = await context._update_state()
+
+	# liveness check, highlight cleanup, DOM tree, title and scroll metrics come from the DOM script alone
+	assert len(page.evaluations) == 1
+	assert page.evaluations[0]['removeHighlights'] is True
+	assert page.calls[-1] == 'screenshot'
+	assert state.title == 'Tax search'
+	assert (state.pixels_above, state.pixels_below) == (100, 1100)
+	assert list(state.selector_map) == [0]
+	assert base64.b64decode(state.screenshot) == b'png'
+	assert [tab.title for tab in state.tabs] == ['Tax search']
+	context.session = None
+
+
+class TrackedPage(FakePage):
+	"""Page whose change tracker reports `version`"""
+
+	def __init__(self):
+		super().__init__()
+		self.version = 0
+
+	async def evaluate(self, script, args=None):
+		if script == READ_TOKEN_SCRIPT:
+			return ['doc', self.version]
+		self.evaluations.append(args)
+		return {**DOM_SCRIPT_RESULT, 'pageInfo': {**DOM_SCRIPT_RESULT['pageInfo'], 'changeToken': ['doc', self.version]}}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_page_is_not_extracted_again():
+	page = TrackedPage()
+	context = BrowserContext(browser=Browser())
+	context.session = BrowserSession(context=FakeContext([page]), cached_state=None)
+	context.tabs.add(page)
+	context._wait_for_page_and_frames_load = _no_wait
+
+	first = await context.get_state()
+	assert not await context.has_page_changed()
+	second = await context.get_state()
+
+	# only the screenshot is taken again
+	assert len(page.evaluations) == 1
+	assert page.calls.count('screenshot') == 2
+	assert second.selector_map is first.selector_map
+
+	page.version += 1
+	assert await context.has_page_changed()
+	await context.get_state()
+	assert len(page.evaluations) == 2
+	context.session = None
+
+
+async def _no_wait(*args, **kwargs):
+	pass
+
+
+@pytest.mark.asyncio
+async def test_changed_page_waits_for_load_once():
+	page = TrackedPage()
+	context = BrowserContext(browser=Browser())
+	context.session = BrowserSession(context=FakeContext([page]), cached_state=None)
+	context.tabs.add(page)
+	waits = []
+
+	async def wait(*args, **kwargs):
+		waits.append(page.version)
+
+	context._wait_for_page_and_frames_load = wait
+	await context.get_state()
+	page.version += 1
+
+	# as in multi_act: the check settles the page, the state extracted after it does not wait again
+	assert await context.has_page_changed()
+	await context.get_state(vision=False, wait_for_load=False)
+	assert waits == [0, 1]
+	assert len(page.evaluations) == 2
+	context.session = None
+
+
+@pytest.mark.asyncio
+async def test_no_screenshot_without_vision():
+	page = FakePage()
+	context = BrowserContext(browser=Browser())
+	context.session = BrowserSession(context=FakeContext([page]), cached_state=None)
+	context.tabs.add(page)
+
+	state = await context.get_state(vision=False)
+
+	assert state.screenshot is None
+	assert 'screenshot' not in page.calls
+	context.session = None
+
+
+class UntrackedFrame:
+	def __init__(self):
+		self.scripts = []
+
+	async def evaluate(self, script, args=None):
+		self.scripts.append(script)
+
+
+@pytest.mark.asyncio
+async def test_tracker_is_installed_late_in_every_frame():
+	frames = [UntrackedFrame(), UntrackedFrame()]
+
+	class UntrackedPage(FakePage):
+		async def evaluate(self, script, args=None):
+			return None
+
+	page = UntrackedPage()
+	page.frames = frames
+
+	# an iframe without tracker could change unseen, so there is no token until all frames have one
+	assert await read_change_token(page) is None
+	assert all(frame.scripts == [CHANGE_TRACKER_SCRIPT] for frame in frames)
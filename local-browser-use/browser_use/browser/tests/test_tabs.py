@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from browser_use.browser.tabs import TabRegistry
+
+
+class FakeFrame:
+	def __init__(self, url, parent_frame=None):
+		self.url = url
+		self.parent_frame = parent_frame
+
+
+class FakePage:
+	def __init__(self, url='about:blank', title=''):
+		self.url = url
+		self._title = title
+		self.handlers = {}
+		self.title_calls = 0
+
+	def on(self, event, handler):
+		self.handlers.setdefault(event, []).append(handler)
+
+	once = on
+
+	def emit(self, event, payload=None):
+		for handler in self.handlers.get(event, []):
+			handler(payload)
+
+	async def title(self):
+		self.title_calls += 1
+		return self._title
+
+
+class FakeContext:
+	def __init__(self, pages):
+		self.pages = pages
+		self.handlers = {}
+
+	def on(self, event, handler):
+		self.handlers[event] = handler
+
+	def remove_listener(self, event, handler):
+		self.handlers.pop(event, None)
+
+
+@pytest.mark.asyncio
+async def test_tabs_keep_their_ids_and_cached_titles():
+	first = FakePage('https://county.gov/', 'County')
+	context = FakeContext([first])
+	registry = TabRegistry()
+	registry.attach(context)
+
+	popup = FakePage()
+	context.handlers['page'](popup)
+	assert registry.active_page() is popup
+
+	popup._title = 'Parcel 42'
+	popup.emit('framenavigated', FakeFrame('https://county.gov/parcel/42'))
+	popup.emit('framenavigated', FakeFrame('https://ads.example/frame', parent_frame=object()))
+	popup.emit('domcontentloaded')
+	await asyncio.sleep(0)
+
+	calls = popup.title_calls
+	tabs = registry.tabs()
+	assert [(tab.page_id, tab.url, tab.title) for tab in tabs] == [
+		(0, 'https://county.gov/', 'County'),
+		(1, 'https://county.gov/parcel/42', 'Parcel 42'),
+	]
+	# listing tabs is a local read
+	assert popup.title_calls == calls
+
+	# closing the first tab does not renumber the popup
+	first.emit('close')
+	assert registry.page(1) is popup
+	assert registry.page(0) is None
+	assert registry.page(-1) is popup
+
+	# closing the active tab falls back to the latest one
+	registry.activate(first)
+	registry._remove(registry.tab_for(first))
+	assert registry.active_page() is popup
+
+	registry.detach(context)
+	assert context.handlers == {}
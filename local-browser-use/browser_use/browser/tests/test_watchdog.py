@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.pool import BrowserPool, BrowserPoolConfig, PooledBrowser
+from browser_use.browser.watchdog import BrowserSample, BrowserWatchdog, ContextSample, WatchdogConfig, busy_page
+
+
+class FakePool(BrowserPool):
+	def __init__(self, config: BrowserPoolConfig):
+		super().__init__(config)
+		self.closed: list[Browser] = []
+
+	async def _create_browser(self) -> Browser:
+		return Browser(config=self.config.browser_config)
+
+	async def _is_healthy(self, pooled: PooledBrowser) -> bool:
+		return True
+
+	async def _discard(self, pooled: PooledBrowser) -> None:
+		self.closed.append(pooled.browser)
+
+
+class FakeWatchdog(BrowserWatchdog):
+	"""Watchdog reporting the samples set by the test instead of asking Chromium"""
+
+	def __init__(self, pool, config):
+		super().__init__(pool, config)
+		self.fake_samples: dict[int, BrowserSample] = {}
+
+	async def sample(self, pooled: PooledBrowser) -> BrowserSample:
+		sample = self.fake_samples.get(id(pooled.browser))
+		return sample or BrowserSample(browser_id=pooled.id, active_contexts=pooled.active, uses=pooled.uses)
+
+
+class HungSession:
+	async def send(self, method, params=None):
+		await asyncio.sleep(10)
+
+	async def detach(self):
+		pass
+
+
+class FakePage:
+	url = 'https://example.com'
+
+	def __init__(self):
+		self.context = self
+		self.closed = False
+
+	async def new_cdp_session(self, page):
+		return HungSession()
+
+	async def close(self, run_before_unload=False):
+		self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_oversized_browser_is_recycled_after_its_tasks():
+	pool = FakePool(BrowserPoolConfig(size=2, watchdog=WatchdogConfig(max_rss_mb=100, max_js_heap_mb=50)))
+	watchdog = FakeWatchdog(pool, pool.config.watchdog)
+	await pool.start()
+	busy = await pool.checkout()
+	idle = next(pooled.browser for pooled in pool.pooled_browsers if pooled.browser is not busy)
+
+	watchdog.fake_samples[id(busy)] = BrowserSample(browser_id='busy', active_contexts=1, uses=1, rss_mb=500)
+	watchdog.fake_samples[id(idle)] = BrowserSample(
+		browser_id='idle', active_contexts=0, uses=0, contexts=[ContextSample(pages=1, js_heap_mb=80)]
+	)
+	await watchdog.check()
+	await asyncio.sleep(0)  # let the replacements launch
+
+	# the idle browser is closed right away, the busy one once its task is done
+	assert pool.closed == [idle]
+	assert pool.browser_count == 3
+	await pool.checkin(busy)
+	assert pool.closed == [idle, busy]
+	await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_hung_page_is_closed():
+	pool = FakePool(BrowserPoolConfig(size=1))
+	watchdog = BrowserWatchdog(pool, WatchdogConfig(hang_timeout=0.05))
+	page = FakePage()
+
+	assert await watchdog._page_metrics(page) is None
+	assert watchdog._recycle_reason(
+		BrowserSample(browser_id='hung', active_contexts=1, uses=1, contexts=[ContextSample(pages=1, hung_pages=1)])
+	)
+	await watchdog._close_hung_page(page)
+	assert page.closed
+
+
+@pytest.mark.asyncio
+async def test_page_is_closed_only_after_consecutive_unanswered_samples():
+	watchdog = BrowserWatchdog(FakePool(BrowserPoolConfig(size=1)), WatchdogConfig(hang_timeout=0.05, hang_checks=2))
+	page = FakePage()
+
+	first = ContextSample(pages=1)
+	await watchdog._sample_page(page, first)
+	assert first.hung_pages == 0
+	assert not page.closed
+
+	second = ContextSample(pages=1)
+	await watchdog._sample_page(page, second)
+	assert second.hung_pages == 1
+	assert page.closed
+
+
+@pytest.mark.asyncio
+async def test_busy_page_is_not_sampled():
+	watchdog = BrowserWatchdog(FakePool(BrowserPoolConfig(size=1)), WatchdogConfig(hang_timeout=0.05, hang_checks=1))
+	page = FakePage()
+
+	with busy_page(page):
+		sample = ContextSample(pages=1)
+		await watchdog._sample_page(page, sample)
+	assert sample.hung_pages == 0
+	assert not page.closed
@@ -22,6 +22,7 @@ class BrowserState(DOMState):
 	title: str
 	tabs: list[TabInfo]
 	screenshot: Optional[str] = None
+	screenshot_mime_type: str = 'image/png'
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
@@ -34,11 +35,15 @@ class BrowserStateHistory:
 	tabs: list[TabInfo]
 	interacted_element: list[DOMHistoryElement | None] | list[None]
 	screenshot: Optional[str] = None
+	# index of the history item holding an equal screenshot, set instead of `screenshot`
+	screenshot_ref: Optional[int] = None
 
 	def to_dict(self) -> dict[str, Any]:
 		data = {}
 		data['tabs'] = [tab.model_dump() for tab in self.tabs]
 		data['screenshot'] = self.screenshot
+		if self.screenshot_ref is not None:
+			data['screenshot_ref'] = self.screenshot_ref
 		data['interacted_element'] = [el.to_dict() if el else None for el in self.interacted_element]
 		data['url'] = self.url
 		data['title'] = self.title
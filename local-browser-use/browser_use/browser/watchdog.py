@@ -0,0 +1,268 @@
+"""
+Samples the memory and CPU of pooled browsers and recycles the ones that grow too large or hang.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from playwright.async_api import Page
+
+if TYPE_CHECKING:
+	from browser_use.browser.pool import BrowserPool, PooledBrowser
+
+logger = logging.getLogger(__name__)
+
+# pages inside a long driver call, e.g. page.pdf, answer CDP late without being hung
+_busy_pages: 'weakref.WeakKeyDictionary[Page, int]' = weakref.WeakKeyDictionary()
+
+
+@contextmanager
+def busy_page(page: Page) -> Iterator[None]:
+	"""Mark a page as busy with a long call for the duration of the block, the watchdog leaves it alone"""
+	_busy_pages[page] = _busy_pages.get(page, 0) + 1
+	try:
+		yield
+	finally:
+		_busy_pages[page] -= 1
+		if not _busy_pages[page]:
+			del _busy_pages[page]
+
+
+def is_busy(page: Page) -> bool:
+	return page in _busy_pages
+
+
+@dataclass
+class WatchdogConfig:
+	"""
+	Configuration for the BrowserWatchdog.
+
+	Default values:
+	    interval: 30.0
+	        Seconds between two samples of every pooled browser
+
+	    max_rss_mb: 2048
+	        Browsers whose processes use more memory than this together are recycled (needs psutil)
+
+	    max_js_heap_mb: 1024
+	        Browsers whose pages use more JavaScript heap than this together are recycled
+
+	    hang_timeout: 10.0
+	        Seconds a page has to answer a metrics request
+
+	    hang_checks: 2
+	        Consecutive samples a page must leave unanswered before it counts as hung, it is then closed and
+	        its browser recycled. A page busy with a long script is slow to answer once, but not for good.
+	        Pages marked with `busy_page` are never sampled.
+	"""
+
+	interval: float = 30.0
+	max_rss_mb: float = 2048
+	max_js_heap_mb: float = 1024
+	hang_timeout: float = 10.0
+	hang_checks: int = 2
+
+
+@dataclass
+class ContextSample:
+	pages: int = 0
+	js_heap_mb: float = 0
+	nodes: int = 0
+	hung_pages: int = 0
+
+
+@dataclass
+class BrowserSample:
+	browser_id: str
+	active_contexts: int
+	uses: int
+	contexts: list[ContextSample] = field(default_factory=list)
+	rss_mb: Optional[float] = None  # None without psutil or process info
+	cpu_percent: Optional[float] = None  # over the time since the previous sample
+	sampled_at: float = field(default_factory=time.monotonic)
+
+	@property
+	def js_heap_mb(self) -> float:
+		return sum(context.js_heap_mb for context in self.contexts)
+
+	@property
+	def hung_pages(self) -> int:
+		return sum(context.hung_pages for context in self.contexts)
+
+
+class BrowserWatchdog:
+	"""
+	Periodically samples every browser of a BrowserPool and recycles it when it is too big or hung.
+
+	Per context the JavaScript heap and DOM size come from CDP `Performance.getMetrics`,
+	per browser the memory and CPU of all its processes from CDP `SystemInfo.getProcessInfo` and psutil.
+	Recycled browsers stop taking new tasks and are replaced in the background, running tasks finish first.
+	Like the pool, the watchdog must run on the pool's event loop.
+	"""
+
+	def __init__(self, pool: 'BrowserPool', config: WatchdogConfig | None = None):
+		self.pool = pool
+		self.config = config or WatchdogConfig()
+		self.samples: dict[str, BrowserSample] = {}  # latest sample per pooled browser id
+		self._cpu_times: dict[str, tuple[float, float]] = {}  # browser id -> (cpu seconds, monotonic time)
+		# consecutive samples each page left unanswered
+		self._unanswered: weakref.WeakKeyDictionary[Page, int] = weakref.WeakKeyDictionary()
+		self._task: asyncio.Task | None = None
+		self._has_psutil = importlib.util.find_spec('psutil') is not None
+		if not self._has_psutil:
+			logger.debug('psutil is not installed, the watchdog only sees JavaScript heap sizes')
+
+	def start(self) -> None:
+		if self._task is None or self._task.done():
+			self._task = asyncio.create_task(self._run())
+
+	async def stop(self) -> None:
+		if self._task:
+			self._task.cancel()
+			try:
+				await self._task
+			except asyncio.CancelledError:
+				pass
+			self._task = None
+
+	async def _run(self) -> None:
+		while True:
+			await asyncio.sleep(self.config.interval)
+			try:
+				await self.check()
+			except Exception as e:
+				logger.warning(f'Browser watchdog check failed: {e}')
+
+	async def check(self) -> list[BrowserSample]:
+		"""Sample all pooled browsers once and recycle the ones over a limit"""
+		browsers = [pooled for pooled in self.pool.pooled_browsers if not pooled.retired]
+		samples = await asyncio.gather(*(self.sample(pooled) for pooled in browsers))
+
+		live_ids = {pooled.id for pooled in browsers}
+		self.samples = {sample.browser_id: sample for sample in samples}
+		self._cpu_times = {key: value for key, value in self._cpu_times.items() if key in live_ids}
+
+		for pooled, sample in zip(browsers, samples):
+			reason = self._recycle_reason(sample)
+			if reason:
+				logger.warning(f'Recycling pooled browser {pooled.id}: {reason}')
+				await self.pool.recycle(pooled.browser)
+		return samples
+
+	def _recycle_reason(self, sample: BrowserSample) -> Optional[str]:
+		if sample.hung_pages:
+			return f'{sample.hung_pages} hung page(s)'
+		if sample.rss_mb is not None and sample.rss_mb > self.config.max_rss_mb:
+			return f'{sample.rss_mb:.0f} MB resident memory'
+		if sample.js_heap_mb > self.config.max_js_heap_mb:
+			return f'{sample.js_heap_mb:.0f} MB JavaScript heap'
+		return None
+
+	async def sample(self, pooled: 'PooledBrowser') -> BrowserSample:
+		sample = BrowserSample(browser_id=pooled.id, active_contexts=pooled.active, uses=pooled.uses)
+		playwright_browser = pooled.browser.playwright_browser
+		if playwright_browser is None:
+			return sample
+
+		for context in playwright_browser.contexts:
+			context_sample = ContextSample(pages=len(context.pages))
+			for page in context.pages:
+				await self._sample_page(page, context_sample)
+			sample.contexts.append(context_sample)
+
+		await self._sample_processes(pooled, sample)
+		return sample
+
+	async def _sample_page(self, page: Page, context_sample: ContextSample) -> None:
+		if is_busy(page):
+			self._unanswered.pop(page, None)
+			return
+
+		metrics = await self._page_metrics(page)
+		if metrics is not None:
+			self._unanswered.pop(page, None)
+			context_sample.js_heap_mb += metrics.get('JSHeapUsedSize', 0) / (1024 * 1024)
+			context_sample.nodes += int(metrics.get('Nodes', 0))
+			return
+
+		unanswered = self._unanswered[page] = self._unanswered.get(page, 0) + 1
+		if unanswered < self.config.hang_checks:
+			logger.debug(f'Page {page.url} did not answer {unanswered} time(s), checking again in the next sample')
+			return
+		self._unanswered.pop(page, None)
+		context_sample.hung_pages += 1
+		await self._close_hung_page(page)
+
+	async def _page_metrics(self, page: Page) -> Optional[dict[str, float]]:
+		"""Performance metrics of a page, None if its renderer does not answer in time"""
+		try:
+			session = await asyncio.wait_for(page.context.new_cdp_session(page), self.config.hang_timeout)
+		except asyncio.TimeoutError:
+			return None
+		except Exception as e:
+			# closed pages and non-Chromium pages are not hung, just not measurable
+			logger.debug(f'No CDP session for {page.url}: {e}')
+			return {}
+
+		try:
+			await asyncio.wait_for(session.send('Performance.enable'), self.config.hang_timeout)
+			result = await asyncio.wait_for(session.send('Performance.getMetrics'), self.config.hang_timeout)
+			return {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+		except asyncio.TimeoutError:
+			return None
+		except Exception as e:
+			logger.debug(f'Failed to read metrics of {page.url}: {e}')
+			return {}
+		finally:
+			try:
+				await asyncio.wait_for(session.detach(), self.config.hang_timeout)
+			except Exception:
+				pass
+
+	async def _close_hung_page(self, page: Page) -> None:
+		logger.warning(f'Page {page.url} is not responding, closing it')
+		try:
+			await asyncio.wait_for(page.close(run_before_unload=False), self.config.hang_timeout)
+		except Exception as e:
+			logger.debug(f'Failed to close hung page: {e}')
+
+	async def _sample_processes(self, pooled: 'PooledBrowser', sample: BrowserSample) -> None:
+		"""Memory and CPU summed over the browser, renderer and GPU processes"""
+		try:
+			session = await pooled.browser.playwright_browser.new_browser_cdp_session()
+			try:
+				info = await asyncio.wait_for(session.send('SystemInfo.getProcessInfo'), self.config.hang_timeout)
+			finally:
+				await session.detach()
+		except Exception as e:
+			logger.debug(f'No process info for pooled browser {pooled.id}: {e}')
+			return
+
+		processes = info.get('processInfo', [])
+		cpu_seconds = sum(process.get('cpuTime', 0) for process in processes)
+		now = time.monotonic()
+		previous = self._cpu_times.get(pooled.id)
+		if previous and now > previous[1]:
+			sample.cpu_percent = 100 * (cpu_seconds - previous[0]) / (now - previous[1])
+		self._cpu_times[pooled.id] = (cpu_seconds, now)
+
+		if self._has_psutil:
+			sample.rss_mb = await asyncio.to_thread(self._rss_mb, [process['id'] for process in processes if 'id' in process])
+
+	@staticmethod
+	def _rss_mb(pids: list[int]) -> Optional[float]:
+		import psutil
+
+		total = 0
+		for pid in pids:
+			try:
+				total += psutil.Process(pid).memory_info().rss
+			except (psutil.NoSuchProcess, psutil.AccessDenied):
+				pass
+		return total / (1024 * 1024) if total else None
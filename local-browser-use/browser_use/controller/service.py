@@ -520,13 +520,32 @@ class Controller(Generic[Context]):
 					# Laminar.set_span_output(result)
 
 					if isinstance(result, str):
-						return ActionResult(extracted_content=result)
-					elif isinstance(result, ActionResult):
-						return result
+						result = ActionResult(extracted_content=result)
 					elif result is None:
-						return ActionResult()
-					else:
+						result = ActionResult()
+					elif not isinstance(result, ActionResult):
 						raise ValueError(f'Invalid action result type: {type(result)} of {result}')
+					return self._report_downloads(result, browser_context)
 			return ActionResult()
 		except Exception as e:
 			raise e
+
+	def _report_downloads(self, result: ActionResult, browser_context: BrowserContext) -> ActionResult:
+		"""Add the downloads that finished in the background since the last action to its result"""
+		if not browser_context.downloads:
+			return result
+		notes = []
+		for info in browser_context.downloads.pop_unreported():
+			if info.status == 'completed':
+				notes.append(f'💾  Downloaded file to {info.path}')
+			else:
+				notes.append(f'Download of {info.suggested_filename} failed: {info.error}')
+		if not notes:
+			return result
+
+		logger.info(' - '.join(notes))
+		if result.is_done:
+			# the final answer is returned to the caller as is, the files are on disk either way
+			return result
+		content = ' - '.join([result.extracted_content, *notes] if result.extracted_content else notes)
+		return result.model_copy(update={'extracted_content': content, 'include_in_memory': True})
@@ -4,9 +4,10 @@
     focusHighlightIndex: -1,
     viewportExpansion: 0,
     debugMode: false,
+    removeHighlights: false,
   }
 ) => {
-  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = args;
+  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode, removeHighlights } = args;
   let highlightIndex = 0; // Reset highlight index
 
   // Add timing stack to handle recursion
@@ -187,6 +188,14 @@
 
   const HIGHLIGHT_CONTAINER_ID = "playwright-highlight-container";
 
+  // Live elements of this snapshot by highlight index, so actions resolve them without rebuilding selectors.
+  // Same-origin iframe windows share it, an element then resolves within its own frame (see browser/elements.py).
+  const ELEMENT_REGISTRY = {
+    snapshotId: Math.random().toString(36).slice(2),
+    elements: [],
+  };
+  window.__browserUseElements = ELEMENT_REGISTRY;
+
   /**
    * Highlights an element in the DOM and returns the index of the next element.
    */
@@ -716,6 +725,24 @@
     }
   }
 
+  /**
+   * Bounding box in the coordinates of the top-level viewport, offsets of same-origin iframes included.
+   */
+  function getViewportRect(element) {
+    const rect = getCachedBoundingRect(element);
+    if (!rect) return null;
+    let x = rect.left;
+    let y = rect.top;
+    let view = element.ownerDocument.defaultView;
+    while (view && view.frameElement) {
+      const frameRect = view.frameElement.getBoundingClientRect();
+      x += frameRect.left + view.frameElement.clientLeft;
+      y += frameRect.top + view.frameElement.clientTop;
+      view = view.parent;
+    }
+    return { x, y, width: rect.width, height: rect.height };
+  }
+
   /**
    * Checks if an element is within the expanded viewport.
    */
@@ -908,6 +935,9 @@
           if (nodeData.isInteractive) {
             nodeData.isInViewport = true;
             nodeData.highlightIndex = highlightIndex++;
+            ELEMENT_REGISTRY.elements[nodeData.highlightIndex] = node;
+            // lets actions click at the captured position instead of locating the element
+            nodeData.rect = getViewportRect(node);
 
             if (doHighlightElements) {
               if (focusHighlightIndex >= 0) {
@@ -932,6 +962,7 @@
         try {
           const iframeDoc = node.contentDocument || node.contentWindow?.document;
           if (iframeDoc) {
+            if (node.contentWindow) node.contentWindow.__browserUseElements = ELEMENT_REGISTRY;
             for (const child of iframeDoc.childNodes) {
               const domElement = buildDomTree(child, node);
               if (domElement) nodeData.children.push(domElement);
@@ -994,8 +1025,29 @@
   isTextNodeVisible = measureTime(isTextNodeVisible);
   getEffectiveScroll = measureTime(getEffectiveScroll);
 
+  // Remove the highlights of the previous snapshot in the same round trip
+  if (removeHighlights) {
+    window.__browserUseHiddenHighlights = null;
+    document.getElementById(HIGHLIGHT_CONTAINER_ID)?.remove();
+    document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]').forEach(el => {
+      el.removeAttribute('browser-user-highlight-id');
+    });
+  }
+
   const rootId = buildDomTree(document.body);
 
+  const pageInfo = {
+    url: window.location.href,
+    title: document.title,
+    scrollX: window.scrollX,
+    scrollY: window.scrollY,
+    viewportHeight: window.innerHeight,
+    scrollHeight: document.documentElement.scrollHeight,
+    // see browser/changes.py, lets the next snapshot be skipped while the page stays unchanged
+    changeToken: window.__browserUseChanges ? window.__browserUseChanges.token() : null,
+    snapshotId: ELEMENT_REGISTRY.snapshotId,
+  };
+
   // Clear the cache before starting
   DOM_CACHE.clearCache();
 
@@ -1050,6 +1102,6 @@
   }
 
   return debugMode ?
-    { rootId, map: DOM_HASH_MAP, perfMetrics: PERF_METRICS } :
-    { rootId, map: DOM_HASH_MAP };
+    { rootId, map: DOM_HASH_MAP, pageInfo, perfMetrics: PERF_METRICS } :
+    { rootId, map: DOM_HASH_MAP, pageInfo };
 };
@@ -2,17 +2,20 @@ import gc
 import json
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from importlib import resources
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
 	from playwright.async_api import Page
 
+from browser_use.dom.history_tree_processor.view import Coordinates, CoordinateSet
 from browser_use.dom.views import (
 	DOMBaseNode,
 	DOMElementNode,
 	DOMState,
 	DOMTextNode,
+	PageInfo,
 	SelectorMap,
 )
 from browser_use.utils import time_execution_async
@@ -20,6 +23,25 @@ from browser_use.utils import time_execution_async
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _dom_script() -> str:
+	# read once per process, not on every step
+	return resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+
+
+def _coordinate_set(x: float, y: float, width: float, height: float) -> CoordinateSet:
+	left, top, right, bottom = round(x), round(y), round(x + width), round(y + height)
+	return CoordinateSet(
+		top_left=Coordinates(x=left, y=top),
+		top_right=Coordinates(x=right, y=top),
+		bottom_left=Coordinates(x=left, y=bottom),
+		bottom_right=Coordinates(x=right, y=bottom),
+		center=Coordinates(x=round(x + width / 2), y=round(y + height / 2)),
+		width=round(width),
+		height=round(height),
+	)
+
+
 @dataclass
 class ViewportInfo:
 	width: int
@@ -31,7 +53,7 @@ class DomService:
 		self.page = page
 		self.xpath_cache = {}
 
-		self.js_code = resources.read_text('browser_use.dom', 'buildDomTree.js')
+		self.js_code = _dom_script()
 
 	# region - Clickable elements
 	@time_execution_async('--get_clickable_elements')
@@ -44,6 +66,33 @@ class DomService:
 		element_tree, selector_map = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion)
 		return DOMState(element_tree=element_tree, selector_map=selector_map)
 
+	@time_execution_async('--get_page_snapshot')
+	async def get_page_snapshot(
+		self,
+		highlight_elements: bool = True,
+		focus_element: int = -1,
+		viewport_expansion: int = 0,
+		remove_highlights: bool = True,
+	) -> tuple[DOMState, PageInfo]:
+		"""
+		Clickable elements plus title and scroll metrics in a single evaluate.
+		The highlights of the previous snapshot are removed in the same round trip.
+		"""
+		eval_page = await self._evaluate_dom_script(highlight_elements, focus_element, viewport_expansion, remove_highlights)
+		element_tree, selector_map = await self._construct_dom_tree(eval_page)
+
+		info = eval_page['pageInfo']
+		page_info = PageInfo(
+			url=info['url'],
+			title=info['title'],
+			scroll_y=int(info['scrollY']),
+			viewport_height=int(info['viewportHeight']),
+			scroll_height=int(info['scrollHeight']),
+			change_token=(info['changeToken'][0], int(info['changeToken'][1])) if info.get('changeToken') else None,
+			snapshot_id=info.get('snapshotId'),
+		)
+		return DOMState(element_tree=element_tree, selector_map=selector_map), page_info
+
 	@time_execution_async('--build_dom_tree')
 	async def _build_dom_tree(
 		self,
@@ -51,9 +100,16 @@ class DomService:
 		focus_element: int,
 		viewport_expansion: int,
 	) -> tuple[DOMElementNode, SelectorMap]:
-		if await self.page.evaluate('1+1') != 2:
-			raise ValueError('The page cannot evaluate javascript code properly')
+		eval_page = await self._evaluate_dom_script(highlight_elements, focus_element, viewport_expansion)
+		return await self._construct_dom_tree(eval_page)
 
+	async def _evaluate_dom_script(
+		self,
+		highlight_elements: bool,
+		focus_element: int,
+		viewport_expansion: int,
+		remove_highlights: bool = False,
+	) -> dict:
 		# NOTE: We execute JS code in the browser to extract important DOM information.
 		#       The returned hash map contains information about the DOM tree and the
 		#       relationship between the DOM elements.
@@ -63,6 +119,7 @@ class DomService:
 			'focusHighlightIndex': focus_element,
 			'viewportExpansion': viewport_expansion,
 			'debugMode': debug_mode,
+			'removeHighlights': remove_highlights,
 		}
 
 		try:
@@ -71,11 +128,15 @@ class DomService:
 			logger.error('Error evaluating JavaScript: %s', e)
 			raise
 
+		# the script itself is the liveness check, a page that cannot run it returns nothing useful
+		if not isinstance(eval_page, dict) or 'map' not in eval_page:
+			raise ValueError('The page cannot evaluate javascript code properly')
+
 		# Only log performance metrics in debug mode
 		if debug_mode and 'perfMetrics' in eval_page:
 			logger.debug('DOM Tree Building Performance Metrics:\n%s', json.dumps(eval_page['perfMetrics'], indent=2))
 
-		return await self._construct_dom_tree(eval_page)
+		return eval_page
 
 	@time_execution_async('--construct_dom_tree')
 	async def _construct_dom_tree(
@@ -84,12 +145,15 @@ class DomService:
 	) -> tuple[DOMElementNode, SelectorMap]:
 		js_node_map = eval_page['map']
 		js_root_id = eval_page['rootId']
+		# page coordinates are the viewport coordinates shifted by the scroll position at snapshot time
+		info = eval_page.get('pageInfo') or {}
+		scroll = (info.get('scrollX', 0), info.get('scrollY', 0))
 
 		selector_map = {}
 		node_map = {}
 
 		for id, node_data in js_node_map.items():
-			node, children_ids = self._parse_node(node_data)
+			node, children_ids = self._parse_node(node_data, scroll)
 			if node is None:
 				continue
 
@@ -126,6 +190,7 @@ class DomService:
 	def _parse_node(
 		self,
 		node_data: dict,
+		scroll: tuple[float, float] = (0, 0),
 	) -> tuple[Optional[DOMBaseNode], list[int]]:
 		if not node_data:
 			return None, []
@@ -149,6 +214,12 @@ class DomService:
 				height=node_data['viewport']['height'],
 			)
 
+		viewport_coordinates = page_coordinates = None
+		rect = node_data.get('rect')
+		if rect:
+			viewport_coordinates = _coordinate_set(rect['x'], rect['y'], rect['width'], rect['height'])
+			page_coordinates = _coordinate_set(rect['x'] + scroll[0], rect['y'] + scroll[1], rect['width'], rect['height'])
+
 		element_node = DOMElementNode(
 			tag_name=node_data['tagName'],
 			xpath=node_data['xpath'],
@@ -162,6 +233,8 @@ class DomService:
 			shadow_root=node_data.get('shadowRoot', False),
 			parent=None,
 			viewport_info=viewport_info,
+			viewport_coordinates=viewport_coordinates,
+			page_coordinates=page_coordinates,
 		)
 
 		children_ids = node_data.get('children', [])
@@ -194,3 +194,25 @@ SelectorMap = dict[int, DOMElementNode]
 class DOMState:
 	element_tree: DOMElementNode
 	selector_map: SelectorMap
+
+
+@dataclass
+class PageInfo:
+	"""Page metrics collected by the DOM script in the same round trip as the tree"""
+
+	url: str
+	title: str
+	scroll_y: int
+	viewport_height: int
+	scroll_height: int
+	change_token: Optional[tuple[str, int]] = None
+	# id of the in-page element registry filled by this snapshot
+	snapshot_id: Optional[str] = None
+
+	@property
+	def pixels_above(self) -> int:
+		return self.scroll_y
+
+	@property
+	def pixels_below(self) -> int:
+		return self.scroll_height - (self.scroll_y + self.viewport_height)
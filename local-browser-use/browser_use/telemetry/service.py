@@ -4,7 +4,6 @@ import uuid
 from pathlib import Path
 
 from dotenv import load_dotenv
-from posthog import Posthog
 
 from browser_use.telemetry.views import BaseTelemetryEvent
 from browser_use.utils import singleton
@@ -45,6 +44,9 @@ class ProductTelemetry:
 			logging.info(
 				'Anonymized telemetry enabled. See https://docs.browser-use.com/development/telemetry for more information.'
 			)
+			# posthog is only needed with telemetry on, keep it out of the import time otherwise
+			from posthog import Posthog
+
 			self._posthog_client = Posthog(
 				project_api_key=self.PROJECT_API_KEY,
 				host=self.HOST,